@@ -6,7 +6,6 @@
 # -----------------------------------------------------------------------------------------------------------------------------#
 
 import os                                                               # 운영체제 환경 변수 접근 및 파일 시스템 관련 기능 제공
-import time                                                             # 시간 지연(sleep) 및 타이밍 관련 기능 제공
 import json                                                             # JSON 데이터 파싱 및 생성을 위한 표준 라이브러리
 import re                                                               # 정규 표현식을 이용한 문자열 패턴 매칭 및 변환
 import schedule                                                         # 스케줄링 라이브러리 (현재 One-Shot 모드에서는 미사용)
@@ -16,16 +15,34 @@ import trafilatura                                                      # 웹페
 import urllib.parse                                                     # URL 인코딩/디코딩 유틸리티 (검색 쿼리 인코딩용)
 import requests                                                         # HTTP 요청을 보내는 라이브러리 (웹페이지 크롤링, API 호출용)
 import yfinance as yf                                                   # Yahoo Finance API 래퍼 (주식 시세 및 재무 데이터 수집용)
+import pandas as pd                                                     # 다종목 시세 프레임 일괄 계산용
 
 from datetime import datetime, timedelta                                # 날짜/시간 계산용 (24시간 이내 필터링 등)
 from email.mime.text import MIMEText                                    # 이메일 본문(텍스트/HTML) 생성용
-from googleapiclient.discovery import build                             # Google API 클라이언트 (YouTube Data API v3 사용)
 from youtube_transcript_api import YouTubeTranscriptApi                 # 유튜브 영상 자막 추출 라이브러리
 
 import google.generativeai as genai                                     # Google Gemini AI API (텍스트 분석 및 생성)
 import video_studio                                                     # 커스텀 모듈: 영상 제작 관련 기능 담당
 import youtube_manager                                                  # 커스텀 모듈: 유튜브 업로드 및 관리 기능 담당
+from disk_cache import DiskCache, CACHE_DIR                             # 커스텀 모듈: 실행 간 유지되는 파일 캐시
+from news_dedup import NewsDeduper                                      # 커스텀 모듈: 뉴스 URL 정규화 + 유사 기사 제거
+from youtube_client import YouTubeClient, QuotaExceeded                 # 커스텀 모듈: 할당량 관리 + 일괄 조회 YouTube API 클라이언트
+import llm_cache                                                        # 커스텀 모듈: Gemini 응답 캐시 (오프라인 재생 지원)
+from llm_cache import generate_content_cached, finished_normally        # 캐시를 거치는 generate_content 호출 / 정상 종료 여부
+from stream_json import IncrementalJSONScanner                          # 스트리밍 응답에서 완성된 씬 대본 조기 추출
+import tracing                                                          # 커스텀 모듈: 구간 측정 (Chrome 트레이스 + 요약표)
+from tracing import span, traced                                        # 측정 구간 컨텍스트 매니저 / 데코레이터
+from stage_scheduler import Stage, StageScheduler                       # job() 단계 의존성 그래프 실행기
+from checkpoint import CheckpointStore                                  # 커스텀 모듈: 단계별 결과 저장 (--resume 재개)
+import chart_engine                                                     # 커스텀 모듈: 분봉 차트 템플릿 렌더러 (병렬 + RGBA)
+from token_budget import ContextBudget, DEFAULT_TOTAL_TOKENS, fit_items, json_tokens  # AI 입력 데이터 토큰 예산 배분
 import glob                                                             # 파일 패턴 매칭 (와일드카드로 파일 검색)
+import argparse                                                         # 명령줄 옵션 (--resume)
+import threading                                                        # 공유 HTTP 세션/프로세스 풀 생성 시 동기화용
+import hashlib                                                          # AI 리포트 본문 메모 키(프롬프트 해시) 계산용
+from concurrent.futures import ThreadPoolExecutor                       # 뉴스 키워드/기사 병렬 수집용 스레드 풀
+from concurrent.futures import ProcessPoolExecutor                      # 기사 본문 추출(CPU 작업) 병렬 처리용
+from requests.adapters import HTTPAdapter                               # HTTP 커넥션 풀 크기 설정용
 
 import pandas_market_calendars as mcal                                  # 주식 시장 캘린더 (휴장일/개장일 확인용)
 import pytz                                                             # 타임존 변환 라이브러리 (UTC ↔ 뉴욕 시간 변환)
@@ -37,10 +54,9 @@ from email.mime.image import MIMEImage                                  # 이메
 
 # [추가] Selenium 라이브러리 (공포지수 크롤링용)
 # CNN Fear & Greed Index 페이지는 JavaScript로 렌더링되므로 Selenium 브라우저 자동화가 필요합니다.
-from selenium import webdriver                                          # 웹 브라우저 자동화 드라이버
-from selenium.webdriver.chrome.options import Options                   # Chrome 브라우저 옵션 설정
-from selenium.webdriver.chrome.service import Service as ChromeService  # Chrome 서비스 관리
+# 브라우저는 video_studio와 공유하는 browser_pool에서 관리합니다.
 from selenium.webdriver.common.by import By                             # 웹 요소 탐색 방법 지정 (ID, CLASS, TAG 등)
+from browser_pool import get_browser_pool, text_present                 # 커스텀 모듈: 공유 헤드리스 브라우저
 
 
 # -----------------------------------------------------------------------------------------------------------------------------#
@@ -56,6 +72,18 @@ YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')  # YouTube Data API v3 키 (영
 EMAIL_SENDER    = os.getenv('EMAIL_SENDER')     # 발신자 이메일 주소 (Gmail)
 EMAIL_PASSWORD  = os.getenv('EMAIL_PASSWORD')   # Gmail 앱 비밀번호 (2단계 인증 필요)
 
+# 시세 픽스처 (오프라인 실행용)
+# QUOTE_FIXTURE_DIR가 지정되면 시세 프레임을 해당 폴더의 파일에서 읽거나(replay) 다운로드 후 저장(record)합니다.
+QUOTE_FIXTURE_DIR  = os.getenv('QUOTE_FIXTURE_DIR')            # 예: ./fixtures
+QUOTE_FIXTURE_MODE = os.getenv('QUOTE_FIXTURE_MODE', 'replay')  # 'replay' 또는 'record'
+
+# 이메일용 종목 차트 PNG 폴더 (매 실행 시작 시 정리)
+CHART_DIR = os.getenv('CHART_DIR', 'temp_charts')
+
+# 외부 API 주소 (로컬 대역 서버로 바꿔서 오프라인 실행/벤치마크 가능 - stub_servers.py 참고)
+GOOGLE_NEWS_RSS_URL  = os.getenv('GOOGLE_NEWS_RSS_URL', "https://news.google.com/rss/search")
+YOUTUBE_API_ENDPOINT = os.getenv('YOUTUBE_API_ENDPOINT')          # 예: http://127.0.0.1:8766 (미지정 시 googleapis.com)
+
 # Google Gemini AI API 초기화
 # 이후 genai.GenerativeModel()로 모델 인스턴스를 생성할 수 있습니다.
 genai.configure(api_key=GOOGLE_API_KEY)
@@ -93,6 +121,12 @@ def get_working_model():
     Returns:
         genai.GenerativeModel: 선택된 AI 모델 인스턴스
     """
+    # [오프라인 모드] 모델 목록 조회(API 호출) 없이 마지막으로 사용한 모델 이름으로 캐시 키를 맞춤
+    if llm_cache.is_offline():
+        model_name = llm_cache.last_model_name('models/gemini-pro')
+        print(f"🤖 LLM 오프라인 모드: 캐시된 응답만 사용 (Model: {model_name})")
+        return genai.GenerativeModel(model_name)
+
     print("🤖 AI 모델 연결 시도 중...")
     try:
         # [Step 1] 사용 가능한 모든 모델 중 'generateContent' 메서드를 지원하는 모델만 필터링
@@ -121,6 +155,7 @@ def get_working_model():
             selected_model = valid_models[0]
 
         print(f"  ✅ 최종 선택된 모델: {selected_model}")
+        llm_cache.remember_model_name(selected_model)
         return genai.GenerativeModel(selected_model)
     except:
         # [폴백] API 오류 발생 시 기본 모델 반환
@@ -170,17 +205,27 @@ def load_config():
 # 자막이 없는 영상의 경우 None을 반환합니다.
 # -----------------------------------------------------------------------------------------------------------------------------#
 
-def get_timed_transcript(video_id):
+# 자막 저장소 설정
+# - 자막은 영상 ID 기준으로 디스크에 저장되어, 24시간 창 안에 남아 있는 영상은 다음 실행에서 다시 받지 않습니다.
+# - 같은 실행 안에서는 메모리에도 보관하여 채널/키워드 수집기가 같은 영상을 한 번만 가져오도록 합니다.
+TRANSCRIPT_CACHE     = DiskCache(os.path.join(CACHE_DIR, 'transcripts'), max_bytes=100 * 1024 * 1024)
+TRANSCRIPT_CACHE_TTL = 7 * 24 * 3600  # 업로드된 영상의 자막은 거의 바뀌지 않으므로 7일
+TRANSCRIPT_MAX_CHARS = 40000          # AI 입력용으로 사용하는 자막 최대 길이
+
+_transcript_memo  = {}                # 영상 ID -> [[시작(초), 텍스트], ...] 또는 None (자막 없음)
+_transcript_locks = {}                # 영상 ID별 잠금 (동시에 같은 영상을 두 번 받지 않도록)
+_transcript_lock  = threading.Lock()
+
+
+def fetch_transcript_segments(video_id):
     """
-    유튜브 영상에서 자막을 추출하고 타임스탬프를 붙여 반환합니다.
+    영상 자막을 [[시작(초), 텍스트], ...] 형태로 반환합니다. (메모리 → 디스크 → API 순으로 조회)
     
     Args:
-        video_id (str): 유튜브 영상 ID (예: "dQw4w9WgXcQ")
+        video_id (str): 유튜브 영상 ID
     
     Returns:
-        str: 타임스탬프가 포함된 자막 텍스트
-             형식: "[MM:SS] 자막내용\\n[MM:SS] 자막내용\\n..."
-             자막이 없으면 None 반환
+        list: 자막 구간 리스트, 자막이 없으면 None
     
     [지원 언어 우선순위]
     1. 한국어 (ko)
@@ -188,24 +233,63 @@ def get_timed_transcript(video_id):
     3. 영어 (en)
     4. 자동 생성 (auto)
     """
-    try:
-        # 우선순위에 따라 사용 가능한 자막 언어로 자막 가져오기
-        transcript  = YouTubeTranscriptApi.get_transcript(video_id, languages=['ko', 'ko-KR', 'en', 'auto'])
-        script_data = ""
-
-        # 각 자막 엔트리를 순회하며 타임스탬프 포맷팅
-        for entry in transcript:
-            # 시작 시간(초)을 MM:SS 형식으로 변환
-            # 예: 125초 -> [02:05]
-            time_str = f"[{int(entry['start'])//60:02d}:{int(entry['start'])%60:02d}]"
-            script_data += f"{time_str} {entry['text']}\n"
-
-        return script_data
-
-    except: 
-        # 자막이 없거나 접근 불가능한 경우 None 반환
-        # (자동 생성 자막도 없는 영상, 자막 비활성화 영상 등)
-        return None
+    with _transcript_lock:
+        lock = _transcript_locks.setdefault(video_id, threading.Lock())
+
+    with lock:
+        if video_id in _transcript_memo:
+            return _transcript_memo[video_id]
+
+        cached = TRANSCRIPT_CACHE.get_json(video_id)
+        if cached is not None:
+            segments = cached['segments']
+        else:
+            try:
+                # 우선순위에 따라 사용 가능한 자막 언어로 자막 가져오기
+                with span("youtube:transcript", "http", video_id=video_id) as sp:
+                    transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['ko', 'ko-KR', 'en', 'auto'])
+                    sp.add_bytes(sum(len(entry['text'].encode('utf-8')) for entry in transcript))
+                segments   = [[int(entry['start']), entry['text']] for entry in transcript]
+                TRANSCRIPT_CACHE.set_json(video_id, {'segments': segments}, ttl=TRANSCRIPT_CACHE_TTL)
+            except:
+                # 자막이 없거나 접근 불가능한 경우 (자동 생성 자막도 없는 영상, 자막 비활성화 영상 등)
+                # 나중에 자막이 생길 수 있으므로 디스크에는 저장하지 않고 이번 실행에서만 기억
+                segments = None
+
+        _transcript_memo[video_id] = segments
+        return segments
+
+
+def get_timed_transcript(video_id, max_chars=None):
+    """
+    유튜브 영상에서 자막을 추출하고 타임스탬프를 붙여 반환합니다.
+    
+    Args:
+        video_id (str): 유튜브 영상 ID (예: "dQw4w9WgXcQ")
+        max_chars (int): 최대 글자 수 (선택). 지정하면 이 길이에 도달하는 즉시 조립을 멈추고
+                         전체 자막[:max_chars]와 동일한 결과를 반환합니다.
+    
+    Returns:
+        str: 타임스탬프가 포함된 자막 텍스트
+             형식: "[MM:SS] 자막내용\n[MM:SS] 자막내용\n..."
+             자막이 없으면 None 반환
+    """
+    segments = fetch_transcript_segments(video_id)
+    if segments is None: return None
+
+    # 줄 단위로 모았다가 한 번에 join (문자열 += 반복은 긴 영상에서 O(n^2))
+    lines = []
+    size  = 0
+    for start, text in segments:
+        # 시작 시간(초)을 MM:SS 형식으로 변환
+        # 예: 125초 -> [02:05]
+        line  = f"[{start//60:02d}:{start%60:02d}] {text}\n"
+        lines.append(line)
+        size += len(line)
+        if max_chars is not None and size >= max_chars: break
+
+    script_data = "".join(lines)
+    return script_data[:max_chars] if max_chars is not None else script_data
 
 
 
@@ -217,72 +301,244 @@ def get_timed_transcript(video_id):
 # RSS에서 제공하는 링크를 통해 실제 기사 본문도 추출합니다.
 # -----------------------------------------------------------------------------------------------------------------------------#
 
-def fetch_news_raw(keywords, limit=2):
+# 기사 다운로드/본문 추출 병렬화 설정
+# - NEWS_FETCH_WORKERS: 동시에 내려받을 기사 수 (HTTP 커넥션 풀 크기와 동일하게 사용)
+# - NEWS_EXTRACT_WORKERS: trafilatura 본문 추출을 수행할 프로세스 수 (CPU 코어 수 기준)
+NEWS_FETCH_WORKERS   = 16
+NEWS_EXTRACT_WORKERS = os.cpu_count() or 2
+NEWS_HEADERS         = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}  # 봇 차단 방지를 위해 일반 브라우저로 위장
+
+_http_session  = None              # 실행 전체에서 공유하는 HTTP 세션 (Keep-Alive 커넥션 재사용)
+_extract_pool  = None              # trafilatura 추출 전용 프로세스 풀
+_news_dedup    = None              # 실행 단위 뉴스 중복 제거기 (주식/일반/경제 수집기가 공유)
+_pool_lock     = threading.Lock()  # 여러 수집 스레드가 동시에 초기화하는 것을 방지
+
+# 뉴스 HTTP 캐시: RSS 원문과 기사 추출 본문을 URL 기준으로 저장 (같은 날 재실행 시 네트워크/추출 생략)
+NEWS_CACHE        = DiskCache(os.path.join(CACHE_DIR, 'news'), max_bytes=200 * 1024 * 1024)
+RSS_CACHE_TTL     = 30 * 60    # RSS 검색 결과는 자주 바뀌므로 30분
+ARTICLE_CACHE_TTL = 24 * 3600  # 기사 본문은 거의 바뀌지 않으므로 24시간
+
+
+def get_http_session():
+    """
+    커넥션 풀이 설정된 공유 requests.Session을 반환합니다. (최초 호출 시 생성)
+    
+    같은 언론사 도메인으로 가는 요청들이 TCP/TLS 연결을 재사용하므로
+    기사마다 requests.get()을 새로 호출하는 것보다 왕복 비용이 줄어듭니다.
+    """
+    global _http_session
+    with _pool_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=NEWS_FETCH_WORKERS, pool_maxsize=NEWS_FETCH_WORKERS)
+            session.mount('http://' , adapter)
+            session.mount('https://', adapter)
+            session.headers.update(NEWS_HEADERS)
+            _http_session = tracing.instrument_session(session)   # 응답 크기를 현재 측정 구간에 기록
+    return _http_session
+
+
+def get_extract_pool():
+    """
+    trafilatura 본문 추출용 프로세스 풀을 반환합니다. (최초 호출 시 생성)
+    
+    trafilatura.extract는 HTML 파싱 위주의 CPU 작업이라 스레드로는 GIL 때문에 병렬화되지 않습니다.
+    """
+    global _extract_pool
+    with _pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(max_workers=NEWS_EXTRACT_WORKERS)
+    return _extract_pool
+
+
+def get_news_dedup():
+    """이번 실행의 뉴스 중복 제거기를 반환합니다. (최초 호출 시 생성)"""
+    global _news_dedup
+    with _pool_lock:
+        if _news_dedup is None:
+            _news_dedup = NewsDeduper(session=get_http_session)
+    return _news_dedup
+
+
+def reset_news_dedup():
+    """새 실행을 시작할 때 이전 실행의 URL/본문 기록을 비웁니다."""
+    global _news_dedup
+    with _pool_lock:
+        _news_dedup = None
+
+
+def _extract_article_text(html):
+    """[프로세스 풀 작업] HTML에서 본문만 추출합니다."""
+    return trafilatura.extract(html)
+
+
+def _extract_html(html, use_pool=True):
+    """HTML에서 본문을 추출합니다. (use_pool=True면 프로세스 풀에서 실행)"""
+    with span("trafilatura", "cpu", html_bytes=len(html or "")):
+        if use_pool:
+            try:
+                return get_extract_pool().submit(_extract_article_text, html).result() or ""
+            except Exception:
+                pass  # 프로세스 풀이 깨진 경우(BrokenProcessPool 등) 현재 스레드에서 직접 추출
+        return trafilatura.extract(html) or ""
+
+
+def cached_fetch(url, namespace, ttl, transform=None, timeout=3):
+    """
+    NEWS_CACHE를 거쳐 URL을 가져옵니다.
+    
+    Args:
+        url (str): 요청할 URL
+        namespace (str): 캐시 키 구분자 (예: 'rss', 'article')
+        ttl (float): 캐시 유효 시간(초)
+        transform (callable): 응답 객체 → 저장할 바이트 변환 함수 (생략 시 응답 본문 그대로 저장)
+        timeout (float): HTTP 타임아웃(초)
+    
+    Returns:
+        bytes: 캐시 또는 네트워크에서 얻은 (변환된) 값
+    
+    [동작 흐름]
+    1. TTL 이내 캐시가 있으면 네트워크 없이 바로 반환
+    2. 만료된 캐시에 ETag/Last-Modified가 있으면 조건부 요청 (If-None-Match / If-Modified-Since)
+    3. 304 Not Modified면 기존 값의 유효 시간만 연장하고 반환 (변환도 다시 하지 않음)
+    4. 새 응답이면 변환 후 저장 (200번대 응답만 저장, 에러 페이지는 저장하지 않음)
+    """
+    key   = f"{namespace}:{url}"
+    entry = NEWS_CACHE.get_entry(key)
+    if entry and entry.fresh:
+        return entry.value
+
+    headers = {}
+    if entry:
+        if entry.meta.get('etag')         : headers['If-None-Match']     = entry.meta['etag']
+        if entry.meta.get('last_modified'): headers['If-Modified-Since'] = entry.meta['last_modified']
+
+    with span(f"http:{namespace}", "http", url=url):
+        res = get_http_session().get(url, headers=headers, timeout=timeout)
+        if res.status_code == 304 and entry:
+            NEWS_CACHE.touch(key, ttl=ttl)
+            return entry.value
+
+        value = transform(res) if transform else res.content
+        if res.ok:
+            NEWS_CACHE.set(key, value, ttl=ttl, etag=res.headers.get('ETag'), last_modified=res.headers.get('Last-Modified'))
+        return value
+
+
+def _download_and_extract(url, use_pool=True):
+    """
+    [다운로드 스레드 작업] 기사 HTML을 내려받고 본문을 추출합니다.
+    
+    추출된 본문은 URL 기준으로 캐시되므로, 재실행 시에는 다운로드와 trafilatura 추출을 모두 건너뜁니다.
+    
+    Returns:
+        str: 추출된 본문 (네트워크/추출 실패 시 빈 문자열)
+    """
+    try:
+        # 뉴스 원본 페이지에 HTTP 요청 (3초 타임아웃, 공유 세션 사용)
+        extract = lambda res: _extract_html(res.text, use_pool).encode('utf-8')
+        return cached_fetch(url, 'article', ARTICLE_CACHE_TTL, transform=extract).decode('utf-8')
+    except:
+        return ""  # 네트워크 오류 시 빈 문자열로 진행
+
+
+def _fetch_rss_entries(keyword):
+    """Google News RSS 문서를 (캐시를 거쳐) 가져와 항목 리스트를 반환합니다."""
+    return feedparser.parse(cached_fetch(_google_news_rss_url(keyword), 'rss', RSS_CACHE_TTL, timeout=10)).entries
+
+
+def _build_news_item(keyword, entry, content, url=None):
+    """
+    RSS 항목과 추출된 본문으로 뉴스 딕셔너리를 만듭니다.
+    
+    Args:
+        url (str): 기사 URL (Google News 리다이렉트를 해제한 주소, 생략 시 entry.link)
+    
+    Returns:
+        dict: {'query', 'title', 'url', 'content'} 또는 내용이 부족하면 None
+    """
+    # 본문이 있으면 본문 사용, 없으면 RSS의 description 사용
+    raw_text = content if content else entry.description
+    # 내용이 없거나 50자 미만이면 스킵 (광고/짧은 스니펫 제외)
+    if not raw_text or len(raw_text) < 50: return None
+    
+    # 텍스트 정제 및 4000자 제한 (AI 입력 크기 관리)
+    clean_text = trafilatura.utils.sanitize(raw_text)[:4000]
+    
+    return {
+        'query'   : keyword,     # 검색에 사용된 키워드
+        'title'   : entry.title, # 뉴스 제목
+        'url'     : url or entry.link,  # 원본 기사 URL
+        'content' : clean_text   # 정제된 본문 내용
+    }
+
+
+def _google_news_rss_url(keyword):
+    # 키워드를 URL 안전 형식으로 인코딩 (공백 -> %20 등)
+    encoded = urllib.parse.quote(keyword)
+    # Google News RSS URL 구성
+    # - when:1d: 최근 24시간 이내 뉴스만
+    # - hl=en-US, gl=US: 미국판 뉴스 (메이저 외신 우선)
+    return f"{GOOGLE_NEWS_RSS_URL}?q={encoded}+when:1d&hl=en-US&gl=US&ceid=US:en"
+
+
+def fetch_news_raw(keywords, limit=2, parallel=True):
     """
     Google News RSS에서 키워드 기반으로 뉴스를 수집합니다.
     
     Args:
         keywords (list): 검색할 키워드 리스트 (예: ["AAPL stock", "Tesla news"])
         limit (int): 키워드당 수집할 최대 뉴스 개수 (기본값: 2)
+        parallel (bool): True면 기사 다운로드/본문 추출을 병렬로 수행 (기본값: True)
+                         False면 기존 순차 방식으로 수집
     
     Returns:
         list: 뉴스 데이터 딕셔너리 리스트
               각 항목: {'query', 'title', 'url', 'content'}
+              (병렬 모드에서도 키워드 순서 → RSS 순서가 그대로 유지됨)
     
     [동작 흐름]
     1. 각 키워드에 대해 Google News RSS URL 생성
     2. 'when:1d' 파라미터로 24시간 이내 뉴스만 필터링
     3. 각 뉴스 링크에서 trafilatura로 본문 추출
     4. 본문이 50자 미만이면 스킵 (광고/스니펫 제외)
+    
+    [캐시]
+    RSS 원문(30분)과 기사 추출 본문(24시간)은 NEWS_CACHE에 저장되어 재실행 시 재사용됩니다.
+    
+    [중복 제거]
+    같은 실행에서 이미 다른 검색어로 가져온 기사(같은 URL/제목, 유사 본문)는 건너뛰고 다음 RSS 항목으로 채웁니다.
+    (news_dedup.NewsDeduper - 수집기 전체가 공유)
     """
     print(f"📰 해외 메이저 뉴스 수집 중...")
+    if parallel:
+        return _fetch_news_parallel(keywords, limit)
+
     news_data = []
-    # User-Agent 헤더: 봇 차단 방지를 위해 일반 브라우저로 위장
-    headers   = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+    dedup     = get_news_dedup()
 
     for keyword in keywords:
         try:
-            # 키워드를 URL 안전 형식으로 인코딩 (공백 -> %20 등)
-            encoded = urllib.parse.quote(keyword)
-            # Google News RSS URL 구성
-            # - when:1d: 최근 24시간 이내 뉴스만
-            # - hl=en-US, gl=US: 미국판 뉴스 (메이저 외신 우선)
-            # hl=en-US, gl=US -> 미국판 뉴스 (메이저 외신 우선)
-            url = f"https://news.google.com/rss/search?q={encoded}+when:1d&hl=en-US&gl=US&ceid=US:en"
-            
             # feedparser로 RSS 피드 파싱
-            feed  = feedparser.parse(url)
-            count = 0
+            entries = _fetch_rss_entries(keyword)
+            count   = 0
 
             # RSS 피드의 각 뉴스 항목 순회
-            for entry in feed.entries:
+            for entry in entries:
                 # 키워드당 limit 개수까지만 수집
                 if count >= limit: break
                 
-                # 기사 본문 추출 시도
-                content = ""
-                try:
-                    # 뉴스 원본 페이지에 HTTP 요청 (3초 타임아웃)
-                    res     = requests.get(entry.link, headers=headers, timeout=3)
-                    # trafilatura로 HTML에서 본문만 추출
-                    content = trafilatura.extract(res.text)
-                except: pass  # 네트워크 오류 시 빈 문자열로 진행
+                # 이미 가져온 기사(같은 URL/제목)면 다운로드하지 않고 다음 항목으로
+                link = dedup.claim(entry.title, entry.link)
+                if not link: continue
                 
-                # 본문이 있으면 본문 사용, 없으면 RSS의 description 사용
-                raw_text = content if content else entry.description
-                # 내용이 없거나 50자 미만이면 스킵 (광고/짧은 스니펫 제외)
-                if not raw_text or len(raw_text) < 50: continue
+                # 기사 본문 추출 시도 (trafilatura로 HTML에서 본문만 추출, 실패 시 빈 문자열)
+                content = _download_and_extract(link, use_pool=False)
                 
-                # 텍스트 정제 및 4000자 제한 (AI 입력 크기 관리)
-                clean_text = trafilatura.utils.sanitize(raw_text)[:4000]
-                
-                # 수집된 뉴스 데이터를 리스트에 추가
-                news_data.append({
-                    'query'   : keyword,     # 검색에 사용된 키워드
-                    'title'   : entry.title, # 뉴스 제목
-                    'url'     : entry.link,  # 원본 기사 URL
-                    'content' : clean_text   # 정제된 본문 내용
-                })
+                # 수집된 뉴스 데이터를 리스트에 추가 (재게재된 유사 본문은 제외)
+                item = _build_news_item(keyword, entry, content, url=link)
+                if not item or not dedup.add_body(item['content']): continue
+                news_data.append(item)
                 count += 1
             print(f"  - [{keyword}] {count}건 확보")
 
@@ -291,6 +547,67 @@ def fetch_news_raw(keywords, limit=2):
     return news_data
 
 
+def _collect_keyword_articles(keyword, limit, downloader):
+    """
+    키워드 하나의 RSS 항목을 앞에서부터 미리 내려받으며(prefetch) limit개가 모이면 중단합니다.
+    
+    [조기 종료]
+    RSS 순서대로 결과를 확인하면서, 앞쪽 항목이 실패할 경우를 대비해 window개만큼만 앞서 요청합니다.
+    limit개가 채워지면 아직 시작하지 않은 다운로드는 취소합니다.
+    
+    [중복 제거]
+    요청 전에 기사를 선점(claim)하여 다른 검색어가 이미 가져간 기사는 내려받지 않고,
+    추출 후 유사 본문(재게재)이면 결과에서 제외합니다.
+    """
+    try:
+        dedup    = get_news_dedup()
+        entries  = _fetch_rss_entries(keyword)
+        window   = max(limit * 2, 4)   # 동시에 앞서 요청해 둘 기사 수
+        futures  = {}
+        next_idx = 0
+        items    = []
+
+        for i, entry in enumerate(entries):
+            if len(items) >= limit: break
+            # 현재 위치부터 window개 앞까지 다운로드 요청을 채워 넣음
+            while next_idx < len(entries) and next_idx < i + window:
+                link = dedup.claim(entries[next_idx].title, entries[next_idx].link)
+                futures[next_idx] = (link, downloader.submit(_download_and_extract, link) if link else None)
+                next_idx += 1
+            
+            link, fut = futures.pop(i)
+            if fut is None: continue   # 다른 검색어가 이미 가져간 기사
+            item = _build_news_item(keyword, entry, fut.result(), url=link)
+            if item and dedup.add_body(item['content']): items.append(item)
+
+        # 필요 없어진 나머지 요청 취소 (이미 실행 중인 것은 끝까지 진행됨) 후 선점 해제
+        for idx, (link, fut) in futures.items():
+            if fut:
+                fut.cancel()
+                dedup.release(entries[idx].title, link)
+        print(f"  - [{keyword}] {len(items)}건 확보")
+        return items
+
+    except: return []  # 특정 키워드 실패 시 다음 키워드로 계속 진행
+
+
+def _fetch_news_parallel(keywords, limit):
+    """
+    fetch_news_raw의 병렬 모드: 키워드별 RSS를 동시에 읽고, 기사 다운로드는 공유 스레드 풀에서,
+    본문 추출은 프로세스 풀에서 수행합니다.
+    """
+    if not keywords: return []
+    with ThreadPoolExecutor(max_workers=NEWS_FETCH_WORKERS, thread_name_prefix='news-dl') as downloader, \
+         ThreadPoolExecutor(max_workers=min(len(keywords), NEWS_FETCH_WORKERS), thread_name_prefix='news-kw') as keyword_pool:
+        futures = [keyword_pool.submit(_collect_keyword_articles, keyword, limit, downloader) for keyword in keywords]
+        
+        # 키워드 순서대로 결과를 이어 붙여 순차 모드와 동일한 순서를 보장
+        news_data = []
+        for fut in futures:
+            news_data.extend(fut.result())
+    return news_data
+
+
 # -----------------------------------------------------------------------------------------------------------------------------#
 # 1. Market Status Check (사용자 요청 로직 복원)
 # -----------------------------------------------------------------------------------------------------------------------------#
@@ -359,6 +676,76 @@ def check_market_status():
 # 관련 뉴스도 함께 수집하여 AI 분석에 활용할 수 있도록 합니다.
 # -----------------------------------------------------------------------------------------------------------------------------#
 
+def download_close_frame(tickers, period="5d", interval="1d"):
+    """
+    여러 종목의 종가를 한 번의 다종목 요청으로 내려받습니다.
+    
+    Args:
+        tickers (list): 주식 종목 심볼 리스트
+        period (str): 조회 기간 (기본값: "5d")
+        interval (str): 봉 간격 (기본값: "1d", 차트용 분봉은 "5m")
+    
+    Returns:
+        pd.DataFrame: 행=거래일(분봉이면 시각), 열=종목 심볼인 종가 프레임
+                      (종목마다 거래일이 다르면 빈 칸은 NaN)
+    
+    [픽스처 모드]
+    - QUOTE_FIXTURE_DIR 미지정: yfinance에서 직접 다운로드
+    - replay: {QUOTE_FIXTURE_DIR}/quotes_{period}.pkl 파일에서 읽기 (네트워크 사용 안 함, 분봉은 quotes_{period}_{interval}.pkl)
+    - record: 다운로드한 원본 프레임을 위 경로에 저장 (다음 replay 실행용)
+    """
+    name         = f"quotes_{period}.pkl" if interval == "1d" else f"quotes_{period}_{interval}.pkl"
+    fixture_path = os.path.join(QUOTE_FIXTURE_DIR, name) if QUOTE_FIXTURE_DIR else None
+    
+    if fixture_path and QUOTE_FIXTURE_MODE == 'replay':
+        frame = pd.read_pickle(fixture_path)
+    else:
+        # Ticker.history()와 동일하게 수정주가(auto_adjust) 기준으로 조회
+        with span("yfinance:download", "http", tickers=len(tickers), period=period, interval=interval):
+            frame = yf.download(tickers, period=period, interval=interval, group_by='column', auto_adjust=True,
+                                threads=True, progress=False)
+        if fixture_path:
+            os.makedirs(QUOTE_FIXTURE_DIR, exist_ok=True)
+            frame.to_pickle(fixture_path)
+    
+    # 다종목 요청은 (필드, 심볼) 2단 컬럼, 구버전 yfinance의 단일 종목 요청은 1단 컬럼으로 반환됨
+    if isinstance(frame.columns, pd.MultiIndex):
+        close = frame['Close']
+    else:
+        close = frame[['Close']].set_axis(list(tickers[:1]), axis=1)
+    return close.reindex(columns=list(tickers))
+
+
+def compute_quote_strings(close):
+    """
+    종가 프레임에서 전 종목의 현재가/전일 대비 문자열을 컬럼 연산으로 한 번에 계산합니다.
+    
+    Args:
+        close (pd.DataFrame): download_close_frame의 출력 (행=거래일, 열=종목)
+    
+    Returns:
+        pd.DataFrame: index=종목 심볼, columns=['price', 'change_str']
+                      - price: "$150.25" (데이터 2일 미만이면 "N/A")
+                      - change_str: "+2.50 (+1.69%)" (데이터 2일 미만이면 "0.00 (0.00%)")
+    
+    [계산 방식]
+    종목별로 거래일이 달라 NaN이 섞여 있으므로, 각 열에서 "뒤에서 몇 번째 유효값인지"를 누적합으로 구한 뒤
+    1번째(최근 종가)와 2번째(전일 종가)만 남기고 열 단위로 뽑아냅니다.
+    """
+    valid    = close.notna()
+    rev_rank = valid.iloc[::-1].cumsum().iloc[::-1]               # 뒤에서부터 센 유효값 순번
+    last     = close.where(valid & (rev_rank == 1)).max()          # 최근 종가 (오늘 또는 가장 최신)
+    prev     = close.where(valid & (rev_rank == 2)).max()          # 전일 종가
+    diff     = last - prev                                         # 등락폭 (달러)
+    pct      = (diff / prev) * 100                                 # 등락률 (%)
+    has_two  = valid.sum() >= 2                                    # 최소 2일치 데이터가 있어야 전일 대비 계산 가능
+    
+    # 가격 포맷팅: 달러 기호 + 소수점 2자리 / 증감량 (증감률) 포맷: -15.55 (-3.27%)
+    price_str  = ('$' + last.map('{:.2f}'.format)).where(has_two, "N/A")
+    change_str = (diff.map('{:+.2f}'.format) + ' (' + pct.map('{:+.2f}'.format) + '%)').where(has_two, "0.00 (0.00%)")
+    return pd.DataFrame({'price': price_str, 'change_str': change_str})
+
+
 def collect_stock_data(tickers):
     """
     Yahoo Finance에서 주식 시세 데이터를 수집하고 관련 뉴스를 병합합니다.
@@ -373,45 +760,46 @@ def collect_stock_data(tickers):
     [데이터 형식]
     - price: 현재가 (예: "$150.25")
     - change_str: 전일 대비 변동 (예: "+2.50 (+1.69%)")
+    
+    [일괄 처리]
+    종목 수가 늘어나도 요청 횟수가 늘지 않도록, 시세는 다종목 1회 다운로드로,
+    관련 뉴스는 전 종목 검색어를 한 번의 fetch_news_raw 호출로 모아서 수집합니다.
     """
     print("📈 주식 데이터 수집 중...")
     stock_data     = []
     # 개장일인지 먼저 확인 (휴장일이면 시세 조회 스킵)
     is_market_open = check_market_status()
 
+    # [Step 1] 해당 종목 관련 뉴스 수집 (기존 검색어 유지, 전 종목 한 번에)
+    # 종목명으로 뉴스 검색하여 AI 분석 자료로 활용
+    queries       = {symbol: [f"{symbol} stock news", f"{symbol} analysis"] for symbol in tickers}
+    news_by_query = {}
+    for item in fetch_news_raw([q for qs in queries.values() for q in qs], limit=2):
+        news_by_query.setdefault(item['query'], []).append(item)
+
+    # [Step 2] 개장일에만 실시간 시세 일괄 조회
+    quotes = None
+    if is_market_open and tickers:
+        try:
+            quotes = compute_quote_strings(download_close_frame(tickers))
+        except Exception as e:
+            print(f"  ⚠️ 시세 일괄 조회 실패: {e}")
+
     for symbol in tickers:
         try:
-            # [Step 1] 해당 종목 관련 뉴스 수집 (기존 로직 유지)
-            # 종목명으로 뉴스 검색하여 AI 분석 자료로 활용
-            related_news = fetch_news_raw([f"{symbol} stock news", f"{symbol} analysis"], limit=2)
+            related_news = [n for q in queries[symbol] for n in news_by_query.get(q, [])]
             
-            # [Step 2] 개장일에만 실시간 시세 조회
-            if is_market_open:
-                # yfinance Ticker 객체 생성
-                ticker = yf.Ticker(symbol)
-                # 최근 5거래일 데이터 조회 (전일 대비 계산을 위해)
-                h = ticker.history(period="5d")
-                
-                # 최소 2일치 데이터가 있어야 전일 대비 계산 가능
-                if len(h) >= 2:
-                    last       = h['Close'].iloc[-1]   # 최근 종가 (오늘 또는 가장 최신)
-                    prev       = h['Close'].iloc[-2]   # 전일 종가
-                    diff       = last - prev           # 등락폭 (달러)
-                    pct        = (diff / prev) * 100   # 등락률 (%)
-                    
-                    # 가격 포맷팅: 달러 기호 + 소수점 2자리
-                    price_str  = f"${last:.2f}"
-                    # [요청] 증감량 (증감률) 포맷: -15.55 (-3.27%)
-                    # +/- 부호 자동 포함되도록 :+.2f 포맷 사용
-                    change_str = f"{diff:+.2f} ({pct:+.2f}%)"
-                else:
-                    # 데이터 부족 시 N/A 표시
-                    price_str  = "N/A"
-                    change_str = "0.00 (0.00%)"
-            else:
+            if not is_market_open:
                 # 휴장일에는 시세 대신 "Market Closed" 표시
                 price_str  = "N/A"
                 change_str = "Market Closed"
+            elif quotes is not None and symbol in quotes.index:
+                price_str  = quotes.at[symbol, 'price']
+                change_str = quotes.at[symbol, 'change_str']
+            else:
+                # 데이터 부족 시 N/A 표시
+                price_str  = "N/A"
+                change_str = "0.00 (0.00%)"
 
             # 수집된 데이터를 리스트에 추가
             stock_data.append({
@@ -427,6 +815,53 @@ def collect_stock_data(tickers):
     return stock_data
 
 
+def collect_intraday_data(tickers):
+    """
+    관심 종목 전체의 당일 5분봉을 한 번의 다종목 요청으로 수집합니다. (영상 씬 4 / 이메일 차트 공용)
+    
+    Args:
+        tickers (list): 주식 종목 심볼 리스트
+    
+    Returns:
+        dict: {심볼: {'t': [UTC epoch 초], 'close': [종가], 'prev_close': 전일 종가}}
+              (휴장일이거나 조회 실패 시 빈 dict, 당일 데이터가 2개 미만인 종목은 제외)
+    
+    [전일 종가]
+    2일치 분봉을 받아 직전 거래일의 마지막 종가를 전일 종가로 씁니다.
+    (종목마다 fast_info를 따로 조회하지 않음)
+    """
+    if not tickers or not check_market_status():
+        return {}
+    print("📉 분봉 차트 데이터 수집 중...")
+    try:
+        close = download_close_frame(tickers, period="2d", interval="5m")
+    except Exception as e:
+        print(f"  ⚠️ 분봉 일괄 조회 실패: {e}")
+        return {}
+    if close.empty:
+        return {}
+
+    index    = close.index if close.index.tz is not None else close.index.tz_localize('UTC')
+    sessions = index.tz_convert('America/New_York').normalize()
+    today    = sessions == sessions.max()
+    epochs   = index.asi8 // 10**9
+
+    intraday = {}
+    for symbol in close.columns:
+        series   = close[symbol]
+        valid    = series.notna().to_numpy()
+        cur, old = valid & today, valid & ~today
+        if cur.sum() < 2: continue
+        values   = series.to_numpy()
+        intraday[symbol] = {
+            't'         : epochs[cur].tolist(),
+            'close'     : [round(float(v), 4) for v in values[cur]],
+            'prev_close': round(float(values[old][-1]), 4) if old.any() else None,
+        }
+    print(f"  - 분봉 {len(intraday)}/{len(tickers)}개 종목")
+    return intraday
+
+
 # -----------------------------------------------------------------------------------------------------------------------------#
 # [신규] 공포/탐욕 지수 실시간 크롤링 (Selenium)
 # -----------------------------------------------------------------------------------------------------------------------------#
@@ -436,6 +871,9 @@ def collect_stock_data(tickers):
 # 공포탐욕지수는 시장 심리를 0~100 사이 숫자로 표현합니다. (0=극도의 공포, 100=극도의 탐욕)
 # -----------------------------------------------------------------------------------------------------------------------------#
 
+# CNN 공포지수 페이지 주소 (로컬 픽스처 서버로 바꿔서 오프라인 확인 가능)
+FEAR_GREED_URL = os.getenv('FEAR_GREED_URL', "https://www.cnn.com/markets/fear-and-greed")
+
 def fetch_fear_greed_index():
     """
     CNN Fear & Greed Index 페이지에서 실시간 공포탐욕지수를 크롤링합니다.
@@ -445,52 +883,21 @@ def fetch_fear_greed_index():
              실패 시 None 반환
     
     [동작 흐름]
-    1. Headless Chrome 브라우저 설정 (Docker 환경 최적화)
-    2. CNN Fear & Greed 페이지 접속
-    3. JavaScript 렌더링 대기 (5초)
-    4. body 태그의 텍스트 전체 추출
-    5. 상단 2000자만 반환 (지수는 보통 상단에 위치)
+    1. 공유 브라우저(browser_pool)에 새 탭을 열어 CNN Fear & Greed 페이지 접속
+    2. 'Fear & Greed Index' 텍스트가 화면에 나타날 때까지 대기 (최대 30초, 고정 sleep 없음)
+    3. body 태그의 텍스트 전체 추출
+    4. 상단 2000자만 반환 (지수는 보통 상단에 위치)
     """
     print("🧠 Fear & Greed Index 직접 접속 시도 (CNN)...")
-    driver = None  # 에러 발생 시 정리를 위해 미리 선언
     try:
-        # [Step 1] Chrome 옵션 설정 (Docker 환경에 맞게 최적화)
-        # video_studio 모듈과 동일한 설정을 사용합니다.
-        chrome_options = Options()
-        chrome_options.binary_location = "/usr/bin/chromium"  # Docker 내 Chromium 경로
-        chrome_options.add_argument('--headless=new')          # 헤드리스 모드 (화면 없이 실행)
-        chrome_options.add_argument('--no-sandbox')            # 샌드박스 비활성화 (Docker 필수)
-        chrome_options.add_argument('--disable-dev-shm-usage') # 공유 메모리 이슈 방지
-        chrome_options.add_argument('--disable-gpu')           # GPU 가속 비활성화
-        
-        # [Step 2] User-Agent 설정 (차단 방지)
-        # 봇으로 감지되면 차단될 수 있으므로 일반 브라우저로 위장
-        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        chrome_options.add_argument(f'user-agent={user_agent}')
-
-        # [Step 3] WebDriver 초기화
-        # Docker 환경에서는 chromedriver 경로를 명시적으로 지정
-        if os.path.exists("/usr/bin/chromedriver"):
-            service = ChromeService(executable_path="/usr/bin/chromedriver")
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        else:
-            # 로컬 개발 환경에서는 자동 감지
-            driver = webdriver.Chrome(options=chrome_options)
-
-        # [Step 4] CNN 공포지수 페이지 접속
-        driver.set_page_load_timeout(30)  # 페이지 로딩 타임아웃 30초
-        driver.get("https://www.cnn.com/markets/fear-and-greed")
-        
-        # [Step 5] 페이지 로딩 대기 (데이터가 뜰 때까지)
-        # JavaScript로 동적 렌더링되므로 충분한 대기 시간 필요
-        time.sleep(5) 
+        # [Step 1~2] JavaScript로 동적 렌더링되므로 지수 텍스트가 뜰 때까지 DOM을 폴링
+        with get_browser_pool().tab(FEAR_GREED_URL, ready=text_present("Fear & Greed Index"), timeout=30) as tab:
+            # [Step 3] 페이지 전체 텍스트 추출
+            # 특정 클래스를 찾기보다, 화면에 보이는 텍스트를 통째로 가져와서 
+            # AI에게 분석시키는 것이 가장 확실합니다. (사이트 구조 변경에 강건)
+            body_text = tab.run(lambda driver: driver.find_element(By.TAG_NAME, 'body').text)
         
-        # [Step 6] 페이지 전체 텍스트 추출
-        # 특정 클래스를 찾기보다, 화면에 보이는 텍스트를 통째로 가져와서 
-        # AI에게 분석시키는 것이 가장 확실합니다. (사이트 구조 변경에 강건)
-        body_text = driver.find_element(By.TAG_NAME, 'body').text
-        
-        # [Step 7] 결과 검증 및 반환
+        # [Step 4] 결과 검증 및 반환
         # 너무 길면 앞부분만 자르기 (지수는 보통 상단에 있음)
         # "Fear & Greed Index" 키워드 주변 텍스트를 확보
         if "Fear & Greed Index" in body_text:
@@ -503,11 +910,6 @@ def fetch_fear_greed_index():
     except Exception as e:
         print(f"   ⚠️ 크롤링 에러: {e}")
         return None
-    finally:
-        # [정리] 브라우저 리소스 해제 (메모리 누수 방지)
-        if driver:
-            try: driver.quit()
-            except: pass
 
 
 # -----------------------------------------------------------------------------------------------------------------------------#
@@ -570,6 +972,29 @@ def collect_economy_data():
 # 채널별로 1개의 영상만 수집합니다 (너무 많은 데이터 방지).
 # -----------------------------------------------------------------------------------------------------------------------------#
 
+_youtube_client = None   # 실행 단위 YouTube Data API 클라이언트 (채널/트렌드 수집기와 업로드 기록이 공유)
+_youtube_config = {}     # config.json의 youtube_config
+
+
+def set_youtube_config(youtube_config):
+    """youtube_config(할당량/캐시 설정)를 적용하고 다음 호출에서 클라이언트를 새로 만듭니다."""
+    global _youtube_client, _youtube_config
+    with _pool_lock:
+        _youtube_config = dict(youtube_config or {})
+        _youtube_client = None
+
+
+def get_youtube_client():
+    """
+    이번 실행의 YouTubeClient를 반환합니다. (최초 호출 시 생성, YOUTUBE_API_ENDPOINT가 있으면 해당 주소로 요청)
+    """
+    global _youtube_client
+    with _pool_lock:
+        if _youtube_client is None:
+            _youtube_client = YouTubeClient(YOUTUBE_API_KEY, endpoint=YOUTUBE_API_ENDPOINT, config=_youtube_config)
+    return _youtube_client
+
+
 def collect_channel_youtube_data(channels_dict):
     """
     설정된 유튜브 채널들에서 최근 24시간 이내 영상을 수집합니다.
@@ -583,35 +1008,40 @@ def collect_channel_youtube_data(channels_dict):
               각 항목: {'type', 'source', 'channel_name', 'title', 'date', 'url', 'content'}
     
     [동작 흐름]
-    1. 각 채널의 업로드 재생목록 ID 조회
+    1. 각 채널의 업로드 재생목록 ID 조회 (디스크 캐시, 없는 채널만 50개씩 묶어서 1회 호출)
     2. 재생목록에서 최신 영상 5개 조회
     3. 24시간 이내 영상만 필터링
     4. 자막 추출 후 데이터 저장
+    
+    할당량 예산이 부족하면(QuotaExceeded) 남은 채널은 건너뛰고 지금까지 모은 영상을 반환합니다.
     """
     print("🎥 유튜브 채널 수집 중...")
-    # YouTube Data API v3 클라이언트 생성
-    youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+    youtube    = get_youtube_client()
     video_data = []
-    now = datetime.utcnow()  # 현재 UTC 시간 (유튜브 타임스탬프는 UTC 기준)
+    now        = datetime.utcnow()  # 현재 UTC 시간 (유튜브 타임스탬프는 UTC 기준)
+
+    # [Step 1] 채널들의 업로드 재생목록 ID 조회
+    # 모든 유튜브 채널은 자동으로 "uploads" 재생목록을 가지고 있습니다.
+    try:
+        playlists = youtube.uploads_playlists(list(channels_dict.values()))
+    except QuotaExceeded as e:
+        print(f"   ⚠️ YouTube 할당량 부족 - 채널 수집 생략: {e}")
+        return video_data
+    except Exception as e:
+        print(f"   ⚠️ 업로드 재생목록 조회 실패: {e}")
+        return video_data
 
     for name, channel_id in channels_dict.items():
+        uploads_id = playlists.get(channel_id)
+        if not uploads_id: continue
         try:
-            # [Step 1] 채널의 업로드 재생목록 ID 조회
-            # 모든 유튜브 채널은 자동으로 "uploads" 재생목록을 가지고 있습니다.
-            res        = youtube.channels().list(id=channel_id, part='contentDetails').execute()
-            uploads_id = res['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-
-            # [Step 2] 업로드 재생목록에서 최신 영상 5개 조회
-            pl_res     = youtube.playlistItems().list(
-                playlistId = uploads_id,
-                part       = 'snippet',
-                maxResults = 5  # 최신 5개만 조회 (API 할당량 절약)
-            ).execute()
+            # [Step 2] 업로드 재생목록에서 최신 영상 5개 조회 (API 할당량 절약)
+            items = youtube.playlist_items(uploads_id, max_results=5)
             
             # 영상이 없으면 다음 채널로
-            if not pl_res.get('items'): continue
+            if not items: continue
 
-            for item in pl_res['items']: 
+            for item in items: 
                 # 영상 정보 추출
                 vid          = item['snippet']['resourceId']['videoId']  # 영상 고유 ID
                 title        = item['snippet']['title']                  # 영상 제목
@@ -626,9 +1056,9 @@ def collect_channel_youtube_data(channels_dict):
                 pub_date_kst = (pub_date_dt + timedelta(hours=9)).strftime("%Y-%m-%d")
                 
                 # [Step 4] 자막 추출 시도
-                transcript   = get_timed_transcript(vid)
+                transcript   = get_timed_transcript(vid, max_chars=TRANSCRIPT_MAX_CHARS)
                 # 자막이 있으면 40000자까지 사용, 없으면 영상 설명으로 대체
-                content      = transcript[:40000] if transcript else f"(자막 없음) {item['snippet']['description'][:1000]}"
+                content      = transcript if transcript else f"(자막 없음) {item['snippet']['description'][:1000]}"
 
                 # 수집된 영상 데이터 저장
                 video_data.append({
@@ -642,12 +1072,129 @@ def collect_channel_youtube_data(channels_dict):
                 })
                 print(f"   - [{name}] 확보: {title}")
                 break  # 채널당 1개의 영상만 수집 (최신 것만)
+        except QuotaExceeded as e:
+            print(f"   ⚠️ YouTube 할당량 부족 - 나머지 채널 생략: {e}")
+            break
         except: pass  # 개별 채널 오류 시 다음 채널로 계속 진행
         
     return video_data
 
 
 
+# -----------------------------------------------------------------------------------------------------------------------------#
+# AI 분석 입력 데이터 구성 (토큰 예산 배분)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# analyze_and_summarize에 넘길 raw_context(JSON)를 섹션별 토큰 예산 안에서 만듭니다.
+#
+# [섹션별 우선순위]
+# - stocks : 종목 시세(심볼/가격/등락)는 등락폭이 큰 종목부터 예산만큼 포함 (넘치면 나머지 생략, 개수는 stocks_omitted)
+#            관련 기사는 남는 예산에서 등락폭이 큰 종목부터 1건씩 번갈아 배정
+# - news / youtube : 수집 순서 (AI 응답이 인덱스로 매핑되므로 뒤에서부터 제외)
+# - economy : 수집 순서 (공포지수 → 경제 일정 검색 결과)
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+# 섹션별 최대 항목 수 / 항목당 최대 글자 수 (예산과 무관하게 적용되는 상한)
+ANALYSIS_SECTION_LIMITS = {
+    'news'   : {'max_items': 10, 'max_item_chars': 300},
+    'youtube': {'max_items': 5 , 'max_item_chars': None},
+    'economy': {'max_items': 3 , 'max_item_chars': 500},
+}
+
+def _change_magnitude(change_str):
+    """'+1.23 (+0.45%)' 형태의 등락 문자열에서 등락률 절댓값을 꺼냅니다. (못 읽으면 0)"""
+    match = re.search(r'\(([-+]?\d+(?:\.\d+)?)%\)', str(change_str or ''))
+    return abs(float(match.group(1))) if match else 0.0
+
+
+def _fit_stock_section(stocks, budget):
+    """
+    등락폭이 큰 종목부터 시세(심볼/가격/등락)를 예산 안에서 넣고, 남는 예산으로 관련 기사를 등락폭 순 라운드로빈으로 배정합니다.
+    시세만으로 예산을 넘으면 등락폭이 작은 종목부터 생략합니다. (최소 1종목은 유지)
+
+    Returns:
+        tuple: (종목 리스트 - 원래 순서, 생략된 종목 수)
+    """
+    order = sorted(range(len(stocks)), key=lambda i: -_change_magnitude(stocks[i].get('change_str')))
+    rows  = [{'symbol': s['symbol'], 'price': s['price'], 'change': s['change_str'], 'news': []} for s in stocks]
+
+    # 1. 시세: 등락폭 순으로 예산이 허락하는 만큼 (항목당 구분자 ", " 1토큰 포함)
+    kept, used = [], json_tokens([])
+    for i in order:
+        cost = json_tokens(rows[i]) + 1
+        if kept and used + cost > budget: break
+        kept.append(i)
+        used += cost
+    omitted = len(stocks) - len(kept)
+    if omitted:
+        print(f"   ⚠️ 종목 시세가 예산 초과 ({json_tokens(rows):,} > {budget:,} 토큰) - 등락폭이 작은 {omitted}개 종목 생략")
+
+    position = {i: pos for pos, i in enumerate(sorted(kept))}
+    skeleton = [rows[i] for i in sorted(kept)]
+    order    = [i for i in order if i in position]
+
+    # 2. 기사: (종목, 기사 위치, 기사)를 "각 종목의 1번째 기사 → 2번째 기사 → ..." 순서로 나열
+    depth    = max((len(stocks[i].get('news_items', [])) for i in order), default=0)
+    ranked   = [(i, pos, stocks[i]['news_items'][pos]) for pos in range(depth) for i in order
+                if pos < len(stocks[i].get('news_items', []))]
+
+    articles = fit_items([a for _, _, a in ranked], max(0, budget - json_tokens(skeleton)))
+    # 예산 안에 남은 기사를 종목별 원래 순서대로 배치
+    for (owner, _, _), article in sorted(zip(ranked, articles), key=lambda x: x[0][1]):
+        skeleton[position[owner]]['news'].append(article)
+    return skeleton, omitted
+
+
+def build_analysis_context(stocks, news, youtube, economy_news, budget_config=None):
+    """
+    섹션별 토큰 예산에 맞춰 AI 분석용 raw_context JSON 문자열을 만듭니다.
+
+    Args:
+        budget_config (dict): {"total_tokens": 60000, "shares": {"stocks": 0.35, "news": 0.15, "youtube": 0.4, "economy": 0.1}}
+
+    Returns:
+        str: raw_context (JSON, 한글 유지)
+    """
+    budget_config = budget_config or {}
+    budget        = ContextBudget(budget_config.get('total_tokens', DEFAULT_TOTAL_TOKENS), budget_config.get('shares'))
+    sources       = {'news': news, 'youtube': youtube, 'economy': economy_news}
+
+    # 1. 섹션별 수요(상한 적용 후 원본 크기) 측정 → 예산 배분
+    capped  = {k: fit_items(v, float('inf'), **ANALYSIS_SECTION_LIMITS[k]) for k, v in sources.items()}
+    demands = {'stocks': json_tokens([{'symbol': s['symbol'], 'price': s['price'], 'change': s['change_str'], 'news': s.get('news_items', [])} for s in stocks])}
+    demands.update({k: json_tokens(v) for k, v in capped.items()})
+    alloc   = budget.split(demands)
+
+    # 2. 섹션별로 우선순위에 따라 자르기
+    stock_rows, omitted = _fit_stock_section(stocks, alloc['stocks'])
+    sections = {
+        'stocks' : stock_rows,
+        'news'   : fit_items(capped['news']   , alloc['news']),
+        'youtube': fit_items(capped['youtube'], alloc['youtube']),
+        'economy': fit_items(capped['economy'], alloc['economy']),
+    }
+    budget.report({k: json_tokens(v) for k, v in sections.items()})
+
+    context = {
+        'stocks'               : sections['stocks'],   # 주식 데이터: 심볼, 가격, 변동률, 관련 뉴스 포함
+        'news'                 : sections['news'],     # 일반 뉴스
+        'youtube'              : sections['youtube'],  # 유튜브 영상
+        'economy_search_result': sections['economy']   # 경제 지표 데이터
+    }
+    if omitted:
+        context['stocks_omitted'] = omitted             # 예산 때문에 생략된 (등락폭이 작은) 종목 수
+    return json.dumps(context, ensure_ascii=False)  # 한글 유지
+
+
+
+def _emit_scene_script(on_script, path, value):
+    """스트리밍 스캐너 콜백: ('scripts', 'sceneN') 경로의 문자열만 on_script로 전달합니다."""
+    if len(path) != 2 or path[0] != 'scripts': return
+    try:
+        on_script(path[1], value)
+    except Exception as e:
+        print(f"⚠️ 씬 대본 조기 전달 실패 ({path[1]}): {e}")
+
+
 # -----------------------------------------------------------------------------------------------------------------------------#
 # 4. AI 편집장: 주식 및 뉴스 요약 (One-Source Multi-Use)
 # -----------------------------------------------------------------------------------------------------------------------------#
@@ -663,7 +1210,7 @@ def collect_channel_youtube_data(channels_dict):
 # 5. scripts: 6개 씬의 영상 내레이션 대본
 # -----------------------------------------------------------------------------------------------------------------------------#
 
-def analyze_and_summarize(stocks, news, youtube, economy_news):
+def analyze_and_summarize(stocks, news, youtube, economy_news, budget_config=None, on_script=None):
     """
     수집된 모든 데이터를 AI로 분석하고 영상 대본을 생성합니다.
     
@@ -672,6 +1219,9 @@ def analyze_and_summarize(stocks, news, youtube, economy_news):
         news (list): 뉴스 데이터 리스트 (fetch_news_raw의 출력)
         youtube (list): 유튜브 영상 데이터 리스트
         economy_news (list): 경제 지표 데이터 리스트 (collect_economy_data의 출력)
+        budget_config (dict): 프롬프트 토큰 예산 설정 (config.json의 prompt_budget, 생략 시 기본값)
+        on_script (callable): 지정하면 스트리밍 모드로 응답을 받으며, scripts.sceneN 값이 완성될 때마다
+                              on_script(scene_name, text)를 즉시 호출 (반환값은 비스트리밍과 동일)
     
     Returns:
         tuple: (stocks, news, youtube, economy_data, generated_scripts)
@@ -697,43 +1247,15 @@ def analyze_and_summarize(stocks, news, youtube, economy_news):
         return stocks, news, youtube
 
 
-    # [핵심 1] 데이터 경량화 (Input Truncation)
-    # AI API의 토큰 제한과 비용을 고려하여 입력 데이터 크기를 제한합니다.
-    # AI가 처리하다 뻗지 않도록, 뉴스 본문을 500자로 제한합니다.
-    clean_news = []
-    for n in news[:10]:  # 뉴스는 최대 10개만 전달
-        clean_n = n.copy()
-        if 'content' in clean_n:
-            clean_n['content'] = clean_n['content'][:300] + "..."  # 300자 제한
-        clean_news.append(clean_n)
-
-    # 경제 데이터도 마찬가지로 크기 제한
-    clean_economy = []
-    for n in economy_news[:3]:  # 경제 데이터는 최대 3개만 전달
-        clean_n = n.copy()
-        if 'content' in clean_n:
-            # 공포지수 크롤링 데이터 등이 너무 길 수 있으므로 제한
-            clean_n['content'] = clean_n['content'][:500] + "..." 
-        clean_economy.append(clean_n)
-
+    # [핵심 1] 데이터 경량화 (Token Budget)
+    # AI API의 토큰 제한과 비용을 고려하여, 섹션별 예산(prompt_budget) 안에서 입력 데이터를 자릅니다.
+    # 관심 종목/채널 수가 늘어나도 프롬프트 크기는 total_tokens 이하로 유지됩니다.
+    raw_context = build_analysis_context(stocks, news, youtube, economy_news, budget_config)
 
     # [디버그 로그] 입력 데이터 상태 확인
     print(f"🔍 [DEBUG] Stocks 개수: {len(stocks)}")
     print(f"🔍 [DEBUG] News 개수: {len(news)}")
-    print(f"🔍 [DEBUG] Economy 데이터 길이: {len(str(clean_economy))}") 
-    if clean_economy:
-        print(f"🔍 [DEBUG] Economy 데이터 샘플: {str(clean_economy)[:200]}")
-
-    # [핵심 2] AI에게 전달할 JSON 데이터 구성
-    # Raw Data 준비
-    raw_context = json.dumps({
-        # 주식 데이터: 심볼, 가격, 변동률, 관련 뉴스 포함
-        'stocks'               : [ {'symbol': s['symbol'], 'price': s['price'], 'change': s['change_str'], 'news': s.get('news_items', [])} for s in stocks ], 
-        'news'                 : clean_news,        # 일반 뉴스
-        'youtube'              : youtube[:5],       # 유튜브 영상 (최대 5개)
-        'economy_search_result': clean_economy      # 경제 지표 데이터
-    }, ensure_ascii=False)  # 한글 유지
-    
+
     prompt = f"""
     당신은 월가(Wall St.)의 수석 애널리스트입니다. 제공된 주식/뉴스 데이터를 철저히 분석하여 JSON을 작성하세요.
     **절대 없는 사실을 지어내지 마십시오.**
@@ -810,9 +1332,13 @@ def analyze_and_summarize(stocks, news, youtube, economy_news):
             # 모델 인스턴스 새로 생성
             current_model = genai.GenerativeModel(model_name)
 
+            # [스트리밍] 응답 조각을 점진적으로 스캔하여 완성된 씬 대본을 먼저 넘겨줌
+            scanner       = IncrementalJSONScanner(lambda path, value: _emit_scene_script(on_script, path, value)) if on_script else None
+
             # [Step 4] AI 응답 전처리
             # AI 응답에서 마크다운 코드 블록 태그 제거
-            res           = current_model.generate_content(prompt, safety_settings=safety_settings)
+            res           = generate_content_cached(current_model, prompt, safety_settings=safety_settings,
+                                                    on_text=scanner.feed if scanner else None)
             text          = res.text.replace("```json", "").replace("```", "").strip()
             
             # JSON 부분만 추출 (응답에 추가 텍스트가 있을 수 있음)
@@ -971,7 +1497,7 @@ def plan_video_script(stocks, news, youtube):
     """
     try:
         # AI로 대본 생성
-        res       = model.generate_content(prompt)
+        res       = generate_content_cached(model, prompt)
         text      = res.text.replace("```json", "").replace("```", "").strip()
         
         # JSON 부분 추출
@@ -1012,7 +1538,7 @@ def collect_keyword_youtube_data(keywords):
     - 키워드 기반: 주제별 검색으로 핫이슈 발굴 (트렌드 파악)
     """
     print("🔥 유튜브 트렌드 검색 중...")
-    youtube     = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+    youtube     = get_youtube_client()
     trend_data  = []
     
     # 24시간 전 시간 구하기 (ISO 8601 형식)
@@ -1021,30 +1547,21 @@ def collect_keyword_youtube_data(keywords):
 
     for keyword in keywords:
         try:
-            # 검색 API 호출: 24시간 이내, 관련도 순
-            # YouTube Search API를 사용하여 키워드 검색
-            req = youtube.search().list(
-                part           = "snippet",      # 영상 기본 정보 요청
-                q              = keyword,        # 검색 키워드
-                order          = "relevance",    # 관련도순 정렬 (viewCount, date 등 가능)
-                publishedAfter = yesterday,      # 24시간 이내 영상만
-                type           = "video",        # 영상만 (channel, playlist 제외)
-                maxResults     = 1               # 키워드당 1개만 (API 할당량 절약)
-            )
-            res = req.execute()
+            # 검색 API 호출: 24시간 이내, 관련도 순, 키워드당 1개 (호출당 100 unit)
+            items = youtube.search_videos(keyword, published_after=yesterday, max_results=1)
             
             # 검색 결과가 없으면 다음 키워드로
-            if not res.get('items'): continue
+            if not items: continue
             
             # 첫 번째 검색 결과 사용
-            item           = res['items'][0]
+            item           = items[0]
             vid            = item['id']['videoId']            # 영상 ID
             title          = item['snippet']['title']         # 영상 제목
             channel_title  = item['snippet']['channelTitle']  # 채널명
             
             # 자막 추출 시도
-            transcript     = get_timed_transcript(vid)
-            content        = transcript[:40000] if transcript else f"(자막 없음) {item['snippet']['description'][:1000]}"
+            transcript     = get_timed_transcript(vid, max_chars=TRANSCRIPT_MAX_CHARS)
+            content        = transcript if transcript else f"(자막 없음) {item['snippet']['description'][:1000]}"
 
             # 수집 데이터 저장
             trend_data.append({
@@ -1056,6 +1573,9 @@ def collect_keyword_youtube_data(keywords):
                 'content'       : content                        # 자막 또는 설명
             })
             print(f"  - [트렌드/{keyword}] 확보: {title}")
+        except QuotaExceeded as e:
+            print(f"  ⚠️ YouTube 할당량 부족 - 나머지 키워드 생략: {e}")
+            break
         except Exception as e:
             print(f"  - [트렌드/{keyword}] 에러: {e}")
             
@@ -1076,34 +1596,13 @@ def collect_keyword_youtube_data(keywords):
 # 이미지(히트맵)는 cid: 프로토콜로 첨부파일 참조합니다.
 # -----------------------------------------------------------------------------------------------------------------------------#
 
-def generate_report(stocks, general_news, channel_videos, trend_videos, video_url=None, economy_data=None):
-    """
-    CEO용 HTML 이메일 리포트를 생성합니다.
-    
-    Args:
-        stocks (list): AI 분석이 완료된 주식 데이터
-        general_news (list): 뉴스 데이터
-        channel_videos (list): 채널 기반 유튜브 영상
-        trend_videos (list): 키워드 기반 트렌드 영상
-        video_url (str): 유튜브 Shorts 영상 URL (선택)
-        economy_data (dict): 경제 인사이트 데이터 (선택)
-    
-    Returns:
-        str: 완성된 HTML 리포트 문자열
-    
-    [리포트 구조]
-    - Section 0: 1분 요약 영상 링크
-    - Section 1: Market Dashboard (히트맵, 공포지수, 경제 일정)
-    - Section 2: 관심 종목 분석
-    - Section 3: 뉴스 심층 분석
-    - Section 4: 유튜브 채널 인사이트
-    - Section 5: 트렌드 영상
-    """
-    print("📝 CEO 맞춤형 심층 리포트 작성 중...")
-    
-    # [Section 0] 영상 섹션 HTML 구성
+# 같은 데이터로 만든 AI 리포트 본문(섹션 2~5) 메모 {프롬프트 해시: 본문 HTML}
+# 업로드 전 설명문과 업로드 후 이메일이 같은 본문을 쓰므로 Gemini 호출은 실행당 1회입니다.
+_report_body_memo = {}
+
+def build_video_section_html(video_url, stocks):
+    """[Section 0] 1분 요약 영상 링크 카드 (영상이 없으면 휴장 안내 또는 빈 문자열)"""
     # 유튜브 Shorts 영상이 업로드되었으면 링크 표시
-    # 1. [Section 0] 영상 섹션 HTML (기존 동일)
     video_section_html = ""
     if video_url:
         # 영상 URL이 있으면 클릭 가능한 링크 카드 생성
@@ -1126,10 +1625,12 @@ def generate_report(stocks, general_news, channel_videos, trend_videos, video_ur
         <p><i>(오늘은 주식 시장 휴장일 또는 데이터 부족으로 영상이 생성되지 않았습니다.)</i></p>
         <hr>
         """
+    return video_section_html
 
-    # [Section 1] Market Dashboard 구성
+
+def build_dashboard_html(economy_data):
+    """[Section 1] Market Dashboard (히트맵, 공포지수, 경제 일정) - AI 호출 없이 파이썬에서 직접 생성"""
     # 히트맵 이미지, 공포탐욕지수, 경제 일정을 시각적으로 표시
-    # [NEW] [Section 1] Market Dashboard (파이썬에서 직접 생성)
     dashboard_html = ""
     if economy_data:
         # AI가 추출한 경제 인사이트에서 데이터 가져오기
@@ -1168,9 +1669,42 @@ def generate_report(stocks, general_news, channel_videos, trend_videos, video_ur
         </div>
         <hr style="border: 0; border-top: 1px dashed #ddd; margin: 30px 0;">
         """
+    return dashboard_html
+
+
+def pick_email_charts(charts, limit=6):
+    """charts 단계 결과에서 등락률 절댓값이 큰 순서로 limit개 → [(심볼, 항목)] (메일 본문과 인라인 첨부가 같은 목록을 사용)"""
+    ranked = sorted((charts or {}).items(), key=lambda kv: abs(kv[1].get('pct', 0.0)), reverse=True)
+    return [(symbol, entry) for symbol, entry in ranked[:limit] if entry.get('png') and os.path.exists(entry['png'])]
+
+
+def build_chart_section_html(picked):
+    """[Section 1-2] 관심 종목 당일 분봉 차트 (pick_email_charts 결과, cid:chart_{심볼}로 인라인 첨부 참조)"""
+    if not picked: return ""
+    cards = "".join(f"""
+            <div style="flex: 1 1 280px; text-align:center;">
+                <p style="margin: 0 0 5px 0;"><b>{symbol}</b> {entry['price']}
+                   <span style="color: {entry['color']};">({entry['pct']:+.2f}%)</span></p>
+                <img src="cid:chart_{symbol}" alt="{symbol} chart" style="width:100%; max-width:320px; border-radius:8px;">
+            </div>""" for symbol, entry in picked)
+    return f"""
+        <h3 style="margin-top: 20px;">2. Watchlist Intraday Charts</h3>
+        <div style="display: flex; gap: 10px; flex-wrap: wrap;">{cards}
+        </div>
+        <hr style="border: 0; border-top: 1px dashed #ddd; margin: 30px 0;">
+        """
+
 
-    # [Section 2~5] AI가 생성하는 심층 분석 리포트
-    # 2. AI 리포트 생성
+def generate_report_body(stocks, general_news, channel_videos, trend_videos):
+    """
+    AI가 작성하는 리포트 본문(섹션 2~5)을 생성합니다. 같은 데이터로 다시 호출하면 메모된 결과를 반환합니다.
+
+    Returns:
+        str: 본문 HTML
+
+    Raises:
+        RuntimeError: AI가 응답을 거부한 경우 (실패 결과는 메모하지 않음)
+    """
     # 모든 데이터를 JSON으로 묶어서 AI에게 전달
     full_data = json.dumps({
         "stocks"   : stocks, 
@@ -1238,21 +1772,35 @@ def generate_report(stocks, general_news, channel_videos, trend_videos, video_ur
 {full_data}
 """
 
-    try:
-        response = model.generate_content(prompt, safety_settings=safety_settings)
-        # 응답 체크
-        if not response.parts:
-            print(f"⚠️ AI 응답 없음 (Reason: {response.prompt_feedback})")
-            return "<p>리포트 생성 실패 (AI 응답 거부)</p>"
-        
-        ai_report_body = response.text.replace("```html", "").replace("```", "").strip()
-        
-        # [최종 조립] 영상(0) + 대시보드(1) + AI분석(2~5)
-        final_html     = f"""
+    memo_key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+    if memo_key in _report_body_memo:
+        print("♻️ AI 리포트 본문 재사용 (Gemini 호출 생략)")
+        return _report_body_memo[memo_key]
+
+    print("📝 CEO 맞춤형 심층 리포트 작성 중...")
+    response = generate_content_cached(model, prompt, safety_settings=safety_settings)
+    # 응답 체크 (차단된 프롬프트는 candidates가 비어 있어 .parts 접근 자체가 ValueError)
+    if not finished_normally(response):
+        raise RuntimeError(f"AI 응답 거부 (Reason: {response.prompt_feedback})")
+    if not response.parts:
+        raise RuntimeError("AI 응답 없음 (빈 응답)")
+
+    ai_report_body = response.text.replace("```html", "").replace("```", "").strip()
+    _report_body_memo[memo_key] = ai_report_body
+    return ai_report_body
+
+
+def assemble_report(ai_report_body, video_url=None, stocks=None, economy_data=None, charts=None):
+    """[최종 조립] 영상(0) + 대시보드(1) + 종목 차트(pick_email_charts 결과) + AI분석(2~5)을 하나의 HTML 문서로 합칩니다."""
+    video_section_html = build_video_section_html(video_url, stocks)
+    dashboard_html     = build_dashboard_html(economy_data)
+    chart_section_html = build_chart_section_html(charts)
+    return f"""
         <html>
         <body style="font-family: 'Malgun Gothic', sans-serif; line-height: 1.6; color: #333;">
             {video_section_html}
             {dashboard_html}
+            {chart_section_html}
             {ai_report_body}
             <div style="margin-top: 50px; font-size: 0.8em; color: #888; text-align: center;">
                 Generated by AI Daily Briefing Agent
@@ -1260,11 +1808,55 @@ def generate_report(stocks, general_news, channel_videos, trend_videos, video_ur
         </body>
         </html>
         """
-        return final_html
+
+
+def generate_report(stocks, general_news, channel_videos, trend_videos, video_url=None, economy_data=None, charts=None):
+    """
+    CEO용 HTML 이메일 리포트를 생성합니다.
+    
+    Args:
+        stocks (list): AI 분석이 완료된 주식 데이터
+        general_news (list): 뉴스 데이터
+        channel_videos (list): 채널 기반 유튜브 영상
+        trend_videos (list): 키워드 기반 트렌드 영상
+        video_url (str): 유튜브 Shorts 영상 URL (선택)
+        economy_data (dict): 경제 인사이트 데이터 (선택)
+        charts (list): 본문에 넣을 종목 차트 [(심볼, 항목)] (선택, pick_email_charts 결과)
+    
+    Returns:
+        str: 완성된 HTML 리포트 문자열
     
+    [리포트 구조]
+    - Section 0: 1분 요약 영상 링크
+    - Section 1: Market Dashboard (히트맵, 공포지수, 경제 일정)
+    - Section 2: 관심 종목 분석
+    - Section 3: 뉴스 심층 분석
+    - Section 4: 유튜브 채널 인사이트
+    - Section 5: 트렌드 영상
+
+    [메모이제이션]
+    AI 본문(섹션 2~5)은 generate_report_body가 데이터별로 한 번만 생성하고,
+    영상 링크(섹션 0)와 대시보드(섹션 1)만 호출할 때마다 템플릿으로 채웁니다.
+    """
+    ai_report_body, error_html = report_body_or_error(stocks, general_news, channel_videos, trend_videos)
+    if error_html:
+        return error_html
+    return assemble_report(ai_report_body, video_url, stocks, economy_data, charts)
+
+
+def report_body_or_error(stocks, general_news, channel_videos, trend_videos):
+    """
+    AI 리포트 본문을 만들어 (본문, None)을, 실패하면 (None, 오류 안내 HTML)을 반환합니다.
+    (본문만 체크포인트에 저장해 두면 재개 실행의 메일 단계가 Gemini를 다시 호출하지 않음)
+    """
+    try:
+        return generate_report_body(stocks, general_news, channel_videos, trend_videos), None
+    except RuntimeError as e:
+        print(f"⚠️ {e}")
+        return None, "<p>리포트 생성 실패 (AI 응답 거부)</p>"
     except Exception as e:
         print(f"⚠️ 리포트 생성 실패: {e}")
-        return f"<p>리포트 생성 중 오류 발생: {e}</p>"
+        return None, f"<p>리포트 생성 중 오류 발생: {e}</p>"
 
 
 
@@ -1277,11 +1869,12 @@ def generate_report(stocks, general_news, channel_videos, trend_videos, video_ur
 # 
 # [이메일 구조]
 # - 본문: HTML 리포트 (CSS 스타일 포함)
-# - 첨부: S&P 500 히트맵 이미지 (cid: 프로토콜로 참조)
+# - 첨부: S&P 500 히트맵 이미지 + 종목 분봉 차트 (cid: 프로토콜로 참조)
 # - 수신자: BCC로 처리하여 수신자 간 이메일 주소 노출 방지
 # -----------------------------------------------------------------------------------------------------------------------------#
 
-def send_email(recipients, subject, html_body, attachment_path=None):
+@traced("smtp:send", "upload")
+def send_email(recipients, subject, html_body, attachment_path=None, inline_images=None):
     """
     HTML 리포트를 이메일로 발송합니다.
     
@@ -1290,6 +1883,7 @@ def send_email(recipients, subject, html_body, attachment_path=None):
         subject (str): 이메일 제목
         html_body (str): HTML 형식의 이메일 본문
         attachment_path (str): 첨부할 이미지 파일 경로 (선택)
+        inline_images (dict): 추가 인라인 이미지 {Content-ID: PNG 경로} (선택, 예: 종목 차트)
     
     [Gmail SMTP 설정]
     - 서버: smtp.gmail.com
@@ -1361,6 +1955,21 @@ def send_email(recipients, subject, html_body, attachment_path=None):
         except Exception as e:
             print(f"⚠️ 이미지 첨부 실패: {e}")
 
+    # 종목 차트 (cid:chart_{심볼})
+    attached = 0
+    for cid, path in (inline_images or {}).items():
+        try:
+            with open(path, 'rb') as f:
+                image = MIMEImage(f.read(), _subtype='png')
+            image.add_header('Content-ID', f'<{cid}>')
+            image.add_header('Content-Disposition', 'inline', filename=os.path.basename(path))
+            msg.attach(image)
+            attached += 1
+        except Exception as e:
+            print(f"⚠️ 차트 첨부 실패 ({cid}): {e}")
+    if attached:
+        print(f"   📎 종목 차트 {attached}개 첨부 완료")
+
     # [Step 4] Gmail SMTP로 발송
     # 587 포트 + STARTTLS 암호화 사용 (기존 방식 유지)
     try:
@@ -1557,14 +2166,17 @@ def html_to_youtube_description(html_content):
 # logos 폴더는 캐시 역할을 하므로 삭제하지 않습니다.
 # -----------------------------------------------------------------------------------------------------------------------------#
 
-def cleanup_files():
+def cleanup_files(keep_video=False):
     """
     이전 실행의 임시 파일 및 결과물을 삭제합니다.
     
+    Args:
+        keep_video (bool): True면 영상 파일(*.mp4)은 남김 (--resume 실행에서 완성된 영상/업로드 세션 재사용)
+    
     [삭제 대상]
-    - *.mp4: 생성된 영상 파일
+    - *.mp4: 생성된 영상 파일 (keep_video=False일 때)
     - *.mp3: TTS 음성 파일
-    - *_chart.png: 차트 이미지
+    - temp_charts/*.png: 이메일용 종목 차트 이미지
     - logo_temp.png: 임시 로고 파일
     
     [삭제하지 않는 파일]
@@ -1577,10 +2189,13 @@ def cleanup_files():
     patterns = [
         "*.mp4",       # 모든 동영상 파일 (daily_*.mp4 등)
         "*.mp3",       # 모든 음성 파일 (voice.mp3 등)
-        "*_chart.png", # 생성된 차트 이미지
+        os.path.join(CHART_DIR, "*.png"),  # 이메일용 종목 차트
         "logo_temp.png" # 혹시 모를 임시 로고
     ]
     
+    if keep_video:
+        patterns.remove("*.mp4")
+    
     # logos 폴더 안의 파일은 삭제하지 않습니다 (캐시 역할)
     
     for pattern in patterns:
@@ -1594,7 +2209,6 @@ def cleanup_files():
 
 
 
-
 # -----------------------------------------------------------------------------------------------------------------------------#
 # job (Final: Full Automation)
 # -----------------------------------------------------------------------------------------------------------------------------#
@@ -1602,27 +2216,261 @@ def cleanup_files():
 # 데이터 수집 → AI 분석 → 영상 제작 → 유튜브 업로드 → 이메일 발송까지 모든 과정을 자동으로 처리합니다.
 # Docker 컨테이너에서 매일 지정된 시간에 실행되며, 1회 실행 후 종료됩니다 (One-Shot Mode).
 #
-# [전체 실행 흐름]
+# [전체 실행 흐름] (StageScheduler가 입력이 준비된 단계부터 동시에 실행)
 # 1. 임시 파일 정리 (이전 실행 결과물 삭제)
-# 2. 데이터 수집 (주식, 뉴스, 유튜브, 경제 지표)
-# 3. AI 분석 및 대본 생성
-# 4. 영상 제작 (video_studio 모듈)
-# 5. 유튜브 Shorts 업로드
-# 6. 이메일 리포트 발송
+# 2. collect_* / capture_map : 데이터 수집 (주식, 뉴스, 유튜브, 경제 지표, 분봉, 히트맵) - 모두 독립, 동시 실행
+# 3. analyze / charts        : AI 분석 및 대본 생성 (수집 완료 후) / 전 종목 분봉 차트 (분봉 수집 직후, 분석과 동시)
+# 4. report / render         : 리포트 본문 생성과 영상 제작이 동시에 진행
+# 5. upload                  : 유튜브 Shorts 업로드 (영상 + 리포트 설명문)
+# 6. email                   : 이메일 리포트 발송 (영상 URL 확정 후)
+#
+# [설정] config.json
+# - collect_config : 수집 단계 타임아웃 {default_timeout, timeouts: {stocks, news, channels, trends, economy, intraday, map}}
+# - chart_config   : 종목 차트 {workers: 렌더링 프로세스 수, email_limit: 메일에 넣을 차트 수}
+# - stage_config   : 그 외 단계 {max_workers, timeouts: {단계 이름: 초}, retries: {단계 이름: 횟수}}
+# - render_config  : 영상 {scene_workers, encoder_profile: production/fast/draft, encoder_profiles: {이름: 덮어쓸 값}}
+#
+# [체크포인트] 모든 단계 결과는 checkpoints/{날짜}/ 에 저장되며, python agent.py --resume 으로 실행하면
+# 입력이 같은 단계는 저장된 결과를 쓰고 건너뜁니다. (수집/분석/리포트/영상(씬 세그먼트 포함)/업로드 URL/메일 발송 여부)
 # -----------------------------------------------------------------------------------------------------------------------------#
 
-def job():
+def build_pipeline(config, today_str, checkpoints=None):
+    """
+    job()의 단계 그래프(Stage 리스트)를 만듭니다.
+
+    Args:
+        checkpoints (CheckpointStore): 지정하면 각 단계 결과를 저장하고, resume 모드면 유효한 단계를 건너뜀
+
+    Returns:
+        list: Stage 리스트
+    """
+    collect_config  = config.get('collect_config', {})
+    stage_config    = config.get('stage_config', {})
+    stage_timeouts  = stage_config.get('timeouts', {})
+    stage_retries   = stage_config.get('retries', {})
+    chart_config    = config.get('chart_config', {})
+    render_config   = config.get('render_config', {})
+    video_title     = "글로벌 증시 브리핑"
+
+    def collect(name, func, args, default=list):
+        """수집 단계 (실패/타임아웃 시 기본값으로 대체되어 분석은 계속 진행)"""
+        timeout = collect_config.get('timeouts', {}).get(name, collect_config.get('default_timeout', 300))
+        return Stage(f'collect_{name}', lambda: func(*args), timeout=timeout, default=default)
+
+    def stage(name, func, deps):
+        return Stage(name, func, deps, timeout=stage_timeouts.get(name), retries=stage_retries.get(name, 0))
+
+    # ========================================================================================
+    # [Phase 2] AI 분석 및 대본 생성
+    # ========================================================================================
+    def analyze(collect_stocks, collect_news, collect_channels, collect_trends, collect_economy):
+        all_youtube = collect_channels + collect_trends   # 모든 유튜브 합치기
+        if not (collect_stocks or collect_news or all_youtube):
+            # 수집된 데이터가 전혀 없는 경우 (API 장애, 휴장일 등)
+            print("💤 수집된 데이터가 없습니다.")
+            return None
+
+        # [스트리밍 모드] 대본(scripts.sceneN)이 하나씩 완성될 때마다 해당 씬 음성 합성을 미리 시작
+        on_script = None
+        if config.get('analysis_config', {}).get('stream', True) and hasattr(video_studio, 'prefetch_scene_audio'):
+            on_script = lambda scene, text: video_studio.prefetch_scene_audio(text)
+
+        # analyze_and_summarize에서 데이터 분석 + 영상 대본까지 한 번에 생성
+        stocks, general_news, all_youtube, economy_data, generated_scripts = analyze_and_summarize(
+            collect_stocks, collect_news, all_youtube, collect_economy,
+            budget_config = config.get('prompt_budget'),
+            on_script     = on_script
+        )
+        print(f"🎬 대본 및 콘텐츠 확정: {video_title}")
+        return {
+            'stocks'  : stocks,
+            'news'    : general_news,
+            'youtube' : all_youtube,
+            'economy' : economy_data,
+            'scripts' : generated_scripts,
+            'channels': collect_channels,
+            'trends'  : collect_trends,
+        }
+
+    # ========================================================================================
+    # [Phase 3] 리포트 본문 (영상 제작과 동시에 진행, AI 본문은 이메일 단계에서 재사용)
+    # ========================================================================================
+    def report(analyze):
+        if not analyze: return None
+        body, error_html = report_body_or_error(analyze['stocks'], analyze['news'], analyze['channels'], analyze['trends'])
+        return {
+            'body': body,   # AI 본문 (섹션 2~5, 실패 시 None)
+            'html': error_html or assemble_report(body, None, analyze['stocks'], analyze['economy']),   # 유튜브 설명용
+        }
+
+    # ========================================================================================
+    # [Phase 2] 종목 차트 (수집된 분봉으로 전 종목을 프로세스 풀에서 렌더링, 이메일용 PNG)
+    # ========================================================================================
+    def charts(collect_intraday):
+        if not collect_intraday: return {}
+        rendered = chart_engine.render_charts(collect_intraday, size=chart_engine.EMAIL_CHART_SIZE,
+                                              workers=chart_config.get('workers'), png_dir=CHART_DIR, keep_rgba=False)
+        print(f"📊 종목 차트 {len(rendered)}개 생성")
+        return {symbol: {'png': r['png'], 'price': r['info']['price'], 'pct': round(r['info']['pct'], 2),
+                         'color': r['info']['color']} for symbol, r in rendered.items()}
+
+    # ========================================================================================
+    # [Phase 3] 영상 제작
+    # ========================================================================================
+    def render(analyze, capture_map, collect_intraday):
+        if not analyze: return None
+        if not hasattr(video_studio, 'make_video_module'):
+            print("⚠️ video_studio 모듈 오류: make_video_module 함수가 없습니다.")
+            return None
+
+        # video_studio에 전달할 구조화된 데이터
+        structured_data = {
+            'stocks'   : analyze['stocks'],
+            'news'     : analyze['news'],
+            'youtube'  : analyze['youtube'],
+            'economy'  : analyze['economy'],
+            'map_image': capture_map or None,  # 캡처 실패 시 video_studio에서 재시도
+            'intraday' : collect_intraday      # 씬 4 차트용 분봉 (없는 종목은 video_studio에서 직접 조회)
+        }
+        video_file = video_studio.make_video_module(
+            scene_scripts   = analyze['scripts'],  # AI가 생성한 6개 씬 대본
+            structured_data = structured_data,     # 시각화에 필요한 데이터
+            date_str        = today_str,           # 날짜 문자열
+            scene_workers     = render_config.get('scene_workers', 1),   # 씬 병렬 렌더링 프로세스 수
+            segment_dir       = checkpoints.segment_dir() if checkpoints else None,  # 씬 세그먼트 보관 (항상 저장)
+            reuse_segments    = bool(checkpoints and checkpoints.resume),             # --resume일 때만 씬 단위 재사용
+            encoder_profile   = render_config.get('encoder_profile'),    # production / fast / draft
+            profile_overrides = render_config.get('encoder_profiles')    # 프로필별 덮어쓰기 값 (선택)
+        )
+
+        # 영상 완료 후 맵 이미지가 생성되었는지 확인
+        if not os.path.exists("tradingview_map.png"):
+            print("⚠️ 맵 이미지를 찾을 수 없음. 메일 첨부 실패 가능성.")
+        if not (video_file and os.path.exists(video_file)):
+            print("⚠️ 생성된 영상 파일이 없거나 video_studio에서 반환되지 않았습니다.")
+            return None
+        return video_file
+
+    # ========================================================================================
+    # [Phase 4] 유튜브 업로드
+    # ========================================================================================
+    def upload(render, report):
+        if not render: return None
+        if render_config.get('encoder_profile') == 'draft':
+            # 미리보기용 저화질 영상은 업로드하지 않음 (메일도 영상 URL이 없어 발송 생략)
+            print(f"⏩ draft 프로필 - 유튜브 업로드 생략 (미리보기: {render})")
+            return None
+        print("📤 유튜브 업로드 시작...")
+        # 유튜브 설명용 텍스트 생성 (HTML → 플레인 텍스트 + AI 고지)
+        desc_text = html_to_youtube_description(report['html'])
+
+        # youtube_manager 모듈로 Shorts 업로드
+        video_url = youtube_manager.upload_short(
+            render,
+            title         = f"{today_str}일자- {video_title}",
+            description   = desc_text,
+            upload_config = config.get('upload_config')   # 청크 크기/재시도 (없으면 기본값)
+        )
+        if video_url:
+            get_youtube_client().record('videos.insert')   # 업로드는 youtube_manager(OAuth)로 나가므로 사용량만 기록
+        print(f"✅ 업로드 완료: {video_url}")
+        return video_url
+
+    # ========================================================================================
+    # [Phase 5] 이메일 리포트 발송
+    # ========================================================================================
+    def email(analyze, upload, report, charts):
+        if not analyze: return None
+        if not upload:
+            print("⚠️ 영상 URL 없음. 리포트 발송 스킵.")
+            return None
+
+        print("📧 리포트 배포 준비...")
+        picked = pick_email_charts(charts, chart_config.get('email_limit', 6))   # 등락폭 상위 종목 차트
+        # 영상 URL이 포함된 최종 리포트 생성 (report 단계의 AI 본문 + 영상 링크 섹션 템플릿)
+        if report and report['body']:
+            final_report = assemble_report(report['body'], upload, analyze['stocks'], analyze['economy'], picked)
+        else:
+            final_report = generate_report(analyze['stocks'], analyze['news'], analyze['channels'], analyze['trends'],
+                                           upload, economy_data=analyze['economy'], charts=picked)
+        # 인자 순서: 수신자목록, 제목, HTML본문, 첨부파일경로
+        send_email(
+            recipients      = config.get('email_recipients', []),
+            subject         = f"[Insight] {today_str} 글로벌 증시 브리핑",
+            html_body       = final_report,
+            attachment_path = "tradingview_map.png",  # 수집 단계에서 캡처한 히트맵 이미지
+            inline_images   = {f"chart_{symbol}": entry['png'] for symbol, entry in picked}
+        )
+        return True
+
+    stages = [
+        # [Phase 1] 데이터 수집 - 서로 다른 소스를 호출하므로 모두 동시에 실행
+        collect('stocks'  , collect_stock_data          , (config.get('stock_tickers', []),)),       # 주식 시세 + 관련 뉴스
+        collect('news'    , fetch_news_raw              , (config.get('news_keywords', []), 3)),     # 일반 뉴스
+        collect('channels', collect_channel_youtube_data, (config.get('youtube_channels', {}),)),    # 채널 유튜브
+        collect('trends'  , collect_keyword_youtube_data, (config.get('youtube_keywords', []),)),    # 트렌드 유튜브
+        collect('economy' , collect_economy_data        , ()),                                       # 경제 지표 + 공포지수
+        collect('intraday', collect_intraday_data       , (config.get('stock_tickers', []),), dict), # 차트용 당일 5분봉
+        Stage('capture_map', video_studio.capture_tradingview_map, default=str,                      # 히트맵 (공포지수와 병렬 탭)
+              timeout=collect_config.get('timeouts', {}).get('map', collect_config.get('default_timeout', 300))),
+
+        stage('analyze', analyze, ['collect_stocks', 'collect_news', 'collect_channels', 'collect_trends', 'collect_economy']),
+        Stage('charts', charts, ['collect_intraday'], timeout=stage_timeouts.get('charts'), default=dict),   # 실패해도 메일은 발송
+        stage('report' , report , ['analyze']),
+        stage('render' , render , ['analyze', 'capture_map', 'collect_intraday']),
+        stage('upload' , upload , ['render', 'report']),
+        stage('email'  , email  , ['analyze', 'upload', 'report', 'charts']),
+    ]
+    if checkpoints is None:
+        return stages
+
+    # 단계별로 결과에 영향을 주는 설정 (바뀌면 해당 단계 체크포인트 무효)
+    params = {
+        'collect_stocks'  : config.get('stock_tickers', []),
+        'collect_news'    : config.get('news_keywords', []),
+        'collect_channels': config.get('youtube_channels', {}),
+        'collect_trends'  : config.get('youtube_keywords', []),
+        'collect_intraday': config.get('stock_tickers', []),
+        'analyze'         : [config.get('prompt_budget'), getattr(model, 'model_name', None)],
+        'render'          : [config.get('render_config'), config.get('tts_config')],
+        'upload'          : video_title,
+        'email'           : config.get('email_recipients', []),
+    }
+    files = {
+        'capture_map': lambda path: [path],   # 히트맵 PNG (메일 첨부)
+        'charts'     : lambda charts: [c['png'] for c in charts.values()],   # 종목 차트 PNG (메일 첨부)
+        'render'     : lambda path: [path],   # 완성 영상 MP4
+    }
+    valid = {
+        'render'     : lambda path: not video_studio.last_failed_scenes,   # 씬이나 내레이션이 빠진 영상은 저장하지 않음
+        'capture_map': lambda path: bool(path) and os.path.exists(path),   # 캡처 실패("")는 저장하지 않음
+    }
+    # 수집기는 오류를 삼키고 []/{}를 반환하므로, 빈 수집 결과는 저장하지 않음 (--resume에서 다시 수집)
+    valid.update({s.name: bool for s in stages if s.name.startswith('collect_')})
+    return [checkpoints.wrap(s, params=params.get(s.name), files=files.get(s.name), valid=valid.get(s.name)) for s in stages]
+
+
+def job(resume=False, profile=None):
     """
     데일리 브리핑의 전체 파이프라인을 실행합니다.
     
-    모든 단계가 try-except로 보호되어 있어 일부 단계 실패 시에도 
-    가능한 부분까지 진행됩니다.
+    각 단계는 StageScheduler가 의존성 순서대로 실행하며, 일부 단계 실패 시에도
+    가능한 부분까지 진행됩니다. (실행 후 단계별 소요 시간과 임계 경로 출력)
+
+    Args:
+        resume (bool): True면 오늘 체크포인트 중 입력이 같은 단계는 건너뜀 (영상 파일도 지우지 않음)
+        profile (str): 인코더 프로필 (production / fast / draft, 지정 시 render_config.encoder_profile 대신 사용)
+
+    Returns:
+        dict: {단계 이름: StageResult} (설정 파일이 없으면 None)
     """
     print(f"\n🚀 [Final] 데일리 브리핑 시작: {datetime.now()}")
+    tracing.start_run()  # 구간 측정 시작 (종료 시 traces/ 에 Chrome 트레이스 저장)
     
     # [Step 0] 시작 전 임시 파일 정리
-    # 이전 실행에서 생성된 mp4, mp3, 차트 이미지 등을 삭제
-    cleanup_files()
+    # 이전 실행에서 생성된 mp4, mp3, 차트 이미지 등을 삭제 (재개 모드에서는 완성 영상 유지)
+    cleanup_files(keep_video=resume)
+    reset_news_dedup()
     
     # [Step 1] 설정 파일 로드
     config = load_config()
@@ -1630,119 +2478,37 @@ def job():
         print("❌ 설정 파일(config.json)을 찾을 수 없습니다.")
         return
     
-    today_str        = datetime.now(pytz.timezone('Asia/Seoul')).strftime("%Y-%m-%d")
-    
-    # ========================================================================================
-    # [Phase 1] 데이터 수집
-    # ========================================================================================
-    # 각 함수는 독립적으로 데이터를 수집하며, 일부 실패해도 다른 데이터로 진행 가능
-    stocks           = collect_stock_data(config.get('stock_tickers', []))          # 주식 시세 + 관련 뉴스
-    general_news     = fetch_news_raw(config.get('news_keywords', []), limit=3)     # 일반 뉴스
-    channel_videos   = collect_channel_youtube_data(config.get('youtube_channels', {}))  # 채널 유튜브
-    trend_videos     = collect_keyword_youtube_data(config.get('youtube_keywords', []))  # 트렌드 유튜브
-    all_youtube      = channel_videos + trend_videos                                # 모든 유튜브 합치기
-    economy_news_raw = collect_economy_data()                                       # 경제 지표 + 공포지수
-    
-    # 수집된 데이터가 하나라도 있으면 진행
-    if stocks or general_news or all_youtube:
-        try:
-            # [수정 1] 변수 미리 초기화 (에러 방지용)
-            # 영상 업로드 실패 시에도 이메일 발송 단계에서 에러 방지
-            video_url = None 
-            
-            # ========================================================================================
-            # [Phase 2] AI 분석 및 대본 생성
-            # ========================================================================================
-            # analyze_and_summarize에서 데이터 분석 + 영상 대본까지 한 번에 생성
-            stocks, general_news, all_youtube, economy_data, generated_scripts = analyze_and_summarize(stocks, general_news, all_youtube, economy_news_raw)
-            
-            video_title = "글로벌 증시 브리핑"
-            print(f"🎬 대본 및 콘텐츠 확정: {video_title}")
-            
-            # video_studio에 전달할 구조화된 데이터
-            structured_data = {
-                'stocks'  : stocks,
-                'news'    : general_news,
-                'youtube' : all_youtube,
-                'economy' : economy_data
-            }
-
-            # ========================================================================================
-            # [Phase 3] 영상 제작
-            # ========================================================================================
-            map_image_path = "tradingview_map.png"  # 캡처된 히트맵 파일명 예상
-
-            # video_studio 모듈의 make_video_module 함수 호출
-            if hasattr(video_studio, 'make_video_module'):
-                # TTS 설정 전달 (Qwen3-TTS API 서버 설정)
-                tts_config = config.get('tts_config', {})
-                if hasattr(video_studio, 'set_tts_config'):
-                    video_studio.set_tts_config(tts_config)
-                    print(f"🔊 TTS 설정 적용: {tts_config.get('server_url', 'http://localhost:8002')}")
-                
-                video_file = video_studio.make_video_module(
-                    scene_scripts   = generated_scripts,   # AI가 생성한 6개 씬 대본
-                    structured_data = structured_data,     # 시각화에 필요한 데이터
-                    date_str        = today_str            # 날짜 문자열
-                )                
-                
-                # 영상 완료 후 맵 이미지가 생성되었는지 확인 (video_studio 내부에서 capture 수행함)
-                if not os.path.exists(map_image_path):
-                    print("⚠️ 맵 이미지를 찾을 수 없음. 메일 첨부 실패 가능성.")
-
-                # ========================================================================================
-                # [Phase 4] 유튜브 업로드
-                # ========================================================================================
-                if video_file and os.path.exists(video_file):
-                    
-                    print("📤 유튜브 업로드 시작...")
-                    # 유튜브 설명용 텍스트 생성 (HTML → 플레인 텍스트 + AI 고지)
-                    temp_report = generate_report(stocks, general_news, channel_videos, trend_videos, video_url=None, economy_data=economy_data)
-                    desc_text   = html_to_youtube_description(temp_report)
-                    
-                    # youtube_manager 모듈로 Shorts 업로드
-                    video_url = youtube_manager.upload_short(
-                        video_file, 
-                        title       = f"{today_str}일자- {video_title}", 
-                        description = desc_text
-                    )
-                    print(f"✅ 업로드 완료: {video_url}")
-                else:
-                    print("⚠️ 생성된 영상 파일이 없거나 video_studio에서 반환되지 않았습니다.")
-            else:
-                print("⚠️ video_studio 모듈 오류: make_video_module 함수가 없습니다.")
-            
-            # ========================================================================================
-            # [Phase 5] 이메일 리포트 발송
-            # ========================================================================================
-            # video_url이 None이어도 안전하게 체크
-            if video_url:
-                print("📧 리포트 배포 준비...")
-                # 영상 URL이 포함된 최종 리포트 생성
-                report = generate_report(stocks, general_news, channel_videos, trend_videos, video_url, economy_data=economy_data)
-                # [수정된 호출 방식]
-                # 인자 순서: 수신자목록, 제목, HTML본문, 첨부파일경로
-                send_email(
-                    recipients      = config.get('email_recipients', []), 
-                    subject         = f"[Insight] {today_str} 글로벌 증시 브리핑", 
-                    html_body       = report, 
-                    attachment_path = "tradingview_map.png"  # video_studio가 만든 히트맵 이미지
-                )
-                
-            else:
-                print("⚠️ 영상 URL 없음. 리포트 발송 스킵.")
-
-        except Exception as e:
-            # 전체 프로세스 중 예외 발생 시 스택 트레이스 출력
-            print(f"⚠️ 전체 프로세스 중 에러: {e}")
-            import traceback
-            traceback.print_exc()
-            
-    else:
-        # 수집된 데이터가 전혀 없는 경우 (API 장애, 휴장일 등)
-        print("💤 수집된 데이터가 없습니다.")
+    today_str = datetime.now(pytz.timezone('Asia/Seoul')).strftime("%Y-%m-%d")
 
+    # 명령줄 인코더 프로필 (render 단계 체크포인트 키에도 반영되도록 설정에 기록)
+    if profile:
+        config['render_config'] = dict(config.get('render_config', {}), encoder_profile=profile)
+
+    # TTS 설정 전달 (Qwen3-TTS API 서버 설정) - 스트리밍 분석 중 음성 미리 합성에도 사용되므로 먼저 적용
+    tts_config = config.get('tts_config', {})
+    if hasattr(video_studio, 'set_tts_config'):
+        video_studio.set_tts_config(tts_config)
+        print(f"🔊 TTS 설정 적용: {tts_config.get('server_url', 'http://localhost:8002')}")
+
+    # YouTube Data API 할당량 설정 (수집 예산 = daily_quota - upload_reserve)
+    set_youtube_config(config.get('youtube_config', {}))
+
+    # 단계별 체크포인트 (날짜별 폴더, 오래된 날짜는 정리)
+    checkpoints = CheckpointStore(today_str, resume=resume)
+    checkpoints.prune()
+
+    # [Step 2] 단계 그래프 실행
+    results = StageScheduler(
+        build_pipeline(config, today_str, checkpoints),
+        max_workers = config.get('stage_config', {}).get('max_workers', 8)
+    ).run()
+
+    print(f"🧹 뉴스 중복 제거: {get_news_dedup().summary()}")
+    print(f"📺 YouTube API 사용량: {get_youtube_client().quota_summary()}")
+    print(f"💾 체크포인트: {checkpoints.summary()}")
+    tracing.export()
     print("🏁 [Final] 모든 작업 완료\n")
+    return results
 
 
 
@@ -1760,10 +2526,16 @@ def job():
 # -----------------------------------------------------------------------------------------------------------------------------#
 
 if __name__ == "__main__":
-    print(f"[{datetime.now()}] 데일리 브리핑 에이전트 실행 (One-Shot Mode)")
+    parser = argparse.ArgumentParser(description="데일리 브리핑 에이전트 (One-Shot)")
+    parser.add_argument('--resume', action='store_true', help="오늘 체크포인트가 있는 단계는 건너뛰고 실패한 단계부터 다시 실행")
+    parser.add_argument('--profile', choices=sorted(video_studio.ENCODER_PROFILES),
+                        help="인코더 프로필 (기본값: render_config.encoder_profile 또는 production, draft는 업로드 생략)")
+    args   = parser.parse_args()
+
+    print(f"[{datetime.now()}] 데일리 브리핑 에이전트 실행 (One-Shot Mode{', Resume' if args.resume else ''})")
 
     # job 함수를 1회 실행
-    job()
+    job(resume=args.resume, profile=args.profile)
 
     print(f"[{datetime.now()}] 모든 작업 완료. 프로세스를 종료합니다.")
     # 루프 없이 여기서 프로그램이 끝나면, 도커 컨테이너도 자동으로 꺼집니다.
@@ -0,0 +1,193 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Audio Engine (씬 음성 PCM 버퍼)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# TTS 결과(문장별 오디오 파일 bytes)를 디스크에 쓰지 않고 메모리에서 PCM으로 디코딩한 뒤,
+# 씬 하나의 모든 문장을 NumPy 버퍼 1개에 이어 붙여 MoviePy AudioArrayClip 1개로 넘깁니다.
+# (문장마다 mp3 파일 + AudioFileClip(ffmpeg 리더 프로세스)을 열어 두던 방식 대체)
+#
+# [디코딩]
+# - PCM WAV (Qwen3-TTS 서버/대역 서버 기본 응답): 표준 wave 모듈로 프로세스 안에서 바로 읽음
+# - 그 외 형식 (mp3, float WAV 등): ffmpeg 1회 파이프 호출로 f32le PCM 변환 (호출이 끝나면 프로세스 종료)
+# - 모두 AUDIO_FPS(44.1kHz) 모노로 맞춘 뒤 스테레오로 복제 (MoviePy 오디오 기본 형식과 동일, 인덱싱이 샘플 단위로 정확)
+#
+# [씬 버퍼]
+# - 문장 시작 위치는 샘플 단위 정수 오프셋 (자막 시작/길이도 여기서 계산 → 누적 오차 없음)
+# - 문장 사이에 sentence_gap초 무음 삽입
+# - 음량 정규화: 문장별 RMS를 target_dbfs로 맞추되 피크가 peak_dbfs를 넘지 않도록 제한
+#   (np.add.reduceat / np.maximum.reduceat으로 전 문장을 한 번에 계산)
+#
+# [설정] tts_config (선택)
+#   {"target_dbfs": -20.0, "peak_dbfs": -1.0, "sentence_gap": 0.15}
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import io
+import wave
+import subprocess
+
+import numpy as np
+
+from moviepy.audio.AudioClip import AudioArrayClip
+from moviepy.config import get_setting
+
+from tracing import span
+
+
+AUDIO_FPS           = 44100     # MoviePy write_videofile 기본 오디오 샘플레이트 (다르면 프레임 인덱싱이 최근접 샘플로 뭉개짐)
+DEFAULT_TARGET_DBFS = -20.0     # 문장별 목표 RMS 음량
+DEFAULT_PEAK_DBFS   = -1.0      # 정규화 후 피크 상한 (클리핑 방지)
+DEFAULT_GAP_SECONDS = 0.15      # 문장 사이 무음
+
+
+def _db_to_gain(db):
+    return 10.0 ** (db / 20.0)
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 디코딩
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def _resample(samples, rate, target=AUDIO_FPS):
+    """선형 보간 리샘플링 (음성 대역에서는 충분, 같은 레이트면 그대로)"""
+    if rate == target or len(samples) == 0:
+        return samples
+    count = int(round(len(samples) * target / rate))
+    return np.interp(np.arange(count) * (rate / target), np.arange(len(samples)), samples).astype(np.float32)
+
+
+def _decode_wav(data):
+    """PCM WAV bytes → (float32 모노, 샘플레이트). PCM이 아니면 wave.Error"""
+    with wave.open(io.BytesIO(data), 'rb') as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw                   = w.readframes(w.getnframes())
+    if width == 1:
+        pcm = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        pcm = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 3:
+        b   = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        pcm = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 8388608.0
+    elif width == 4:
+        pcm = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise wave.Error(f"지원하지 않는 샘플 크기: {width}")
+    if channels > 1:
+        pcm = pcm[:len(pcm) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return pcm, rate
+
+
+def _decode_ffmpeg(data):
+    """ffmpeg 파이프로 임의 형식을 AUDIO_FPS f32le 모노로 변환합니다. (임시 파일 없음)"""
+    cmd = [get_setting("FFMPEG_BINARY"), "-loglevel", "error", "-i", "pipe:0",
+           "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(AUDIO_FPS), "pipe:1"]
+    with span("ffmpeg:decode_audio", "tts", bytes=len(data)):
+        result = subprocess.run(cmd, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise ValueError(f"ffmpeg 디코딩 실패: {result.stderr.decode('utf-8', 'replace').strip()[-200:]}")
+    return np.frombuffer(result.stdout, dtype='<f4').copy()
+
+
+def decode_pcm(data):
+    """
+    TTS 응답 bytes를 AUDIO_FPS 모노 float32 PCM으로 디코딩합니다.
+
+    Returns:
+        np.ndarray: -1.0 ~ 1.0 범위 float32 1차원 배열
+
+    Raises:
+        ValueError: ffmpeg도 디코딩하지 못한 경우
+    """
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        try:
+            pcm, rate = _decode_wav(data)
+            return _resample(pcm, rate)
+        except (wave.Error, EOFError):
+            pass   # float WAV 등 wave 모듈이 못 읽는 형식
+    return _decode_ffmpeg(data)
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 씬 버퍼
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+class SceneAudio:
+    """
+    씬 하나의 문장 음성을 이어 붙인 PCM 버퍼입니다.
+
+    Attributes:
+        samples (np.ndarray): (N, 2) float32 스테레오 버퍼
+        starts (list): 문장별 시작 위치 (초, 샘플 오프셋 / AUDIO_FPS)
+        durations (list): 문장별 표시 길이 (초, 다음 문장 시작까지 = 음성 + 문장 사이 무음)
+        indices (list): 버퍼에 들어간 문장의 원래 순번 (디코딩 실패 문장 제외)
+    """
+
+    def __init__(self, samples, starts, durations, indices):
+        self.samples   = samples
+        self.starts    = starts
+        self.durations = durations
+        self.indices   = indices
+
+    @property
+    def duration(self):
+        return len(self.samples) / AUDIO_FPS
+
+    def clip(self):
+        """MoviePy AudioArrayClip (씬당 1개, 외부 프로세스/파일 없음)"""
+        return AudioArrayClip(self.samples, fps=AUDIO_FPS)
+
+
+def build_scene_audio(voices, tts_config=None):
+    """
+    문장별 TTS 결과를 하나의 정규화된 PCM 버퍼로 합칩니다.
+
+    Args:
+        voices (list): 문장 순서의 TTS 결과 (bytes 또는 실패 시 Exception - synthesize_many 반환값)
+        tts_config (dict): target_dbfs / peak_dbfs / sentence_gap (선택)
+
+    Returns:
+        SceneAudio: 디코딩된 문장이 하나도 없으면 None
+    """
+    tts_config = tts_config or {}
+    target     = _db_to_gain(float(tts_config.get('target_dbfs', DEFAULT_TARGET_DBFS)))
+    ceiling    = _db_to_gain(float(tts_config.get('peak_dbfs', DEFAULT_PEAK_DBFS)))
+    gap        = int(round(float(tts_config.get('sentence_gap', DEFAULT_GAP_SECONDS)) * AUDIO_FPS))
+
+    pieces, indices = [], []
+    for i, voice in enumerate(voices):
+        if isinstance(voice, Exception): continue
+        try:
+            pcm = decode_pcm(voice)
+        except Exception as e:
+            print(f"⚠️ 음성 디코딩 실패 (문장 {i + 1}): {e}")
+            continue
+        if len(pcm):
+            pieces.append(pcm)
+            indices.append(i)
+    if not pieces:
+        return None
+
+    with span("audio:scene_buffer", "tts", sentences=len(pieces)):
+        # 문장 시작 오프셋 (샘플 단위): 앞 문장 길이 + 문장 사이 무음 누적
+        lengths = np.array([len(p) for p in pieces], dtype=np.int64)
+        starts  = np.concatenate([[0], np.cumsum(lengths[:-1] + gap)])
+        total   = int(starts[-1] + lengths[-1])
+
+        mono = np.zeros(total, dtype=np.float32)
+        for start, pcm in zip(starts, pieces):
+            mono[start:start + len(pcm)] = pcm
+
+        # 문장별 RMS/피크 → 이득 (무음 구간은 reduceat 범위에서 제외하기 위해 문장 구간 경계만 사용)
+        bounds = np.stack([starts, starts + lengths], axis=1).ravel()
+        energy = np.add.reduceat(mono.astype(np.float64) ** 2, bounds[:-1])[::2]
+        peak   = np.maximum.reduceat(np.abs(mono), bounds[:-1])[::2]
+        rms    = np.sqrt(energy / lengths)
+        gain   = np.minimum(np.where(rms > 1e-6, target / np.maximum(rms, 1e-6), 1.0),
+                            np.where(peak > 0, ceiling / np.maximum(peak, 1e-9), 1.0)).astype(np.float32)
+
+        # 구간(문장, 무음, 문장, ..., 문장)별 이득을 샘플 단위로 펼쳐 한 번에 곱함 (무음 구간은 0이라 이득 1)
+        seg_gain = np.ones(2 * len(gain) - 1, dtype=np.float32)
+        seg_gain[::2] = gain
+        mono    *= np.repeat(seg_gain, np.diff(bounds))
+        samples  = np.repeat(mono[:, None], 2, axis=1)
+
+    shown = np.append(starts[1:] - starts[:-1], lengths[-1])   # 자막은 다음 문장 시작까지 표시
+    return SceneAudio(samples, (starts / AUDIO_FPS).tolist(), (shown / AUDIO_FPS).tolist(), indices)
@@ -0,0 +1,386 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Benchmark (오프라인 전체 파이프라인 벤치마크)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 외부 서비스를 모두 로컬 대역으로 바꾼 뒤 실제 agent.job()을 처음부터 끝까지 실행하고,
+# 관심 종목 수(기본 5 / 50 / 500)별로 단계 소요 시간, 최대 메모리, 완성 영상 길이를 비교합니다.
+#
+# [대역 구성]
+# - Google News RSS / 기사  : stub_servers.start_news_stub (결정적 RSS + 기사 HTML, trafilatura 추출은 실제로 수행)
+# - YouTube Data API        : stub_servers.start_youtube_stub (googleapiclient가 실제로 호출)
+# - 유튜브 자막             : 대역 영상 ID의 자막을 자막 캐시에 미리 채움
+# - Yahoo Finance           : 5일 종가와 2일치 5분봉은 QUOTE_FIXTURE_DIR 픽스처(replay), 그 밖의 직접 조회는 FixtureFinance
+# - 장 운영 여부            : 항상 개장일로 고정 (요일과 무관하게 같은 경로를 측정)
+# - CNN 공포지수/히트맵     : fixtures/browser 페이지 (Chromium이 없으면 기존 실패 처리 경로로 진행)
+# - Gemini                  : fake_llm.FakeGeminiModel (스트리밍 포함)
+# - Qwen3-TTS               : stub_servers.start_tts_stub (문장 길이에 비례하는 톤 WAV)
+# - YouTube 업로드         : start_youtube_stub의 재개 가능 업로드 (청크 전송 경로를 실제로 수행)
+# - 이메일                 : 호출 내용만 기록 (외부로 아무것도 보내지 않음)
+#
+# [실행]
+#   python benchmark.py                          # 5, 50, 500 종목
+#   python benchmark.py --sizes 5,50 --keep      # 작업 폴더(영상, 트레이스, 로그) 보존
+#   python benchmark.py --llm-latency 20 --tts-latency 0.5   # 실제 API 지연 흉내
+#   python benchmark.py --sizes 50 --resume      # 같은 작업 폴더에서 job(resume=True) 재실행 시간도 측정
+#   python benchmark.py --sizes 5 --profile draft # 인코더 프로필별 렌더링 시간 비교 (production / fast / draft)
+#
+# 종목 수마다 별도 프로세스에서 실행하므로 peak RSS는 해당 실행만의 값입니다.
+# 각 실행의 Chrome 트레이스는 {작업 폴더}/n{종목 수}/traces/ 에 저장됩니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import sys
+import json
+import glob
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import resource
+import subprocess
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+
+REPO_DIR      = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [5, 50, 500]
+
+NEWS_KEYWORDS    = ["Global Economy", "US Stock Market", "Fed Interest Rate", "AI Technology"]
+YOUTUBE_CHANNELS = {"Stub Channel A": "UCstubchannel000A", "Stub Channel B": "UCstubchannel000B", "Stub Channel C": "UCstubchannel000C"}
+YOUTUBE_KEYWORDS = ["AI 기술 핫 트렌드", "미국 증시 전망", "반도체 업황"]
+
+
+def bench_tickers(n):
+    """결정적인 가상 종목 심볼 n개"""
+    return [f"TK{i:03d}" for i in range(n)]
+
+
+def bench_config(n_tickers, tts_url, scene_workers, encoder_profile='production'):
+    """config_sample.json과 같은 구조의 벤치마크용 설정"""
+    return {
+        "email_recipients": ["bench@example.com"],
+        "youtube_channels": YOUTUBE_CHANNELS,
+        "stock_tickers"   : bench_tickers(n_tickers),
+        "news_keywords"   : NEWS_KEYWORDS,
+        "youtube_keywords": YOUTUBE_KEYWORDS,
+        "tts_config"      : {"server_url": tts_url, "voice_name": "bench", "max_parallel": 4},
+        "render_config"   : {"scene_workers": scene_workers, "encoder_profile": encoder_profile},
+        "collect_config"  : {"default_timeout": 600, "timeouts": {"economy": 120}},
+        "stage_config"    : {"max_workers": 8, "timeouts": {"analyze": 900, "render": 3600}},
+        "analysis_config" : {"stream": True},
+    }
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 시세 / 자막 픽스처
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def _symbol_rng(symbol, salt=''):
+    return random.Random(f"{symbol}|{salt}")
+
+
+def write_quote_fixture(fixture_dir, tickers, period="5d"):
+    """download_close_frame(replay)가 읽는 quotes_{period}.pkl을 만듭니다. (yf.download 다종목 응답과 같은 2단 컬럼)"""
+    days  = pd.bdate_range(end=datetime.now().date(), periods=5)
+    close = {}
+    for symbol in tickers:
+        rng   = _symbol_rng(symbol)
+        price = rng.uniform(20, 800)
+        walk  = []
+        for _ in days:
+            price *= 1 + rng.gauss(0, 0.02)
+            walk.append(round(price, 2))
+        close[symbol] = walk
+    frame = pd.concat({'Close': pd.DataFrame(close, index=days)}, axis=1)
+    os.makedirs(fixture_dir, exist_ok=True)
+    frame.to_pickle(os.path.join(fixture_dir, f"quotes_{period}.pkl"))
+
+
+def write_intraday_fixture(fixture_dir, tickers, bars=78):
+    """collect_intraday_data(replay)가 읽는 quotes_2d_5m.pkl을 만듭니다. (전일 + 당일 정규장 5분봉, 뉴욕 시간대 인덱스)"""
+    days  = pd.bdate_range(end=datetime.now().date(), periods=2)
+    index = pd.DatetimeIndex([ts for day in days for ts in pd.date_range(
+        pd.Timestamp(day, tz='America/New_York') + timedelta(hours=9, minutes=30), periods=bars, freq='5min')])
+    close = {}
+    for symbol in tickers:
+        rng   = _symbol_rng(symbol, 'intraday')
+        price = rng.uniform(20, 800)
+        walk  = []
+        for _ in index:
+            price *= 1 + rng.gauss(0, 0.002)
+            walk.append(round(price, 4))
+        close[symbol] = walk
+    frame = pd.concat({'Close': pd.DataFrame(close, index=index)}, axis=1)
+    os.makedirs(fixture_dir, exist_ok=True)
+    frame.to_pickle(os.path.join(fixture_dir, "quotes_2d_5m.pkl"))
+
+
+def seed_transcripts(transcript_cache, ttl, segments=300):
+    """대역 YouTube 서버가 돌려줄 영상들의 자막(약 15분 분량)을 자막 캐시에 미리 넣습니다."""
+    from stub_servers import fixture_sentences, stub_video_id
+    video_ids = [stub_video_id('UU' + cid[2:], 0) for cid in YOUTUBE_CHANNELS.values()]
+    video_ids += [stub_video_id(keyword, 0) for keyword in YOUTUBE_KEYWORDS]
+    for vid in video_ids:
+        lines = fixture_sentences(vid, segments)
+        transcript_cache.set_json(vid, {'segments': [[i * 3, line] for i, line in enumerate(lines)]}, ttl=ttl)
+
+
+class _FastInfo:
+    def __init__(self, previous_close):
+        self.previous_close = previous_close
+
+
+class _FixtureTicker:
+    """yf.Ticker 대역: 당일 5분봉(78개)과 전일 종가"""
+
+    def __init__(self, symbol):
+        self.symbol    = symbol
+        rng            = _symbol_rng(symbol, 'intraday')
+        self.prev      = rng.uniform(20, 800)
+        self.fast_info = _FastInfo(self.prev)
+        self._rng      = rng
+
+    def history(self, period="1d", interval="5m"):
+        start  = pd.Timestamp(datetime.now().date(), tz='America/New_York') + timedelta(hours=9, minutes=30)
+        index  = pd.date_range(start, periods=78, freq='5min')
+        price  = self.prev
+        closes = []
+        for _ in index:
+            price *= 1 + self._rng.gauss(0, 0.002)
+            closes.append(price)
+        return pd.DataFrame({'Close': closes}, index=index)
+
+
+class FixtureFinance:
+    """video_studio.yf 자리에 넣는 yfinance 대역 (Ticker만 제공)"""
+    Ticker = _FixtureTicker
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 단일 실행 (자식 프로세스)
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def _peak_rss_mb(who):
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def _video_duration(path):
+    from moviepy.editor import VideoFileClip
+    clip = VideoFileClip(path)
+    try:
+        return clip.duration
+    finally:
+        clip.close()
+
+
+def run_single(n_tickers, work_dir, args):
+    """
+    작업 폴더에서 대역 서버를 띄우고 agent.job()을 1회 실행한 뒤 측정값을 반환합니다.
+    (모듈 상수가 import 시점의 환경변수를 읽으므로 agent import 전에 환경을 구성)
+    """
+    import stub_servers
+
+    os.makedirs(work_dir, exist_ok=True)
+    os.chdir(work_dir)
+
+    tts_server , tts_url  = stub_servers.start_tts_stub(latency=args.tts_latency)
+    news_server, news_url = stub_servers.start_news_stub(latency=args.http_latency)
+    yt_server  , yt_url   = stub_servers.start_youtube_stub(latency=args.http_latency)
+    _, fixture_url        = stub_servers.serve_directory()
+
+    config = bench_config(n_tickers, tts_url, args.scene_workers, args.profile)
+    with open('config.json', 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    write_quote_fixture(os.path.join(work_dir, 'fixtures'), config['stock_tickers'])
+    write_intraday_fixture(os.path.join(work_dir, 'fixtures'), config['stock_tickers'])
+
+    os.environ.update({
+        'CACHE_DIR'              : os.path.join(work_dir, '.cache'),   # 매 실행 빈 캐시 (콜드 스타트)
+        'TRACE_DIR'              : os.path.join(work_dir, 'traces'),
+        'QUOTE_FIXTURE_DIR'      : os.path.join(work_dir, 'fixtures'),
+        'QUOTE_FIXTURE_MODE'     : 'replay',
+        'GOOGLE_NEWS_RSS_URL'    : f"{news_url}/rss/search",
+        'YOUTUBE_API_ENDPOINT'   : yt_url,
+        'YOUTUBE_UPLOAD_ENDPOINT': yt_url,                          # 재개 가능 업로드도 대역 서버로
+        'YOUTUBE_API_KEY'        : 'bench',
+        'FEAR_GREED_URL'         : f"{fixture_url}/browser/fear_greed.html",
+        'TRADINGVIEW_MAP_URL'    : f"{fixture_url}/browser/heatmap.html",
+        'LLM_CACHE_MODE'         : 'offline',                          # import 시 모델 목록 조회(API) 생략용
+        'MPLBACKEND'             : 'Agg',
+    })
+
+    import agent
+    import llm_cache
+    import fake_llm
+    import video_studio
+    from token_budget import estimate_tokens
+
+    # 분석은 후보 모델을 genai.GenerativeModel로 직접 만들므로 생성자도 같은 대역 모델을 돌려주게 함 (호출 기록 공유)
+    fake_model                 = fake_llm.FakeGeminiModel(latency=args.llm_latency, chunk_size=64, chunk_delay=args.llm_chunk_delay)
+    llm_cache.LLM_CACHE_MODE   = 'off'   # 매 호출 대역 모델까지 실제로 도달하도록
+    agent.model                = fake_model
+    agent.genai.GenerativeModel = lambda model_name: fake_model
+    agent.check_market_status  = lambda: True
+    video_studio.yf            = FixtureFinance
+    seed_transcripts(agent.TRANSCRIPT_CACHE, agent.TRANSCRIPT_CACHE_TTL)
+
+    # 업로드는 실제 청크 업로드 경로를 대역 서버로 측정 (token.json은 먼 미래에 만료되는 더미 토큰 → 갱신 요청 없음)
+    with open('token.json', 'w', encoding='utf-8') as f:
+        json.dump({'token': 'bench', 'refresh_token': 'bench', 'client_id': 'bench', 'client_secret': 'bench',
+                   'expiry': '2099-01-01T00:00:00Z'}, f)
+
+    emails = []
+    def fake_email(recipients, subject, html_body, attachment_path=None, inline_images=None):
+        emails.append({'subject': subject, 'html_chars': len(html_body), 'charts': len(inline_images or {})})
+        with open('email.html', 'w', encoding='utf-8') as f:
+            f.write(html_body)
+    agent.send_email = fake_email
+
+    t0      = time.perf_counter()
+    results = agent.job() or {}
+    total   = time.perf_counter() - t0
+
+    stages = {name: {'status': r.status, 'duration': round(r.duration, 3)} for name, r in results.items()}
+    video  = results['render'].value if 'render' in results else None
+    traces = sorted(glob.glob(os.path.join(work_dir, 'traces', 'trace-*.json')))
+    prompt = next((p for p in fake_model.calls if '"scripts"' in p), "")   # 분석 프롬프트
+    calls  = len(fake_model.calls)
+
+    # [재개] 같은 날짜 체크포인트로 다시 실행 (모든 단계가 건너뛰어져야 정상)
+    resume = None
+    if args.resume:
+        t0      = time.perf_counter()
+        rerun   = agent.job(resume=True) or {}
+        resume  = {'total_s'     : round(time.perf_counter() - t0, 3),
+                   'gemini_calls': len(fake_model.calls) - calls,
+                   'stages'      : {name: round(r.duration, 3) for name, r in rerun.items()}}
+    return {
+        'tickers'         : n_tickers,
+        'total_s'         : round(total, 3),
+        'stages'          : stages,
+        'peak_rss_mb'     : round(_peak_rss_mb(resource.RUSAGE_SELF), 1),
+        'peak_rss_child_mb': round(_peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+        'video_s'         : round(_video_duration(video), 2) if video and os.path.exists(video) else None,
+        'video_bytes'     : os.path.getsize(video) if video and os.path.exists(video) else None,
+        'gemini_calls'    : calls,
+        'prompt_tokens'   : estimate_tokens(prompt),
+        'tts_requests'    : tts_server.request_count,
+        'news_requests'   : sum(news_server.calls.values()),
+        'youtube_requests': sum(yt_server.calls.values()),
+        'youtube_quota'   : yt_server.quota,
+        'uploads'         : [{'bytes': u['received'], 'video_id': u['video_id']} for u in yt_server.uploads.values()],
+        'emails'          : emails,
+        'trace'           : traces[-1] if traces else None,
+        'resume'          : resume,
+    }
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 전체 실행 / 결과 표
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def _worker_cmd(n, work_dir, result_path, args):
+    return [sys.executable, os.path.abspath(__file__), '--worker', str(n), '--work-dir', work_dir, '--result', result_path,
+            '--scene-workers', str(args.scene_workers), '--profile', args.profile, '--llm-latency', str(args.llm_latency),
+            '--llm-chunk-delay', str(args.llm_chunk_delay), '--tts-latency', str(args.tts_latency),
+            '--http-latency', str(args.http_latency)] + (['--resume'] if args.resume else [])
+
+
+def print_table(results):
+    sizes  = [r['tickers'] for r in results]
+    stages = list(dict.fromkeys(name for r in results for name in r['stages']))
+    width  = 12
+
+    def row(label, values):
+        print(f"   {label:<22}" + ''.join(f"{v:>{width}}" for v in values))
+
+    print("\n📊 벤치마크 결과 (종목 수별)")
+    row("tickers", sizes)
+    for name in stages:
+        cells = []
+        for r in results:
+            s = r['stages'].get(name)
+            cells.append('-' if s is None else (f"{s['duration']:.1f}s" if s['status'] == 'ok' else f"{s['status']}"))
+        row(name, cells)
+    row("total", [f"{r['total_s']:.1f}s" for r in results])
+    row("peak RSS main (MB)", [f"{r['peak_rss_mb']:.0f}" for r in results])
+    row("peak RSS child (MB)", [f"{r['peak_rss_child_mb']:.0f}" for r in results])
+    row("video duration", [f"{r['video_s']:.1f}s" if r['video_s'] else '-' for r in results])
+    row("video size (MB)", [f"{r['video_bytes'] / 1e6:.1f}" if r['video_bytes'] else '-' for r in results])
+    row("analysis prompt tok", [f"{r['prompt_tokens']:,}" for r in results])
+    row("gemini calls", [r['gemini_calls'] for r in results])
+    row("tts requests", [r['tts_requests'] for r in results])
+    row("news requests", [r['news_requests'] for r in results])
+    row("youtube quota", [r['youtube_quota'] for r in results])
+    if any(r.get('resume') for r in results):
+        row("resume rerun", [f"{r['resume']['total_s']:.1f}s" if r.get('resume') else '-' for r in results])
+
+
+def run_all(args):
+    root    = os.path.abspath(args.work_dir or tempfile.mkdtemp(prefix='bench-'))
+    results = []
+    failed  = False
+    for n in args.sizes:
+        work_dir    = os.path.join(root, f"n{n}")
+        result_path = os.path.join(root, f"result-n{n}.json")
+        log_path    = os.path.join(root, f"n{n}.log")
+        os.makedirs(work_dir, exist_ok=True)
+        print(f"⏱️ {n}종목 실행 중... (로그: {log_path})", flush=True)
+
+        with open(log_path, 'w', encoding='utf-8') as log:
+            proc = subprocess.run(_worker_cmd(n, work_dir, result_path, args), cwd=REPO_DIR,
+                                  stdout=None if args.verbose else log, stderr=subprocess.STDOUT if not args.verbose else None)
+        if proc.returncode != 0 or not os.path.exists(result_path):
+            print(f"   ❌ {n}종목 실행 실패 (종료 코드 {proc.returncode}) - {log_path} 확인", flush=True)
+            failed = True
+            continue
+        with open(result_path, encoding='utf-8') as f:
+            result = json.load(f)
+        results.append(result)
+        print(f"   ✅ {result['total_s']:.1f}초 / 영상 {result['video_s']}초 / 트레이스 {result['trace']}", flush=True)
+
+    if results:
+        print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.json}")
+
+    if args.keep or failed:
+        print(f"📂 작업 폴더: {root}")
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="오프라인 전체 파이프라인 벤치마크")
+    parser.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',') if x], default=DEFAULT_SIZES,
+                        help="관심 종목 수 목록 (기본값: 5,50,500)")
+    parser.add_argument('--scene-workers', type=int, default=4, help="render_config.scene_workers (기본값: 4)")
+    parser.add_argument('--profile', default='production', choices=['production', 'fast', 'draft'],
+                        help="render_config.encoder_profile (기본값: production, draft는 업로드/메일 생략)")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Gemini 대역 응답 지연(초)")
+    parser.add_argument('--llm-chunk-delay', type=float, default=0.0, help="Gemini 대역 스트리밍 조각 간 지연(초)")
+    parser.add_argument('--tts-latency', type=float, default=0.0, help="TTS 대역 요청당 지연(초)")
+    parser.add_argument('--http-latency', type=float, default=0.0, help="뉴스/YouTube 대역 요청당 지연(초)")
+    parser.add_argument('--work-dir', help="작업 폴더 (기본값: 임시 폴더)")
+    parser.add_argument('--keep', action='store_true', help="작업 폴더(영상, 트레이스, 로그)를 지우지 않음")
+    parser.add_argument('--json', help="결과를 JSON 파일로도 저장")
+    parser.add_argument('--verbose', action='store_true', help="파이프라인 출력을 로그 파일 대신 화면에 표시")
+    parser.add_argument('--resume', action='store_true', help="실행 후 체크포인트로 한 번 더 실행해 재개 시간 측정")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.worker is not None:
+        result = run_single(args.worker, os.path.abspath(args.work_dir), args)
+        with open(args.result, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        sys.exit(0)
+    sys.exit(run_all(args))
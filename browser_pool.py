@@ -0,0 +1,226 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Browser Pool (공유 헤드리스 브라우저)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# CNN 공포지수 크롤링(agent.py)과 TradingView 맵 캡처(video_studio.py)가 함께 쓰는 Chromium 브라우저입니다.
+#
+# [기존 방식의 문제]
+# - 캡처마다 Chromium을 새로 띄우고 종료 (브라우저 기동 비용 + 메모리)
+# - 페이지 로딩을 고정 시간(time.sleep 5초/15초)만큼 무조건 대기
+#
+# [이 모듈의 방식]
+# - 브라우저는 실행 중 한 번만 띄우고, 캡처마다 새 탭을 열고 닫습니다.
+# - 탭은 page_load_strategy='none'으로 열어 로딩을 기다리지 않고 바로 반환하므로,
+#   여러 스레드가 동시에 탭을 열면 두 페이지가 브라우저 안에서 병렬로 로딩됩니다.
+# - 준비 여부는 DOM 조건(텍스트 등장, 요소 존재 등)을 짧은 간격으로 폴링하여 판단합니다.
+# - WebDriver는 스레드 안전하지 않으므로 각 명령(탭 전환 + 실행)은 잠금 안에서 짧게 수행합니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import time
+import atexit
+import threading
+
+from contextlib import contextmanager
+from tracing import span
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+
+
+# 차단 방지를 위한 일반 브라우저 User-Agent
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 준비 조건 (Readiness Conditions)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 모든 조건은 driver를 받아 True/False를 반환하는 함수입니다.
+# 탭을 연 직후에는 아직 about:blank 문서가 남아 있을 수 있으므로 URL도 함께 확인합니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def document_ready(driver):
+    """문서 로딩(readyState == 'complete')이 끝났는지 확인합니다."""
+    return driver.execute_script("return location.href !== 'about:blank' && document.readyState === 'complete';")
+
+def text_present(text):
+    """화면에 보이는 본문 텍스트에 text가 나타났는지 확인하는 조건을 만듭니다."""
+    return lambda driver: text in (driver.execute_script("return document.body ? document.body.innerText : '';") or "")
+
+def element_present(css_selector):
+    """css_selector에 해당하는 요소가 존재하는지 확인하는 조건을 만듭니다."""
+    return lambda driver: driver.execute_script(
+        "return location.href !== 'about:blank' && !!document.querySelector(arguments[0]);", css_selector)
+
+def all_of(*conditions):
+    """모든 조건을 만족해야 True인 조건을 만듭니다."""
+    return lambda driver: all(cond(driver) for cond in conditions)
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Tab / Pool
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+class BrowserTab:
+    """BrowserPool.tab()이 돌려주는 탭 핸들입니다. run()으로 이 탭에서 명령을 실행합니다."""
+
+    def __init__(self, pool, handle, ready):
+        self.pool   = pool
+        self.handle = handle
+        self.ready  = ready   # 준비 조건을 타임아웃 안에 만족했는지 여부
+
+    def run(self, fn):
+        """fn(driver)를 이 탭에서 실행하고 결과를 반환합니다."""
+        return self.pool.run(self.handle, fn)
+
+
+class BrowserPool:
+    """
+    한 번 띄운 Chromium을 여러 캡처 작업이 탭 단위로 나눠 쓰는 브라우저 풀입니다.
+
+    Args:
+        window_size (tuple): 브라우저 창 크기 (기본값: 1920x1200, 맵 캡처 해상도)
+        poll_interval (float): 준비 조건 확인 간격(초)
+
+    [사용 예]
+        pool = get_browser_pool()
+        with pool.tab(url, ready=text_present("Fear & Greed Index"), timeout=30) as tab:
+            text = tab.run(lambda d: d.find_element(By.TAG_NAME, 'body').text)
+    """
+
+    def __init__(self, window_size=(1920, 1200), poll_interval=0.25):
+        self.window_size   = window_size
+        self.poll_interval = poll_interval
+        self._driver       = None
+        self._home         = None               # 항상 열어 두는 빈 탭 (탭이 0개가 되면 세션이 끝나므로)
+        self._lock         = threading.RLock()
+
+    def _start(self):
+        # Docker 환경에 맞춘 Chrome 옵션 (기존 두 호출부와 동일한 설정)
+        chrome_options = Options()
+        if os.path.exists("/usr/bin/chromium"):
+            chrome_options.binary_location = "/usr/bin/chromium"  # Docker 내 Chromium 경로
+        chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument(f'--window-size={self.window_size[0]},{self.window_size[1]}')
+        chrome_options.add_argument(f'user-agent={USER_AGENT}')
+        # 백그라운드 탭도 전면 탭과 같은 속도로 렌더링되도록 스로틀링 해제 (병렬 탭 로딩용)
+        chrome_options.add_argument('--disable-background-timer-throttling')
+        chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+        chrome_options.add_argument('--disable-renderer-backgrounding')
+        # driver.get()이 로딩 완료를 기다리지 않도록 설정 (준비 여부는 DOM 조건으로 직접 판단)
+        chrome_options.page_load_strategy = 'none'
+
+        if os.path.exists("/usr/bin/chromedriver"):
+            service = ChromeService(executable_path="/usr/bin/chromedriver")
+            return webdriver.Chrome(service=service, options=chrome_options)
+        # 로컬 개발 환경에서는 자동 감지
+        return webdriver.Chrome(options=chrome_options)
+
+    def _ensure_driver(self):
+        """[lock 보유 상태에서 호출] 브라우저가 없거나 죽었으면 새로 띄웁니다."""
+        if self._driver is not None:
+            try:
+                self._driver.window_handles
+                return self._driver
+            except Exception:
+                self._quit_driver()
+
+        print("🌐 공유 브라우저 시작...", flush=True)
+        self._driver = self._start()
+        self._home   = self._driver.current_window_handle
+        return self._driver
+
+    def _quit_driver(self):
+        if self._driver:
+            try: self._driver.quit()
+            except: pass
+        self._driver = None
+        self._home   = None
+
+    def open_tab(self, url):
+        """새 탭에서 url 로딩을 시작하고 탭 핸들을 즉시 반환합니다. (로딩 완료를 기다리지 않음)"""
+        with self._lock:
+            driver = self._ensure_driver()
+            driver.switch_to.new_window('tab')
+            handle = driver.current_window_handle
+            driver.get(url)
+            return handle
+
+    def run(self, handle, fn):
+        """handle 탭으로 전환한 뒤 fn(driver)를 실행합니다."""
+        with self._lock:
+            self._driver.switch_to.window(handle)
+            return fn(self._driver)
+
+    def wait_until(self, handle, condition, timeout=30):
+        """
+        condition(driver)가 True가 될 때까지 폴링합니다.
+
+        Returns:
+            bool: 타임아웃 안에 조건을 만족하면 True
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self.run(handle, condition): return True
+            except Exception:
+                pass  # 로딩 도중 스크립트 실행 실패 등은 다음 폴링에서 재시도
+            if time.monotonic() >= deadline: return False
+            # 잠금을 쥐지 않은 채로 대기하여 다른 탭의 작업이 진행될 수 있게 함
+            time.sleep(self.poll_interval)
+
+    def close_tab(self, handle):
+        with self._lock:
+            if not self._driver: return
+            try:
+                self._driver.switch_to.window(handle)
+                self._driver.close()
+            except Exception:
+                pass
+            try: self._driver.switch_to.window(self._home)
+            except Exception: pass
+
+    @contextmanager
+    def tab(self, url, ready=None, timeout=30, settle=0.0):
+        """
+        url을 새 탭에서 열고, 준비 조건을 기다린 뒤 BrowserTab을 넘겨줍니다. 블록을 벗어나면 탭을 닫습니다.
+
+        Args:
+            url (str): 열 페이지 주소
+            ready (callable): 준비 조건 (생략 시 document_ready)
+            timeout (float): 준비 조건 최대 대기 시간(초)
+            settle (float): 조건 만족 후 추가 대기(초) - 애니메이션/차트 그리기 마무리용
+        """
+        with span("browser:tab", "browser", url=url):
+            handle = self.open_tab(url)
+            try:
+                with span("browser:wait_ready", "browser", url=url):
+                    is_ready = self.wait_until(handle, ready or document_ready, timeout)
+                    if is_ready and settle > 0:
+                        time.sleep(settle)
+                yield BrowserTab(self, handle, is_ready)
+            finally:
+                self.close_tab(handle)
+
+    def shutdown(self):
+        with self._lock:
+            self._quit_driver()
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 공유 인스턴스
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    """프로세스 전체에서 공유하는 BrowserPool을 반환합니다. (프로세스 종료 시 브라우저 자동 종료)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.shutdown)
+    return _pool
@@ -0,0 +1,300 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Chart Engine (분봉 차트 렌더러)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 수집 단계(collect_intraday)에서 이미 받아 둔 당일 5분봉으로 종목 차트를 그립니다.
+# - 종목마다 yfinance를 다시 호출하지 않음 (전일 종가도 수집 데이터에 포함)
+# - pyplot 전역 상태/스타일 적용 없이 미리 꾸며 둔 Figure 템플릿 하나를 재사용
+#   (선/채우기/전일 종가선의 데이터만 바꿔서 다시 그림)
+# - 결과는 PNG 파일을 거치지 않고 RGBA 배열(H x W x 4, uint8)로 바로 반환 → MoviePy ImageClip에 그대로 사용
+# - 여러 종목은 프로세스 풀에서 병렬 렌더링 (워커마다 템플릿 1개), 이메일용 PNG는 선택적으로 저장
+# - 영상용 선 그리기 애니메이션(ChartReveal)은 레이어 2장을 한 번만 그리고 프레임은 NumPy 복사로 생성
+#
+# [입력 형식] collect_intraday 결과의 종목 항목
+#   {'t': [UTC epoch 초, ...], 'close': [종가, ...], 'prev_close': 전일 종가}
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.dates as mdates
+
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+
+from tracing import span
+
+
+VIDEO_CHART_SIZE = (675, 450)     # 영상 씬 4용 (기존 12:8 차트를 높이 450으로 줄여 쓰던 크기 그대로 렌더링 → resize 없음)
+EMAIL_CHART_SIZE = (640, 320)     # 이메일 관심 종목 차트용
+CHART_DPI        = 100
+MARKET_TZ        = 'America/New_York'
+
+UP_COLOR   = '#ff3333'
+DOWN_COLOR = '#3366ff'
+
+
+def trend_color(last, prev_close):
+    """전일 종가 대비 상승이면 빨강, 아니면 파랑 (국내 표기 관례)"""
+    return UP_COLOR if last - prev_close > 0 else DOWN_COLOR
+
+
+class ChartTemplate:
+    """
+    스타일을 한 번만 적용한 Figure입니다. render()는 데이터만 바꿔서 다시 그립니다.
+
+    Args:
+        size (tuple): 출력 크기 (가로, 세로) 픽셀
+        dpi (int): 글자/선 굵기 기준 해상도
+    """
+
+    def __init__(self, size=VIDEO_CHART_SIZE, dpi=CHART_DPI):
+        width, height = size
+        self.size   = size
+        self.fig    = Figure(figsize=(width / dpi, height / dpi), dpi=dpi, facecolor='#000000')
+        self.canvas = FigureCanvasAgg(self.fig)
+
+        # bbox_inches='tight' 대신 고정 여백 (매번 레이아웃 계산을 하지 않도록)
+        ax = self.fig.add_axes([0.08, 0.08, 0.9, 0.9])
+        ax.set_facecolor('#121212')
+        ax.grid(True, linestyle=':', alpha=0.2, color='white')
+        for side in ('top', 'right', 'left'):
+            ax.spines[side].set_visible(False)
+        ax.spines['bottom'].set_color('white')
+        ax.tick_params(colors='white', labelsize=max(8, height // 50))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=MARKET_TZ))
+        ax.xaxis.set_major_locator(mdates.HourLocator(tz=MARKET_TZ))
+        ax.yaxis.set_major_locator(MaxNLocator(5))   # 눈금 레이아웃이 그리기 시간의 대부분이라 개수를 제한
+
+        self.ax         = ax
+        self.line,      = ax.plot([], [], linewidth=max(1.5, height / 250))
+        self.prev_line  = ax.axhline(y=0, color='white', linestyle='--', linewidth=1, alpha=0.6)
+        self.fill       = None
+
+    def _plot(self, entry):
+        """데이터를 선/채우기/전일 종가선에 반영합니다. → (x, y, info) 또는 데이터 부족 시 None"""
+        t, close = entry.get('t') or [], entry.get('close') or []
+        if len(close) < 2:
+            return None
+        x          = mdates.date2num(np.asarray(t, dtype='datetime64[s]'))
+        y          = np.asarray(close, dtype=float)
+        prev_close = float(entry.get('prev_close') or y[0])
+        last       = float(y[-1])
+        color      = trend_color(last, prev_close)
+
+        self.line.set_data(x, y)
+        self.line.set_color(color)
+        if self.fill is not None:
+            self.fill.remove()
+        self.fill = self.ax.fill_between(x, y, y.min(), color=color, alpha=0.15, linewidth=0)
+        self.prev_line.set_ydata([prev_close, prev_close])
+
+        low, high = min(y.min(), prev_close), max(y.max(), prev_close)
+        pad       = (high - low) * 0.05 or abs(high) * 0.01 or 1.0
+        self.ax.set_xlim(x[0], x[-1])
+        self.ax.set_ylim(low - pad, high + pad)
+
+        info = {'price': f"${last:.2f}", 'last': last, 'prev_close': prev_close,
+                'pct': (last - prev_close) / prev_close * 100 if prev_close else 0.0, 'color': color}
+        return x, y, info
+
+    def _draw(self):
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba()).copy()
+
+    def render(self, entry):
+        """
+        종목 하나를 그려 RGBA 배열을 반환합니다.
+
+        Returns:
+            tuple: (rgba ndarray, info dict{'price', 'last', 'prev_close', 'pct', 'color'}) - 데이터가 없으면 (None, None)
+        """
+        plotted = self._plot(entry)
+        if plotted is None:
+            return None, None
+        return self._draw(), plotted[2]
+
+    def render_layers(self, entry):
+        """
+        애니메이션용 레이어를 그립니다. (ChartReveal 참고)
+
+        Returns:
+            dict: {'base': 축/격자/전일 종가선만 있는 RGB, 'full': 선과 채우기까지 그린 RGB,
+                   'px_x': 데이터 점의 픽셀 열, 'px_y': 데이터 점의 픽셀 행, 'info': render()와 같은 info}
+                  데이터가 없으면 None
+        """
+        plotted = self._plot(entry)
+        if plotted is None:
+            return None
+        x, y, info = plotted
+
+        self.line.set_visible(False)
+        self.fill.set_visible(False)
+        base = self._draw()[:, :, :3]
+        self.line.set_visible(True)
+        self.fill.set_visible(True)
+        full = self._draw()[:, :, :3]
+
+        # 디스플레이 좌표는 왼쪽 아래가 원점 → 배열 행 번호로 뒤집음
+        px        = self.ax.transData.transform(np.column_stack([x, y]))
+        height    = full.shape[0]
+        return {'base': np.ascontiguousarray(base), 'full': np.ascontiguousarray(full),
+                'px_x': px[:, 0], 'px_y': height - px[:, 1], 'info': info}
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 선 그리기 애니메이션 (씬 4)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# matplotlib은 클립을 만들 때 두 번만 그립니다. (선 없는 base / 선과 채우기를 모두 그린 full)
+# 프레임마다 열 x(t) 왼쪽은 full, 오른쪽은 base에서 복사하고 선 끝에 점 하나를 섞으므로
+# 프레임 비용은 배열 복사 1회 수준입니다. (1280x720 RGB에서도 1ms 미만)
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+REVEAL_SECONDS = 3.0    # 선이 끝까지 그려지는 시간
+REVEAL_DELAY   = 0.3    # 씬 시작 후 그리기 시작까지 대기
+
+
+class ChartReveal:
+    """
+    분봉 차트가 왼쪽부터 그려지는 애니메이션 프레임 생성기입니다. make_frame을 MoviePy VideoClip에 넘겨 사용합니다.
+
+    Args:
+        entry (dict): {'t', 'close', 'prev_close'} (collect_intraday 종목 항목)
+        size (tuple): 출력 크기 (가로, 세로)
+        reveal (float): 그리기 시간 (초, ease-out)
+        delay (float): 그리기 시작 전 대기 시간 (초)
+        dot_radius (int): 선 끝 점 반지름 (픽셀, 0이면 생략)
+
+    Raises:
+        ValueError: 데이터가 2개 미만인 경우
+
+    [사용 예]
+        anim = ChartReveal(intraday['AAPL'])
+        clip = VideoClip(anim.make_frame, duration=10).set_position((520, 160))
+    """
+
+    def __init__(self, entry, size=VIDEO_CHART_SIZE, reveal=REVEAL_SECONDS, delay=REVEAL_DELAY, dot_radius=6):
+        layers = _template(tuple(size)).render_layers(entry)
+        if layers is None:
+            raise ValueError("분봉 데이터 부족")
+        self.base, self.full, self.info = layers['base'], layers['full'], layers['info']
+        self.full.flags.writeable = False   # 그리기가 끝난 뒤에는 복사 없이 그대로 반환하므로 보호
+        self.reveal = max(reveal, 1e-6)
+        self.delay  = delay
+
+        height, width = self.full.shape[:2]
+        px_x, px_y    = layers['px_x'], layers['px_y']
+        self.x_start  = int(np.clip(np.floor(px_x[0]), 0, width))
+        self.x_end    = int(np.clip(np.ceil(px_x[-1]) + 4, 0, width))   # 선 두께만큼 여유
+        self.head_y   = np.interp(np.arange(width), px_x, px_y).round().astype(int)   # 열별 선 끝 행 위치
+
+        # 선 끝 점: 가장자리를 부드럽게 한 원형 알파 마스크 (H x W x 1)
+        self.dot_radius = dot_radius
+        if dot_radius:
+            yy, xx         = np.ogrid[-dot_radius:dot_radius + 1, -dot_radius:dot_radius + 1]
+            self.dot_alpha = np.clip(dot_radius + 0.5 - np.sqrt(xx * xx + yy * yy), 0, 1)[..., None].astype(np.float32)
+            color          = self.info['color'].lstrip('#')
+            self.dot_color = np.array([int(color[i:i + 2], 16) for i in (0, 2, 4)], dtype=np.float32)
+
+    def reveal_column(self, t):
+        """t초 시점에 그려져 있어야 하는 마지막 열 (ease-out cubic)"""
+        progress = min(max((t - self.delay) / self.reveal, 0.0), 1.0)
+        eased    = 1.0 - (1.0 - progress) ** 3
+        return int(round(self.x_start + eased * (self.x_end - self.x_start)))
+
+    def make_frame(self, t):
+        """MoviePy make_frame: t초의 RGB 프레임 (H x W x 3, uint8)"""
+        col = self.reveal_column(t)
+        if col >= self.x_end:
+            return self.full
+        frame          = np.empty_like(self.full)
+        frame[:, :col] = self.full[:, :col]
+        frame[:, col:] = self.base[:, col:]
+        if self.dot_radius and col > self.x_start:
+            self._stamp_dot(frame, col - 1, self.head_y[col - 1])
+        return frame
+
+    def _stamp_dot(self, frame, cx, cy):
+        r             = self.dot_radius
+        height, width = frame.shape[:2]
+        y0, y1        = max(cy - r, 0), min(cy + r + 1, height)
+        x0, x1        = max(cx - r, 0), min(cx + r + 1, width)
+        if y0 >= y1 or x0 >= x1:
+            return
+        alpha  = self.dot_alpha[y0 - (cy - r):y1 - (cy - r), x0 - (cx - r):x1 - (cx - r)]
+        region = frame[y0:y1, x0:x1].astype(np.float32)
+        frame[y0:y1, x0:x1] = (region + (self.dot_color - region) * alpha).astype(np.uint8)
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 단일 / 일괄 렌더링
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+_templates = {}   # 프로세스별 템플릿 {크기: ChartTemplate}
+
+def _template(size):
+    if size not in _templates:
+        _templates[size] = ChartTemplate(size)
+    return _templates[size]
+
+
+def render_chart(entry, size=VIDEO_CHART_SIZE):
+    """현재 프로세스의 템플릿으로 차트 하나를 그립니다. → (rgba, info)"""
+    return _template(tuple(size)).render(entry)
+
+
+def save_png(rgba, path):
+    """RGBA 배열을 PNG로 저장합니다. (이메일 첨부용, 다시 그리지 않음)"""
+    Image.fromarray(rgba).save(path, format='PNG', compress_level=3)
+    return path
+
+
+def available_cpus():
+    """현재 프로세스가 쓸 수 있는 CPU 수 (컨테이너 CPU 제한 반영)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _render_task(symbol, entry, size, png_dir, keep_rgba):
+    """[프로세스 풀 작업] → (symbol, rgba 또는 None, png 경로 또는 None, info)"""
+    rgba, info = render_chart(entry, size)
+    if rgba is None:
+        return symbol, None, None, None
+    png = save_png(rgba, os.path.join(png_dir, f"{symbol}.png")) if png_dir else None
+    return symbol, (rgba if keep_rgba else None), png, info
+
+
+def render_charts(entries, size=EMAIL_CHART_SIZE, workers=None, png_dir=None, keep_rgba=True):
+    """
+    여러 종목 차트를 프로세스 풀에서 병렬로 그립니다.
+
+    Args:
+        entries (dict): {심볼: {'t', 'close', 'prev_close'}}
+        size (tuple): 출력 크기 (가로, 세로)
+        workers (int): 프로세스 수 (None이면 사용 가능한 CPU 수, 1이면 현재 프로세스에서 순서대로)
+        png_dir (str): 지정하면 {png_dir}/{심볼}.png 로도 저장
+        keep_rgba (bool): False면 RGBA 배열을 부모 프로세스로 돌려보내지 않음 (PNG만 필요할 때 전송량 절약)
+
+    Returns:
+        dict: {심볼: {'rgba': ndarray 또는 None, 'png': 경로 또는 None, 'info': dict}} (데이터 없는 종목 제외)
+    """
+    items   = [(s, e) for s, e in entries.items() if e and len(e.get('close') or []) >= 2]
+    workers = max(1, min(workers or available_cpus(), len(items) or 1))
+    if png_dir:
+        os.makedirs(png_dir, exist_ok=True)
+
+    with span("charts:render", "video", charts=len(items), workers=workers):
+        if workers == 1:
+            results = [_render_task(s, e, tuple(size), png_dir, keep_rgba) for s, e in items]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # 워커마다 템플릿을 한 번 만들고 여러 종목을 이어서 그리도록 작업을 묶어서 전달
+                chunk   = max(1, len(items) // (workers * 4))
+                results = list(pool.map(_render_task, *zip(*[(s, e, tuple(size), png_dir, keep_rgba) for s, e in items]),
+                                        chunksize=chunk))
+
+    return {symbol: {'rgba': rgba, 'png': png, 'info': info} for symbol, rgba, png, info in results if info}
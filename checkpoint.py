@@ -0,0 +1,195 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Checkpoint (단계별 결과 저장 + --resume 재개)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# job()이 늦은 단계(씬 음성 합성, 업로드, 메일 발송 등)에서 실패했을 때 다시 실행하면
+# 모든 수집과 Gemini 호출을 처음부터 반복하게 됩니다. 이를 막기 위해 각 단계가 성공하면 결과를
+# 날짜별 폴더 {CHECKPOINT_DIR}/{날짜}/{단계}.json.gz 로 저장하고, --resume 실행에서는 유효한 체크포인트가 있는
+# 단계를 건너뜁니다. (저장은 항상, 불러오기는 resume일 때만)
+#
+# [유효성]
+# 체크포인트는 "입력 키"가 같을 때만 사용합니다.
+#   입력 키 = 단계 설정(params) + 의존 단계 결과의 요약값(digest)
+#   digest  = 결과 JSON + 결과가 가리키는 파일(영상/히트맵)의 sha256
+# 따라서 앞 단계가 다시 실행되어 결과가 달라지면 뒤 단계 체크포인트는 자동으로 무효가 됩니다.
+# (결과가 같으면 그대로 유효)
+#
+# [파일 결과]
+# 영상/히트맵처럼 파일 경로를 반환하는 단계는 파일을 체크포인트 폴더로 복사해 두고,
+# 불러올 때 원래 경로에 없거나 크기가 다르면 다시 복사합니다.
+# 씬 세그먼트(영상 제작 중간 결과)는 segment_dir()을 video_studio에 넘겨 항상 저장하고, resume일 때만 씬 단위로 재사용합니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import gzip
+import json
+import time
+import shutil
+import hashlib
+
+from tracing import span
+
+
+CHECKPOINT_DIR       = os.getenv('CHECKPOINT_DIR', 'checkpoints')
+CHECKPOINT_KEEP_DAYS = int(os.getenv('CHECKPOINT_KEEP_DAYS', '3'))   # 오래된 날짜 폴더 정리 기준
+CHECKPOINT_VERSION   = 1                                             # 저장 형식이 바뀌면 올려서 기존 체크포인트 무효화
+
+
+def _json_bytes(obj):
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class CheckpointStore:
+    """
+    하루치 단계 결과 저장소입니다.
+
+    Args:
+        day (str): 날짜 문자열 (폴더 이름, 예: "2026-01-31")
+        resume (bool): True면 유효한 체크포인트가 있는 단계를 건너뜀
+        root (str): 체크포인트 최상위 폴더 (기본값: CHECKPOINT_DIR)
+
+    [사용 예]
+        store  = CheckpointStore(today_str, resume=True)
+        stages = [store.wrap(Stage('analyze', analyze, deps=[...]), params=config.get('prompt_budget'))]
+    """
+
+    def __init__(self, day, resume=False, root=CHECKPOINT_DIR):
+        self.root    = root
+        self.dir     = os.path.join(root, day)
+        self.resume  = resume
+        self.digests = {}     # 단계 이름 -> 이번 실행에서 확정된 결과 digest
+        self.loaded  = []     # 체크포인트로 건너뛴 단계
+        self.saved   = []     # 이번 실행에서 저장한 단계
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.dir, f"{name}.json.gz")
+
+    def segment_dir(self):
+        """씬 세그먼트를 보관할 폴더 (video_studio.make_video_module의 segment_dir)"""
+        path = os.path.join(self.dir, 'segments')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def prune(self, keep_days=CHECKPOINT_KEEP_DAYS):
+        """최근 keep_days개 날짜 폴더만 남기고 삭제합니다."""
+        if not os.path.isdir(self.root): return
+        days = sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+        for day in days[:-keep_days] if keep_days > 0 else []:
+            if os.path.join(self.root, day) != self.dir:
+                shutil.rmtree(os.path.join(self.root, day), ignore_errors=True)
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 키 / digest
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def input_key(self, params, inputs):
+        """단계 설정 + 의존 단계 digest (의존 단계가 기본값으로 대체된 경우 값 자체의 해시)"""
+        deps = {d: self.digests.get(d) or hashlib.sha256(_json_bytes(v)).hexdigest() for d, v in inputs.items()}
+        return hashlib.sha256(_json_bytes({'v': CHECKPOINT_VERSION, 'params': params, 'deps': deps})).hexdigest()
+
+    @staticmethod
+    def _digest(value, files):
+        h = hashlib.sha256(_json_bytes(value))
+        for path in sorted(files):
+            h.update(files[path]['sha256'].encode('ascii'))
+        return h.hexdigest()
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 저장 / 불러오기
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def save(self, name, key, value, files=()):
+        """
+        단계 결과를 저장합니다. files에 있는 파일은 체크포인트 폴더로 복사합니다.
+
+        Returns:
+            str: 결과 digest
+        """
+        stored = {}
+        for path in files:
+            if not path or not os.path.exists(path): continue
+            target = os.path.join(self.dir, 'files', f"{name}-{os.path.basename(path)}")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.abspath(path) != os.path.abspath(target):
+                shutil.copy2(path, target)
+            stored[path] = {'stored': target, 'size': os.path.getsize(target), 'sha256': _file_sha256(target)}
+
+        digest = self._digest(value, stored)
+        record = {'version': CHECKPOINT_VERSION, 'key': key, 'digest': digest, 'saved_at': time.time(),
+                  'files': stored, 'value': value}
+        tmp    = self._path(name) + '.tmp'
+        with gzip.open(tmp, 'wb', compresslevel=6) as f:
+            f.write(_json_bytes(record))
+        os.replace(tmp, self._path(name))
+        self.digests[name] = digest
+        self.saved.append(name)
+        return digest
+
+    def load(self, name, key):
+        """
+        입력 키가 같은 체크포인트가 있으면 (True, 값), 없거나 무효면 (False, None)을 반환합니다.
+        파일 결과는 원래 경로에 없거나 크기가 다르면 복원합니다.
+        """
+        try:
+            with gzip.open(self._path(name), 'rb') as f:
+                record = json.loads(f.read())
+        except (OSError, ValueError):
+            return False, None
+        if record.get('version') != CHECKPOINT_VERSION or record.get('key') != key:
+            return False, None
+
+        files = record.get('files', {})
+        for info in files.values():
+            if not os.path.exists(info['stored']) or os.path.getsize(info['stored']) != info['size']:
+                return False, None
+        for path, info in files.items():
+            if not os.path.exists(path) or os.path.getsize(path) != info['size']:
+                shutil.copy2(info['stored'], path)
+
+        self.digests[name] = record['digest']
+        self.loaded.append(name)
+        return True, record['value']
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # Stage 연결
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def wrap(self, stage, params=None, files=None, valid=None):
+        """
+        Stage의 func를 체크포인트를 거치도록 감쌉니다.
+
+        Args:
+            stage (Stage): 감쌀 단계 (그대로 수정해서 반환)
+            params: 결과에 영향을 주는 설정값 (JSON 직렬화 가능, 입력 키에 포함)
+            files (callable): files(결과) → 함께 보관할 파일 경로 리스트 (예: 영상 경로)
+            valid (callable): valid(결과)가 False면 저장하지 않음 (예: 일부 씬이 실패한 영상)
+
+        결과가 None이면 저장하지 않습니다. (다음 실행에서 다시 시도)
+        """
+        func, name = stage.func, stage.name
+
+        def run(**inputs):
+            key = self.input_key(params, inputs)
+            if self.resume:
+                hit, value = self.load(name, key)
+                if hit:
+                    print(f"  ⏩ [{name}] 체크포인트 사용 - 건너뜀", flush=True)
+                    return value
+
+            value = func(**inputs)
+            if value is not None and (valid is None or valid(value)):
+                with span(f"checkpoint:{name}", "checkpoint"):
+                    self.save(name, key, value, files(value) if files else ())
+            return value
+
+        stage.func = run
+        return stage
+
+    def summary(self):
+        loaded = ', '.join(self.loaded) or '없음'
+        return f"건너뜀 {len(self.loaded)}개 ({loaded}) / 저장 {len(self.saved)}개 ({self.dir})"
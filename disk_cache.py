@@ -0,0 +1,190 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Disk Cache
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 실행 간에 유지되는 파일 기반 캐시입니다.
+# 같은 날 아침 재실행(렌더링 실패 후 재시도 등) 시 이미 받아온 RSS/기사 본문 등을 다시 내려받지 않도록 합니다.
+#
+# [저장 구조]
+# {root}/{키 해시 앞 2자리}/{키 해시}.bin   : 값 (바이트)
+# {root}/{키 해시 앞 2자리}/{키 해시}.json  : 메타데이터 (원본 키, 만료 시각, ETag/Last-Modified 등)
+#
+# [정책]
+# - TTL: 만료된 항목은 get()에서 반환되지 않지만, 조건부 요청(ETag 등)을 위해 get_entry()로는 조회 가능
+# - 용량: 전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제 (LRU)
+# - 여러 스레드에서 동시에 사용해도 안전하도록 쓰기는 임시 파일 → os.replace로 원자적으로 처리
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from collections import namedtuple
+
+
+# 캐시 루트 폴더 (Docker에서는 /app/.cache → 볼륨 마운트로 실행 간 유지됨)
+CACHE_DIR = os.getenv('CACHE_DIR', '.cache')
+
+# get_entry()의 반환 형식
+# - value: 저장된 바이트 / meta: 메타데이터 딕셔너리 / fresh: TTL 이내 여부
+CacheEntry = namedtuple('CacheEntry', ['value', 'meta', 'fresh'])
+
+
+class DiskCache:
+    """
+    TTL과 용량 제한을 지원하는 파일 기반 키-값 캐시입니다.
+
+    Args:
+        root (str): 캐시 폴더 경로
+        max_bytes (int): 최대 저장 용량 (기본값: 256MB)
+        default_ttl (float): 기본 유효 시간(초) (기본값: 1시간)
+
+    [사용 예]
+        cache = DiskCache(os.path.join(CACHE_DIR, 'http'))
+        cache.set(url, body, ttl=600, etag='"abc"')
+        body  = cache.get(url)   # 10분 이내면 바이트, 아니면 None
+    """
+
+    def __init__(self, root, max_bytes=256 * 1024 * 1024, default_ttl=3600):
+        self.root        = root
+        self.max_bytes   = max_bytes
+        self.default_ttl = default_ttl
+        self._lock       = threading.Lock()
+        self._total      = None  # 현재 저장 용량 (최초 쓰기 시 폴더를 스캔하여 계산)
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 내부 유틸
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def _paths(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        folder = os.path.join(self.root, digest[:2])
+        return os.path.join(folder, digest + '.bin'), os.path.join(folder, digest + '.json')
+
+    @staticmethod
+    def _atomic_write(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _scan(self):
+        """캐시 폴더의 모든 항목을 (마지막 사용 시각, 크기, 값 경로, 메타 경로) 리스트로 반환합니다."""
+        items = []
+        if not os.path.isdir(self.root): return items
+        for sub in os.scandir(self.root):
+            if not sub.is_dir(): continue
+            for f in os.scandir(sub.path):
+                if not f.name.endswith('.json'): continue
+                data_path = f.path[:-5] + '.bin'
+                try:
+                    size = os.path.getsize(data_path) + f.stat().st_size
+                    items.append((f.stat().st_mtime, size, data_path, f.path))
+                except OSError:
+                    continue
+        return items
+
+    def _remove(self, data_path, meta_path):
+        freed = 0
+        for path in (data_path, meta_path):
+            try:
+                freed += os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                pass
+        return freed
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 조회
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def get_entry(self, key):
+        """
+        만료 여부와 관계없이 항목을 조회합니다.
+
+        Returns:
+            CacheEntry: (value, meta, fresh) 또는 항목이 없으면 None
+        """
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(data_path, 'rb') as f:
+                value = f.read()
+        except (OSError, ValueError):
+            return None
+
+        # 해시 충돌/손상 방지: 원본 키가 다르면 없는 것으로 취급
+        if meta.get('key') != key: return None
+
+        # 마지막 사용 시각 갱신 (LRU 삭제 순서 결정용)
+        try: os.utime(meta_path)
+        except OSError: pass
+
+        return CacheEntry(value, meta, time.time() < meta.get('expires', 0))
+
+    def get(self, key):
+        """TTL 이내의 값만 반환합니다. (없거나 만료되면 None)"""
+        entry = self.get_entry(key)
+        return entry.value if entry and entry.fresh else None
+
+    def get_json(self, key):
+        value = self.get(key)
+        return json.loads(value.decode('utf-8')) if value is not None else None
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 저장 / 삭제
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def set(self, key, value, ttl=None, **meta):
+        """
+        값을 저장합니다.
+
+        Args:
+            key (str): 캐시 키 (URL 등)
+            value (bytes): 저장할 값
+            ttl (float): 유효 시간(초) (생략 시 default_ttl)
+            **meta: 함께 저장할 부가 정보 (예: etag, last_modified)
+        """
+        ttl                  = self.default_ttl if ttl is None else ttl
+        data_path, meta_path = self._paths(key)
+        meta                 = dict(meta, key=key, created=time.time(), expires=time.time() + ttl)
+        meta_bytes           = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+        with self._lock:
+            if self._total is None:
+                self._total = sum(item[1] for item in self._scan())
+            self._total -= self._remove(data_path, meta_path) if os.path.exists(meta_path) else 0
+            self._atomic_write(data_path, value)
+            self._atomic_write(meta_path, meta_bytes)
+            self._total += len(value) + len(meta_bytes)
+
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def set_json(self, key, obj, ttl=None, **meta):
+        self.set(key, json.dumps(obj, ensure_ascii=False).encode('utf-8'), ttl=ttl, **meta)
+
+    def touch(self, key, ttl=None):
+        """
+        값은 그대로 두고 만료 시각만 연장합니다. (조건부 요청에서 304 Not Modified를 받았을 때 사용)
+        """
+        entry = self.get_entry(key)
+        if not entry: return
+        meta = {k: v for k, v in entry.meta.items() if k not in ('key', 'created', 'expires')}
+        self.set(key, entry.value, ttl=ttl, **meta)
+
+    def delete(self, key):
+        with self._lock:
+            freed = self._remove(*self._paths(key))
+            if self._total is not None:
+                self._total -= freed
+
+    def _evict(self):
+        """[lock 보유 상태에서 호출] 오래 사용되지 않은 항목부터 삭제하여 max_bytes의 90% 이하로 맞춥니다."""
+        target = self.max_bytes * 0.9
+        items  = sorted(self._scan())
+        total  = sum(item[1] for item in items)
+        for _, _, data_path, meta_path in items:
+            if total <= target: break
+            total -= self._remove(data_path, meta_path)
+        self._total = total
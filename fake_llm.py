@@ -0,0 +1,105 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Fake LLM (Gemini 대역 모델)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# genai.GenerativeModel과 같은 모양(model_name, generate_content(prompt, safety_settings, stream))의 가짜 모델입니다.
+# API 키/네트워크 없이 분석 → 영상 → 리포트 흐름을 확인하거나, 스트리밍 파싱/성능을 측정할 때 사용합니다.
+#
+# [사용 예]
+#   import agent, fake_llm
+#   agent.model = fake_llm.FakeGeminiModel(chunk_size=40, chunk_delay=0.05)
+#   agent.genai.GenerativeModel = lambda name: fake_llm.FakeGeminiModel(model_name=name, chunk_size=40)
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import re
+import json
+import time
+
+
+SCENE_KEYS = ['scene1', 'scene2', 'scene2_5', 'scene3', 'scene4', 'scene5', 'scene6']
+
+
+def fake_analysis_json(prompt):
+    """
+    analyze_and_summarize 프롬프트에 대한 그럴듯한 JSON 응답을 만듭니다.
+    프롬프트 안의 종목 심볼과 뉴스/유튜브 개수를 읽어 stock_details 등을 채웁니다.
+    """
+    data_part = prompt.split('[지시사항 1', 1)[0]
+    symbols   = list(dict.fromkeys(re.findall(r'"symbol":\s*"([^"]+)"', data_part)))
+    try:
+        context = json.loads(data_part[data_part.index('{'):data_part.rindex('}') + 1])
+    except ValueError:
+        context = {}
+
+    # 실제 대본과 비슷한 길이(씬당 5~6문장)가 되도록 상위 종목 언급을 섞음 (TTS/자막 부하 재현용)
+    mentions = [f"{s}는 관련 뉴스에 따라 움직였습니다." for s in symbols[:3]]
+    scripts  = {key: ' '.join([f"{key} 대본입니다.", "오늘 시장은 차분한 흐름을 보였습니다.", *mentions,
+                               "다음 소식으로 넘어가겠습니다."]) for key in SCENE_KEYS}
+    return json.dumps({
+        "scene4_target_symbol": symbols[0] if symbols else "",
+        "stock_details"       : [{"symbol": s, "video_summary": f"{s}는 관련 뉴스로 움직였습니다.",
+                                  "email_summary": f"{s}는 특이 이슈 없이 시장 흐름을 따랐습니다."} for s in symbols],
+        "economic_insight"    : {"fear_greed_index": 50, "market_sentiment": "Neutral",
+                                 "calendar": ["CPI 발표 (2026-01-01)"], "sector_summary": "기술주 보합"},
+        "news_items"          : [{"title": n.get("title", ""), "detail": "특이 이슈 없음"} for n in context.get("news", [])],
+        "youtube_items"       : [{"summary": "영상 핵심 요약입니다."} for _ in context.get("youtube", [])],
+        "scripts"             : scripts,
+    }, ensure_ascii=False, indent=2)
+
+
+def default_responder(prompt):
+    """프롬프트 종류에 따라 분석 JSON 또는 리포트 HTML을 돌려줍니다."""
+    if '"scripts"' in prompt:
+        return "```json\n" + fake_analysis_json(prompt) + "\n```"
+    return "```html\n<h2>📈 Global Market Insight</h2><p>가짜 리포트 본문입니다.</p>\n```"
+
+
+class _Chunk:
+    def __init__(self, text):
+        self.text  = text
+        self.parts = [text]
+
+
+class FakeResponse:
+    """GenerateContentResponse 흉내 (스트리밍이면 반복 시 조각을 지연 시간 간격으로 내보냄)"""
+
+    def __init__(self, text, chunk_size=None, chunk_delay=0.0):
+        self.text            = text
+        self.parts           = [text] if text else []
+        self.prompt_feedback = None
+        self._chunk_size     = chunk_size
+        self._chunk_delay    = chunk_delay
+
+    def __iter__(self):
+        size = self._chunk_size or max(1, len(self.text))
+        for i in range(0, len(self.text), size):
+            if self._chunk_delay: time.sleep(self._chunk_delay)
+            yield _Chunk(self.text[i:i + size])
+
+
+class FakeGeminiModel:
+    """
+    Gemini 대역 모델입니다.
+
+    Args:
+        responder (str|callable): 고정 응답 문자열 또는 responder(prompt) -> str (기본값: default_responder)
+        model_name (str): 캐시 키 등에 쓰이는 모델 이름
+        latency (float): 비스트리밍 호출 시 응답 지연(초)
+        chunk_size (int): 스트리밍 조각 크기(글자 수)
+        chunk_delay (float): 스트리밍 조각 사이 지연(초)
+    """
+
+    def __init__(self, responder=None, model_name='models/fake-gemini', latency=0.0, chunk_size=64, chunk_delay=0.0):
+        self.responder   = responder or default_responder
+        self.model_name  = model_name
+        self.latency     = latency
+        self.chunk_size  = chunk_size
+        self.chunk_delay = chunk_delay
+        self.calls       = []   # 받은 프롬프트 기록
+
+    def generate_content(self, prompt, safety_settings=None, stream=False, **kwargs):
+        self.calls.append(prompt)
+        text = self.responder(prompt) if callable(self.responder) else str(self.responder)
+        if stream:
+            return FakeResponse(text, self.chunk_size, self.chunk_delay)
+        if self.latency: time.sleep(self.latency)
+        return FakeResponse(text)
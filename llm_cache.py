@@ -0,0 +1,181 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# LLM Cache (Gemini 응답 캐시 + 오프라인 재생)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# analyze_and_summarize / generate_report는 수집 데이터 전체를 프롬프트로 보내므로 호출마다 20~60초가 걸립니다.
+# 렌더링 단계에서 실패해 재실행하거나 씬 하나만 고쳐 다시 돌릴 때 같은 프롬프트를 또 보내지 않도록
+# 응답 텍스트를 디스크에 저장해 두고 재사용합니다.
+#
+# [캐시 키]
+# 모델 이름 + 정규화된 프롬프트 해시 + safety_settings
+# (정규화: 줄 끝 공백 제거, 연속 빈 줄 축소 - 코드 들여쓰기 변경만으로 캐시가 깨지지 않도록)
+#
+# [모드] 환경변수 LLM_CACHE_MODE
+# - 'on'      : 캐시에 있으면 재사용, 없으면 API 호출 후 저장 (기본값)
+# - 'off'     : 캐시를 사용하지 않음 (항상 API 호출)
+# - 'offline' : 캐시에 있는 응답만 사용. 없으면 API를 호출하지 않고 LLMCacheMiss 예외 발생
+#               (벤치마크/영상 파이프라인 반복 작업용)
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import re
+import json
+import hashlib
+
+from disk_cache import DiskCache, CACHE_DIR
+from tracing import span
+
+
+LLM_CACHE_MODE  = os.getenv('LLM_CACHE_MODE', 'on')                         # 'on' | 'off' | 'offline'
+LLM_CACHE_TTL   = int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))       # 기본 7일
+LLM_CACHE_BYTES = 64 * 1024 * 1024                                          # 응답 텍스트만 저장하므로 작게 유지
+
+# 마지막으로 선택된 모델 이름을 저장하는 키 (오프라인 모드에서 모델 목록 조회 없이 같은 키를 만들기 위함)
+_SELECTED_MODEL_KEY = "__selected_model__"
+
+_cache = None
+
+
+class LLMCacheMiss(Exception):
+    """오프라인 모드에서 캐시에 없는 프롬프트를 요청했을 때 발생합니다."""
+
+
+class CachedResponse:
+    """
+    캐시에서 꺼낸 응답입니다. 호출부가 쓰는 GenerateContentResponse 속성(text, parts, prompt_feedback)만 흉내 냅니다.
+    """
+
+    def __init__(self, text):
+        self.text            = text
+        self.parts           = [text]
+        self.prompt_feedback = None
+
+
+def get_llm_cache():
+    """프로세스 전체에서 공유하는 LLM 응답 캐시를 반환합니다. ({CACHE_DIR}/llm)"""
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(os.path.join(CACHE_DIR, 'llm'), max_bytes=LLM_CACHE_BYTES, default_ttl=LLM_CACHE_TTL)
+    return _cache
+
+
+def is_offline():
+    return LLM_CACHE_MODE == 'offline'
+
+
+def normalize_prompt(prompt):
+    """줄 끝 공백과 연속된 빈 줄을 정리하여 의미 없는 공백 차이로 키가 달라지지 않게 합니다."""
+    lines = [line.rstrip() for line in str(prompt).strip().splitlines()]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines))
+
+
+def llm_cache_key(model_name, prompt, safety_settings=None):
+    prompt_hash = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+    safety      = json.dumps(safety_settings, sort_keys=True, ensure_ascii=False) if safety_settings else ""
+    return f"{model_name}|{prompt_hash}|{safety}"
+
+
+def remember_model_name(model_name):
+    """온라인에서 선택된 모델 이름을 기록합니다."""
+    if LLM_CACHE_MODE != 'off' and model_name:
+        get_llm_cache().set_json(_SELECTED_MODEL_KEY, {"model_name": model_name}, ttl=LLM_CACHE_TTL)
+
+
+def last_model_name(default=None):
+    """마지막으로 기록된 모델 이름 (없으면 default)"""
+    data = get_llm_cache().get_json(_SELECTED_MODEL_KEY)
+    return data.get("model_name", default) if data else default
+
+
+def finished_normally(response):
+    """
+    응답이 정상 종료(STOP)되었는지 확인합니다. 차단(prompt_feedback.block_reason)되었거나
+    SAFETY/MAX_TOKENS 등으로 중간에 끊긴 응답은 False (캐시하지 않음)
+    candidates가 없는 응답(CachedResponse, 대역 모델)은 정상으로 봅니다.
+    """
+    feedback = getattr(response, 'prompt_feedback', None)
+    if feedback is not None and getattr(feedback, 'block_reason', 0):
+        return False
+    candidates = getattr(response, 'candidates', None)
+    if candidates is None:
+        return True
+    if not candidates:
+        return False
+    reason = candidates[0].finish_reason
+    return getattr(reason, 'name', reason) in ('STOP', 1)
+
+
+def _reply_bytes(response):
+    """응답 텍스트 바이트 수 (차단되어 candidates가 비면 .parts/.text가 ValueError를 내므로 0)"""
+    try:
+        return len(response.text.encode('utf-8')) if response.parts else 0
+    except ValueError:
+        return 0
+
+
+def _stream_text(model, prompt, on_text, **kwargs):
+    """
+    스트리밍으로 응답을 받으며 조각마다 on_text를 호출하고, 다 받은 응답 객체를 반환합니다.
+    정상 종료되지 않은 응답(차단/중간 종료)은 조각을 합친 CachedResponse 대신 원본 응답 객체를 그대로 반환합니다.
+    """
+    response = model.generate_content(prompt, stream=True, **kwargs)
+    pieces   = []
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue  # 내용 없는 조각 (차단/종료 신호 등)
+        pieces.append(text)
+        on_text(text)
+    if not finished_normally(response):
+        return response
+    return CachedResponse(''.join(pieces)) if pieces else response
+
+
+def _call_model(model, prompt, on_text=None, **kwargs):
+    """실제 API 호출 (측정 구간 'gemini', 바이트 = 프롬프트 + 응답)"""
+    with span("gemini", "llm", model=getattr(model, 'model_name', 'unknown'), stream=bool(on_text)) as sp:
+        response = _stream_text(model, prompt, on_text, **kwargs) if on_text else model.generate_content(prompt, **kwargs)
+        sp.add_bytes(len(prompt.encode('utf-8')) + _reply_bytes(response))
+        return response
+
+
+def generate_content_cached(model, prompt, safety_settings=None, on_text=None):
+    """
+    model.generate_content()를 캐시를 거쳐 호출합니다.
+
+    Args:
+        model (genai.GenerativeModel): 사용할 모델 (model.model_name이 캐시 키에 포함됨)
+        prompt (str): 프롬프트
+        safety_settings (list): 안전 설정 (None이면 API에 전달하지 않음)
+        on_text (callable): 지정하면 스트리밍 모드로 호출하고 도착한 텍스트 조각마다 on_text(text) 호출
+                            (캐시 적중 시에는 전체 텍스트로 한 번 호출)
+
+    Returns:
+        CachedResponse 또는 API 응답 객체 (둘 다 .text / .parts 사용 가능)
+
+    Raises:
+        LLMCacheMiss: 오프라인 모드에서 캐시에 응답이 없는 경우
+    """
+    kwargs = {"safety_settings": safety_settings} if safety_settings is not None else {}
+    if LLM_CACHE_MODE == 'off':
+        return _call_model(model, prompt, on_text, **kwargs)
+
+    model_name = getattr(model, 'model_name', 'unknown')
+    key        = llm_cache_key(model_name, prompt, safety_settings)
+    cache      = get_llm_cache()
+    cached     = cache.get(key)
+    if cached is not None:
+        print(f"   ♻️ LLM 캐시 적중 ({model_name})")
+        response = CachedResponse(cached.decode('utf-8'))
+        if on_text: on_text(response.text)
+        return response
+    if is_offline():
+        raise LLMCacheMiss(f"오프라인 모드: 캐시된 응답 없음 ({model_name})")
+
+    response = _call_model(model, prompt, on_text, **kwargs)
+    # 차단/빈 응답, 중간에 끊긴 응답은 저장하지 않음 (다음 실행에서 다시 시도)
+    if not finished_normally(response):
+        print(f"   ⚠️ LLM 응답이 정상 종료되지 않아 캐시하지 않음 ({model_name})")
+    elif response.parts:
+        cache.set(key, response.text.encode('utf-8'), ttl=LLM_CACHE_TTL, model=model_name)
+    return response
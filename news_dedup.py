@@ -0,0 +1,291 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# News Dedup (뉴스 URL 정규화 + 유사 기사 제거)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 종목 검색어("{symbol} stock news", "{symbol} analysis"), 일반 키워드, 경제 검색어는 같은 통신사 기사를 자주 돌려줍니다.
+# Google News는 같은 기사를 서로 다른 리다이렉트 링크로 감싸고, 같은 본문이 여러 언론사에 재게재(syndication)되므로
+# 그대로 두면 같은 기사를 여러 번 내려받고/추출하고/Gemini 프롬프트에 넣게 됩니다.
+#
+# [실행 단위 중복 제거] (NewsDeduper 하나를 수집기 전체가 공유)
+# 1. 다운로드 전 : 링크 정규화 (Google News 리다이렉트 해제 → 추적 파라미터/#/www/끝 슬래시 제거) 후 같은 URL이면 건너뜀
+#                  언론사 표기(" - Reuters")를 뗀 제목이 같아도 건너뜀 (충분히 긴 제목만)
+# 2. 추출 후     : 본문 SimHash(단어 3-gram shingle, 64bit)로 해밍 거리 10 이하인 기존 기사를 후보로 찾고,
+#                  shingle Jaccard 유사도가 0.7 이상이면 재게재본으로 보고 제외
+#                  (서로 다른 기사의 SimHash는 평균 32 정도 차이. 제목 접두어/바이라인/잘린 위치만 다른 재게재본은 3~10)
+#
+# 제외된 항목은 키워드별 수집 개수(limit)에 포함되지 않으므로, 각 키워드는 RSS의 다음 기사로 채워집니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import re
+import base64
+import hashlib
+import threading
+
+import numpy as np
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# 기사 내용과 무관한 추적/유입 경로 파라미터
+TRACKING_PARAMS   = {'fbclid', 'gclid', 'dclid', 'msclkid', 'ocid', 'cmpid', 'cmp', 'mod', 'taid', 'guccounter',
+                     'guce_referrer', 'guce_referrer_sig', 'ref', 'ref_src', 'src', 'smid', 'sr_share', 'soc_src', 'soc_trk',
+                     'yptr', 'ncid', 'partner', 'output', 'ito', 'in_source', 'via'}
+TRACKING_PREFIXES = ('utm_', 'mc_', 'pk_', 'at_')
+
+SIMHASH_BITS      = 64
+SIMHASH_BANDS     = 8      # 64bit를 8bit 8구간으로 나눠 후보 검색 (거리 7 이하는 반드시, 10 이하는 대부분 한 구간 이상 일치)
+SIMHASH_DISTANCE  = 10     # 후보로 볼 최대 해밍 거리
+JACCARD_MIN       = 0.7    # 후보의 shingle 집합 유사도가 이 이상이면 같은 기사로 판단
+SHINGLE_SIZE      = 3      # 단어 3-gram
+MIN_SHINGLES      = 20     # 본문이 이보다 짧으면(RSS 요약 대체 등) 본문 비교를 하지 않음
+MIN_TITLE_WORDS   = 6      # 이보다 짧은 제목("Stock market today" 등)은 제목 비교를 하지 않음
+
+_PUBLISHER_SUFFIX = re.compile(r'\s+[-|–—]\s+[^-|–—]{2,60}$')
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# URL 정규화 / Google News 리다이렉트 해제
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def canonicalize_url(url):
+    """
+    같은 기사를 가리키는 URL들이 같은 문자열이 되도록 정리합니다.
+
+    - scheme/host 소문자, 'www.' · 'amp.' · 'm.' 접두어 및 기본 포트 제거
+    - 추적 파라미터(utm_*, fbclid 등) 제거 후 나머지 파라미터 정렬
+    - 프래그먼트(#...), 끝 슬래시, AMP 경로(/amp, .amp) 제거
+    """
+    if not url: return url
+    parts = urlsplit(url.strip())
+    host  = (parts.hostname or '').lower()
+    for prefix in ('www.', 'amp.', 'm.'):
+        if host.startswith(prefix): host = host[len(prefix):]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r'/+', '/', parts.path or '/')
+    path = re.sub(r'(/amp/?|\.amp)$', '', path)
+    if len(path) > 1: path = path.rstrip('/')
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)]
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme, host, path, urlencode(sorted(query)), ''))
+
+
+def is_google_news_link(url):
+    parts = urlsplit(url or '')
+    return parts.hostname == 'news.google.com' and '/articles/' in parts.path
+
+
+def decode_google_news_link(url):
+    """
+    Google News 기사 링크(/rss/articles/CBMi...)에 인코딩된 원문 URL을 꺼냅니다.
+
+    기존 형식은 base64url 안에 protobuf(0x08 0x13 0x22 + 길이 + URL)로 원문 URL이 들어 있습니다.
+    원문 URL이 들어 있지 않은 신규 형식(AU_yqL...)이면 None을 반환합니다.
+    """
+    article_id = urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+    try:
+        raw = base64.urlsafe_b64decode(article_id + '=' * (-len(article_id) % 4))
+    except (ValueError, TypeError):
+        return None
+    if raw.startswith(b'\x08\x13"'):
+        raw = raw[3:]
+        length, shift, pos = 0, 0, 0
+        while pos < len(raw):                       # varint 길이
+            byte    = raw[pos]
+            length |= (byte & 0x7F) << shift
+            pos    += 1
+            shift  += 7
+            if not byte & 0x80: break
+        candidate = raw[pos:pos + length]
+    else:
+        start     = raw.find(b'http')
+        candidate = re.match(rb'[\x21-\x7e]+', raw[start:]).group(0) if start >= 0 else b''
+    try:
+        decoded = candidate.decode('ascii')
+    except UnicodeDecodeError:
+        return None
+    return decoded if decoded.startswith(('http://', 'https://')) else None
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# SimHash
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+_BIT_SHIFTS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """소문자 단어 size-gram 집합"""
+    words = re.findall(r'\w+', (text or '').lower())
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """shingle별 64bit 해시 (정렬된 uint64 배열)"""
+    grams = shingles(text, size)
+    return np.sort(np.fromiter((int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=8).digest(), 'big') for g in grams),
+                               dtype=np.uint64, count=len(grams)))
+
+
+def simhash_of(hashes):
+    """
+    shingle 해시들의 64bit SimHash
+
+    비트 위치별로 1이면 +1 / 0이면 -1을 더해 양수인 위치만 1로 둡니다. 합산은 (shingle 수 × 64) 행렬 한 번으로 계산합니다.
+    """
+    ones = ((hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)).sum(axis=0)
+    bits = (ones * 2 > len(hashes)).astype(np.uint64)
+    return int((bits << _BIT_SHIFTS).sum())
+
+
+def simhash(text, size=SHINGLE_SIZE):
+    """본문의 64bit SimHash를 계산합니다. (shingle 수가 MIN_SHINGLES 미만이면 None)"""
+    hashes = shingle_hashes(text, size)
+    return simhash_of(hashes) if len(hashes) >= MIN_SHINGLES else None
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def jaccard(a, b):
+    """정렬된 shingle 해시 배열 두 개의 Jaccard 유사도"""
+    common = len(np.intersect1d(a, b, assume_unique=True))
+    return common / (len(a) + len(b) - common) if len(a) + len(b) else 1.0
+
+
+class SimHashIndex:
+    """
+    SimHash 근접 검색 인덱스입니다. 64bit를 SIMHASH_BANDS개 구간으로 나눠 구간 값이 같은 후보만 비교합니다.
+    """
+
+    def __init__(self, distance=SIMHASH_DISTANCE, bands=SIMHASH_BANDS):
+        self.distance = distance
+        self.bands    = bands
+        self.width    = SIMHASH_BITS // bands
+        self.mask     = (1 << self.width) - 1
+        self.buckets  = [{} for _ in range(bands)]
+
+    def _keys(self, fingerprint):
+        return [(fingerprint >> (i * self.width)) & self.mask for i in range(self.bands)]
+
+    def candidates(self, fingerprint):
+        """거리 이내의 기존 지문들 (가까운 순)"""
+        found = set()
+        for bucket, key in zip(self.buckets, self._keys(fingerprint)):
+            found.update(other for other in bucket.get(key, ()) if hamming(fingerprint, other) <= self.distance)
+        return sorted(found, key=lambda other: hamming(fingerprint, other))
+
+    def add(self, fingerprint):
+        for bucket, key in zip(self.buckets, self._keys(fingerprint)):
+            bucket.setdefault(key, []).append(fingerprint)
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 실행 단위 중복 제거기
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def title_key(title):
+    """언론사 표기를 떼고 영문/숫자만 남긴 제목 (비교하기에 짧으면 None)"""
+    words = re.findall(r'\w+', _PUBLISHER_SUFFIX.sub('', title or '').lower())
+    return ' '.join(words) if len(words) >= MIN_TITLE_WORDS else None
+
+
+class NewsDeduper:
+    """
+    한 번의 실행 동안 여러 수집 스레드가 공유하는 뉴스 중복 제거기입니다.
+
+    Args:
+        session (callable): requests.Session을 반환하는 함수 (인코딩된 URL이 없는 Google News 링크 해제용, 생략 시 해제 안 함)
+        resolve_timeout (float): 리다이렉트 해제 요청 타임아웃(초)
+
+    [사용 예]
+        dedup = NewsDeduper(get_http_session)
+        link  = dedup.claim(entry.title, entry.link)   # None이면 이미 다른 검색어가 가져간 기사
+        ...다운로드/추출...
+        if dedup.add_body(content): items.append(item)
+    """
+
+    def __init__(self, session=None, resolve_timeout=5):
+        self.session         = session
+        self.resolve_timeout = resolve_timeout
+        self._lock           = threading.Lock()
+        self._resolved       = {}      # Google News 링크 → 원문 URL (실행당 1회 해제)
+        self._urls           = set()   # 정규화된 URL
+        self._titles         = set()   # title_key
+        self._index          = SimHashIndex()
+        self._bodies         = {}      # SimHash → shingle 해시 배열 (후보 확인용)
+        self.stats           = {'claimed': 0, 'url': 0, 'title': 0, 'body': 0}
+
+    def resolve(self, url):
+        """Google News 링크면 원문 URL로 바꿉니다. (해제 실패 시 원래 링크)"""
+        if not is_google_news_link(url):
+            return url
+        key = canonicalize_url(url)
+        with self._lock:
+            if key in self._resolved:
+                return self._resolved[key]
+        resolved = decode_google_news_link(url)
+        if not resolved and self.session:
+            try:
+                res = self.session().head(url, allow_redirects=True, timeout=self.resolve_timeout)
+                if not is_google_news_link(res.url): resolved = res.url
+            except Exception:
+                pass
+        with self._lock:
+            return self._resolved.setdefault(key, resolved or url)
+
+    def claim(self, title, link):
+        """
+        다운로드 전에 기사를 선점합니다.
+
+        Returns:
+            str: 내려받을 URL (Google News 리다이렉트 해제됨). 이미 같은 URL/제목의 기사가 있으면 None
+        """
+        url       = self.resolve(link)
+        canonical = canonicalize_url(url)
+        tkey      = title_key(title)
+        with self._lock:
+            if canonical in self._urls:
+                self.stats['url'] += 1
+                return None
+            if tkey and tkey in self._titles:
+                self.stats['title'] += 1
+                return None
+            self._urls.add(canonical)
+            if tkey: self._titles.add(tkey)
+            self.stats['claimed'] += 1
+        return url
+
+    def release(self, title, url):
+        """선점했지만 쓰지 않은 기사(앞서 요청했다가 취소된 항목)를 다른 검색어가 가져갈 수 있게 풀어줍니다."""
+        tkey = title_key(title)
+        with self._lock:
+            self._urls.discard(canonicalize_url(url))
+            if tkey: self._titles.discard(tkey)
+            self.stats['claimed'] -= 1
+
+    def add_body(self, text):
+        """
+        추출된 본문을 등록합니다.
+
+        Returns:
+            bool: 새 기사면 True, 이미 등록된 본문과 거의 같으면(재게재) False
+        """
+        hashes = shingle_hashes(text)
+        if len(hashes) < MIN_SHINGLES:
+            return True
+        fingerprint = simhash_of(hashes)
+        with self._lock:
+            for other in self._index.candidates(fingerprint):
+                if jaccard(hashes, self._bodies[other]) >= JACCARD_MIN:
+                    self.stats['body'] += 1
+                    return False
+            self._index.add(fingerprint)
+            self._bodies[fingerprint] = hashes
+        return True
+
+    def summary(self):
+        s = self.stats
+        return f"신규 {s['claimed']}건 / 제외: 같은 URL {s['url']}건, 같은 제목 {s['title']}건, 유사 본문 {s['body']}건"
@@ -0,0 +1,241 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Stage Scheduler (의존성 그래프 기반 단계 실행기)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# job()의 각 단계(수집, 분석, 영상 제작, 맵 캡처, 리포트, 업로드, 이메일)를 이름 붙은 Stage로 선언하고,
+# 입력(의존 단계)이 모두 준비되는 즉시 실행합니다.
+# 예) 리포트 본문 생성은 분석이 끝나면 바로 시작되어 영상 렌더링과 동시에 진행됩니다.
+#
+# [실패 정책]
+# - 예외: retries 횟수만큼 retry_delay 간격으로 재시도. 그래도 실패하면 'failed'
+# - 타임아웃: 단계가 "실제로 시작된 시점"부터 계산. 스레드는 강제 종료할 수 없으므로 결과를 버리고 'timeout'
+# - 실패/타임아웃 단계에 default(기본값 생성 함수)가 있으면 그 값으로 대체하여 후속 단계를 계속 진행,
+#   없으면 후속 단계는 'skipped' 처리 (연쇄)
+#
+# [리포트]
+# 실행이 끝나면 단계별 시작 시각/소요 시간/상태와 임계 경로(critical path: 가장 늦게 끝난 단계까지
+# 각 단계를 가장 늦게 풀어준 선행 단계를 거슬러 올라간 경로)를 출력합니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import time
+import traceback
+import multiprocessing
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from tracing import span
+
+
+class Stage:
+    """
+    파이프라인의 한 단계입니다.
+
+    Args:
+        name (str): 단계 이름 (후속 단계 함수의 키워드 인자 이름으로도 쓰임)
+        func (callable): func(**{의존 단계 이름: 결과}) 형태로 호출되는 함수
+        deps (tuple): 의존 단계 이름들
+        timeout (float): 타임아웃(초) (None이면 무제한)
+        retries (int): 예외 발생 시 재시도 횟수
+        executor (str): 'thread' 또는 'process' (process는 func/입력/결과가 pickle 가능해야 함)
+        default (callable): 실패/타임아웃 시 대체값 생성 함수 (예: list). None이면 후속 단계 건너뜀
+    """
+
+    def __init__(self, name, func, deps=(), timeout=None, retries=0, executor='thread', default=None):
+        self.name     = name
+        self.func     = func
+        self.deps     = tuple(deps)
+        self.timeout  = timeout
+        self.retries  = retries
+        self.executor = executor
+        self.default  = default
+
+
+class StageResult:
+    """단계 실행 결과 (status: 'ok' | 'failed' | 'timeout' | 'skipped')"""
+
+    def __init__(self, status, value=None, error=None, start=0.0, end=0.0, attempts=0):
+        self.status   = status
+        self.value    = value
+        self.error    = error
+        self.start    = start
+        self.end      = end
+        self.attempts = attempts
+
+    @property
+    def duration(self):
+        return max(0.0, self.end - self.start)
+
+
+def _call_with_retries(name, func, inputs, retries, retry_delay):
+    """func(**inputs)를 실행하고 (결과, 시도 횟수)를 반환합니다. 프로세스 풀에서도 쓰이므로 모듈 최상위 함수입니다."""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            with span(f"stage:{name}", "stage", attempt=attempt):
+                return func(**inputs), attempt
+        except Exception as e:
+            if attempt > retries:
+                e.attempts = attempt
+                raise
+            print(f"  🔁 재시도 {attempt}/{retries}: {e}", flush=True)
+            time.sleep(retry_delay)
+
+
+class StageScheduler:
+    """
+    Stage 목록을 의존성 순서에 맞춰 최대한 동시에 실행합니다.
+
+    Args:
+        stages (list): Stage 리스트 (선언 순서 = 동시에 준비된 단계의 제출 순서)
+        max_workers (int): 스레드 단계 동시 실행 수
+        process_workers (int): 프로세스 단계 동시 실행 수
+        retry_delay (float): 재시도 간격(초)
+
+    [사용 예]
+        results = StageScheduler([
+            Stage('collect_news', lambda: fetch_news_raw(keywords), default=list),
+            Stage('analyze'     , lambda collect_news: analyze(collect_news), deps=['collect_news']),
+        ]).run()
+        results['analyze'].value
+    """
+
+    def __init__(self, stages, max_workers=8, process_workers=2, retry_delay=2.0):
+        self.stages          = {s.name: s for s in stages}
+        self.max_workers     = max_workers
+        self.process_workers = process_workers
+        self.retry_delay     = retry_delay
+        self.results         = {}
+        self.t0              = None
+
+        for s in stages:
+            missing = [d for d in s.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"{s.name}: 알 수 없는 의존 단계 {missing}")
+        self._check_cycles()
+
+    def _check_cycles(self):
+        state = {}
+        def visit(name, chain):
+            if state.get(name) == 'done': return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"순환 의존성: {' -> '.join(chain + [name])}")
+            state[name] = 'visiting'
+            for d in self.stages[name].deps:
+                visit(d, chain + [name])
+            state[name] = 'done'
+        for name in self.stages:
+            visit(name, [])
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 실행
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def _finish(self, name, status, value=None, error=None, attempts=0, end=None):
+        stage = self.stages[name]
+        now   = time.perf_counter() if end is None else end
+        if status != 'ok' and stage.default is not None:
+            value = stage.default()
+        self.results[name] = StageResult(status, value, error, self._started.get(name, now), now, attempts)
+
+    def _blocked(self, stage):
+        """의존 단계 중 기본값 없이 실패한 것이 있으면 True"""
+        return any(self.results[d].status != 'ok' and self.stages[d].default is None for d in stage.deps)
+
+    def run(self):
+        """
+        모든 단계를 실행하고 {이름: StageResult}를 반환합니다. (종료 시 단계 리포트 출력)
+        """
+        self.t0       = time.perf_counter()
+        self._started = {}
+        threads       = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='stage')
+        processes     = None
+        running       = {}   # future -> 단계 이름
+        waiting       = list(self.stages)
+
+        def _thread_entry(name, func, inputs, retries):
+            self._started[name] = time.perf_counter()
+            return _call_with_retries(name, func, inputs, retries, self.retry_delay)
+
+        try:
+            while waiting or running:
+                # [Step 1] 입력이 준비된 단계 제출 (실패한 입력이 있으면 건너뜀)
+                for name in list(waiting):
+                    stage = self.stages[name]
+                    if any(d not in self.results for d in stage.deps): continue
+                    waiting.remove(name)
+                    if self._blocked(stage):
+                        self._started[name] = time.perf_counter()
+                        self._finish(name, 'skipped')
+                        print(f"  ⏭️ [{name}] 건너뜀 (선행 단계 실패)", flush=True)
+                        continue
+
+                    inputs = {d: self.results[d].value for d in stage.deps}
+                    if stage.executor == 'process':
+                        if processes is None:
+                            processes = ProcessPoolExecutor(max_workers=self.process_workers,
+                                                            mp_context=multiprocessing.get_context('fork'))
+                        self._started[name] = time.perf_counter()  # 프로세스 단계는 제출 시각 기준
+                        fut = processes.submit(_call_with_retries, name, stage.func, inputs, stage.retries, self.retry_delay)
+                    else:
+                        fut = threads.submit(_thread_entry, name, stage.func, inputs, stage.retries)
+                    running[fut] = name
+
+                if not running:
+                    continue  # 방금 건너뛴 단계 때문에 새로 준비된 단계가 있을 수 있음
+
+                # [Step 2] 완료된 단계 회수
+                done, _ = wait(list(running), timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    try:
+                        value, attempts = fut.result()
+                        self._finish(name, 'ok', value, attempts=attempts)
+                    except Exception as e:
+                        print(f"  ⚠️ [{name}] 실패: {e}", flush=True)
+                        traceback.print_exception(type(e), e, e.__traceback__)
+                        self._finish(name, 'failed', error=e, attempts=getattr(e, 'attempts', 1))
+
+                # [Step 3] 타임아웃 검사 (실제 시작 시각 기준)
+                now = time.perf_counter()
+                for fut, name in list(running.items()):
+                    timeout = self.stages[name].timeout
+                    if timeout is None or name not in self._started: continue
+                    elapsed = now - self._started[name]
+                    if elapsed > timeout:
+                        print(f"  ⏰ [{name}] 타임아웃 ({elapsed:.1f}초)", flush=True)
+                        running.pop(fut)
+                        fut.cancel()
+                        self._finish(name, 'timeout', error=TimeoutError(f"{timeout}초 초과"), attempts=1, end=now)
+        finally:
+            # 타임아웃된 스레드를 기다리지 않고 바로 반환
+            threads.shutdown(wait=False, cancel_futures=True)
+            if processes is not None:
+                processes.shutdown(wait=False, cancel_futures=True)
+
+        self.print_report()
+        return self.results
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 리포트
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def critical_path(self):
+        """가장 늦게 끝난 단계에서 시작해, 각 단계의 가장 늦게 끝난 선행 단계를 거슬러 올라간 경로"""
+        if not self.results: return []
+        name = max(self.results, key=lambda n: self.results[n].end)
+        path = [name]
+        while self.stages[name].deps:
+            name = max(self.stages[name].deps, key=lambda d: self.results[d].end)
+            path.append(name)
+        return list(reversed(path))
+
+    def print_report(self):
+        icons = {'ok': '✅', 'failed': '❌', 'timeout': '⏰', 'skipped': '⏭️'}
+        total = max((r.end for r in self.results.values()), default=self.t0) - self.t0
+        print(f"⏱️ 단계별 실행 리포트 (전체 {total:.1f}초):")
+        for name, r in sorted(self.results.items(), key=lambda kv: kv[1].start):
+            retry = f" (시도 {r.attempts}회)" if r.attempts > 1 else ""
+            print(f"   {icons.get(r.status, '?')} {name:<18} 시작 +{r.start - self.t0:6.1f}초 | 소요 {r.duration:6.1f}초{retry}")
+
+        path = self.critical_path()
+        if path:
+            chain = " → ".join(f"{n}({self.results[n].duration:.1f}s)" for n in path)
+            print(f"   🧭 임계 경로: {chain}")
@@ -0,0 +1,95 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Stream JSON (스트리밍 응답용 점진적 JSON 스캐너)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Gemini 스트리밍 응답은 JSON이 조각(chunk) 단위로 도착하므로 끝까지 받기 전에는 json.loads를 할 수 없습니다.
+# 이 스캐너는 조각을 받을 때마다 문자 단위로 구조(객체/배열/키)를 추적하다가,
+# 문자열 값 하나가 완성되는 순간 (경로, 값)으로 콜백을 호출합니다.
+#
+# [예]
+#   {"scripts": {"scene1": "안녕하세요...", "scene2": ...
+#   → "scene1" 값의 닫는 따옴표가 도착하는 즉시 on_string(('scripts', 'scene1'), "안녕하세요...")
+#
+# 응답 앞의 ```json 같은 군더더기는 첫 '{' 이전이므로 무시됩니다.
+# 최종 결과는 기존처럼 전체 텍스트를 json.loads로 파싱합니다. (이 스캐너는 조기 전달 용도로만 사용)
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import json
+
+
+class IncrementalJSONScanner:
+    """
+    조각 단위로 들어오는 JSON 텍스트에서 완성된 문자열 값을 즉시 알려주는 스캐너입니다.
+
+    Args:
+        on_string (callable): on_string(path, value) - path는 객체 키/배열 인덱스의 튜플
+
+    [사용 예]
+        scanner = IncrementalJSONScanner(lambda path, value: print(path, value))
+        for chunk in response:
+            scanner.feed(chunk.text)
+    """
+
+    def __init__(self, on_string):
+        self.on_string = on_string
+        self.started   = False    # 첫 '{'를 만났는지
+        self.done      = False    # 최상위 객체가 닫혔는지
+        self.stack     = []       # [{'type': 'obj'|'arr', 'key': 현재 키, 'expect_key': bool, 'index': 배열 인덱스}]
+        self.in_string = False
+        self.escape    = False
+        self.buffer    = []
+
+    def _path(self):
+        path = []
+        for frame in self.stack:
+            path.append(frame['key'] if frame['type'] == 'obj' else frame['index'])
+        return tuple(path)
+
+    def _end_string(self):
+        raw = ''.join(self.buffer)
+        self.buffer = []
+        try:
+            value = json.loads('"' + raw + '"')
+        except ValueError:
+            value = raw
+        top = self.stack[-1] if self.stack else None
+        if top and top['type'] == 'obj' and top['expect_key']:
+            top['key']        = value
+            top['expect_key'] = False
+        elif top:
+            self.on_string(self._path(), value)
+
+    def feed(self, chunk):
+        """새로 도착한 텍스트 조각을 처리합니다."""
+        for ch in chunk or "":
+            if self.done: return
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                    self.buffer.append(ch)
+                elif ch == '\\':
+                    self.escape = True
+                    self.buffer.append(ch)
+                elif ch == '"':
+                    self.in_string = False
+                    self._end_string()
+                else:
+                    self.buffer.append(ch)
+                continue
+
+            if not self.started:
+                if ch != '{': continue
+                self.started = True
+
+            if ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                self.stack.append({'type': 'obj', 'key': None, 'expect_key': True, 'index': None})
+            elif ch == '[':
+                self.stack.append({'type': 'arr', 'key': None, 'expect_key': False, 'index': 0})
+            elif ch in '}]':
+                if self.stack: self.stack.pop()
+                if not self.stack: self.done = True
+            elif ch == ',' and self.stack:
+                top = self.stack[-1]
+                if top['type'] == 'obj': top['expect_key'] = True
+                else                   : top['index'] += 1
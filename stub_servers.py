@@ -0,0 +1,472 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Stub Servers (로컬 대역 서버)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 외부 서비스(CNN, TradingView 등)를 대신하는 로컬 HTTP 서버 모음입니다.
+# 네트워크 없이 브라우저 캡처 등 파이프라인 일부를 확인하거나 성능을 측정할 때 사용합니다.
+#
+# [사용 예]
+#   python stub_servers.py fixtures            # fixtures 폴더를 http://127.0.0.1:8765/ 로 서비스
+#   FEAR_GREED_URL=http://127.0.0.1:8765/browser/fear_greed.html python agent.py
+#   python stub_servers.py tts                 # Qwen3-TTS 대역 서버를 http://127.0.0.1:8002 로 실행
+#   python stub_servers.py news                # Google News RSS + 기사 대역 서버 (GOOGLE_NEWS_RSS_URL={url}/rss/search)
+#   python stub_servers.py youtube             # YouTube Data API + 업로드 대역 서버 (YOUTUBE_API_ENDPOINT/YOUTUBE_UPLOAD_ENDPOINT={url})
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import wave
+import random
+import hashlib
+import threading
+import functools
+
+from array import array
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import parse_qs, urlsplit
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler, SimpleHTTPRequestHandler
+
+
+# 저장소에 포함된 기본 픽스처 폴더
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """요청마다 로그를 찍지 않는 정적 파일 핸들러입니다."""
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(handler_class, host='127.0.0.1', port=0):
+    """
+    백그라운드 스레드에서 HTTP 서버를 띄웁니다.
+
+    Args:
+        handler_class: BaseHTTPRequestHandler 하위 클래스 (또는 functools.partial)
+        host (str): 바인딩 주소 (기본값: 127.0.0.1)
+        port (int): 포트 (0이면 빈 포트 자동 선택)
+
+    Returns:
+        tuple: (server, base_url) - 종료 시 server.shutdown() 호출
+    """
+    server        = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    thread        = threading.Thread(target=server.serve_forever, name='stub-server', daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def serve_directory(directory=FIXTURE_DIR, host='127.0.0.1', port=0):
+    """directory의 파일을 정적으로 서비스하는 서버를 띄웁니다. (반환값은 start_server와 동일)"""
+    return start_server(functools.partial(_QuietHandler, directory=directory), host, port)
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# TTS 대역 서버 (Qwen3-TTS /generate 흉내)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 문장 길이에 비례하는 길이의 사인파 WAV를 돌려줍니다. (한국어 낭독 속도 약 초당 8자 기준)
+# 서버 객체의 request_count / texts로 실제 합성 요청 횟수와 내용을 확인할 수 있습니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def make_tone_wav(duration, sample_rate=24000, freq=220.0):
+    """duration초 길이의 16bit 모노 사인파 WAV 바이트를 만듭니다."""
+    n_samples = max(1, int(duration * sample_rate))
+    period    = array('h', (int(8000 * math.sin(2 * math.pi * freq * i / sample_rate)) for i in range(int(sample_rate / freq) * 4)))
+    frames    = (period * (n_samples // len(period) + 1))[:n_samples].tobytes()
+    buf       = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(frames)
+    return buf.getvalue()
+
+
+def _parse_form(content_type, body):
+    """application/x-www-form-urlencoded 또는 multipart/form-data 본문에서 텍스트 필드만 꺼냅니다."""
+    if content_type.startswith('multipart/form-data'):
+        message = BytesParser(policy=HTTP).parsebytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+        fields  = {}
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name and not part.get_filename():
+                fields[name] = part.get_payload(decode=True).decode('utf-8')
+        return fields
+    return {k: v[0] for k, v in parse_qs(body.decode('utf-8')).items()}
+
+
+class TTSStubHandler(BaseHTTPRequestHandler):
+    """POST /generate → 문장 길이에 맞춘 톤 WAV"""
+
+    def do_POST(self):
+        if self.path != '/generate':
+            self.send_error(404)
+            return
+        body   = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        fields = _parse_form(self.headers.get('Content-Type', ''), body)
+        text   = fields.get('text', '')
+
+        with self.server.lock:
+            self.server.request_count += 1
+            self.server.texts.append(text)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        audio = make_tone_wav(max(0.5, len(text) / self.server.chars_per_second))
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/wav')
+        self.send_header('Content-Length', str(len(audio)))
+        self.end_headers()
+        self.wfile.write(audio)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_tts_stub(host='127.0.0.1', port=0, latency=0.0, chars_per_second=8.0):
+    """
+    TTS 대역 서버를 띄웁니다.
+
+    Args:
+        latency (float): 요청마다 추가할 처리 지연(초) - 실제 GPU 합성 시간 흉내
+        chars_per_second (float): 생성할 음성 길이 계산용 낭독 속도
+
+    Returns:
+        tuple: (server, base_url) - tts_config의 server_url에 base_url을 넣어 사용
+    """
+    server, url             = start_server(TTSStubHandler, host, port)
+    server.lock             = threading.Lock()
+    server.request_count    = 0
+    server.texts            = []
+    server.latency          = latency
+    server.chars_per_second = chars_per_second
+    return server, url
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 결정적 픽스처 텍스트
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 같은 seed 문자열이면 항상 같은 문장/ID가 나오므로, 실행마다 같은 입력으로 성능을 비교할 수 있습니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+_WORDS = ("market stocks rally earnings guidance revenue growth inflation rates federal reserve investors shares "
+          "quarter outlook demand supply chips cloud energy oil bond yields dollar consumer spending analysts "
+          "forecast margin sector technology banks volatility index futures trading session record").split()
+
+
+def _rng(seed):
+    return random.Random(hashlib.sha256(seed.encode('utf-8')).hexdigest())
+
+
+def fixture_sentences(seed, count, words=(8, 18)):
+    """seed로 정해지는 영어 문장 count개를 만듭니다."""
+    rng = _rng(seed)
+    return [' '.join(rng.choice(_WORDS) for _ in range(rng.randint(*words))).capitalize() + '.' for _ in range(count)]
+
+
+def stub_video_id(*parts):
+    """대역 YouTube 서버가 돌려주는 영상 ID (자막 캐시를 미리 채울 때 같은 ID 계산용)"""
+    return 'v' + hashlib.sha1('|'.join(map(str, parts)).encode('utf-8')).hexdigest()[:10]
+
+
+def _send_body(handler, status, body, content_type):
+    handler.send_response(status)
+    handler.send_header('Content-Type', content_type)
+    handler.send_header('Content-Length', str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def _count_request(server, name):
+    with server.lock:
+        server.calls[name] = server.calls.get(name, 0) + 1
+    if server.latency:
+        time.sleep(server.latency)
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 뉴스 대역 서버 (Google News RSS 검색 + 기사 페이지 흉내)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# GET /rss/search?q=키워드+when:1d  → 키워드마다 articles_per_query개의 항목이 있는 RSS
+# GET /article/{키워드 해시}/{번호} → 본문 문단 paragraphs개의 기사 HTML (trafilatura 추출 대상)
+# GET /article/wire/{기사}/{언론사} → 통신사 기사 재게재본 (본문은 같고 제목/바이라인만 언론사마다 다름)
+#
+# [재게재 흉내] RSS 항목 중 wire_share 비율은 wire_pool개의 공통 통신사 기사 중 하나를 가리킵니다.
+# 링크에는 검색어마다 다른 utm 파라미터가 붙으므로, 여러 검색어가 같은 기사를 서로 다른 URL/제목으로 받게 됩니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+class NewsStubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.endswith('/rss/search'):
+            _count_request(self.server, 'rss')
+            query = parse_qs(url.query).get('q', [''])[0].replace(' when:1d', '')
+            _send_body(self, 200, self._rss(query), 'application/rss+xml; charset=utf-8')
+        elif url.path.startswith('/article/'):
+            _count_request(self.server, 'article')
+            _send_body(self, 200, self._article(url.path), 'text/html; charset=utf-8')
+        else:
+            self.send_error(404)
+
+    WIRE_OUTLETS = ['Wire Daily', 'Market Herald', 'Finance Post']
+
+    @staticmethod
+    def _wire_title(story, outlet):
+        title = fixture_sentences(f"wire|{story}|title", 1)[0].rstrip('.')
+        return [title, f"UPDATE 1-{title}", f"{title} (analysis)"][outlet]
+
+    def _rss(self, query):
+        base  = f"http://{self.headers.get('Host')}"
+        slug  = hashlib.sha1(query.encode('utf-8')).hexdigest()[:12]
+        now   = datetime.utcnow()
+        rng   = _rng(f"{query}|items")
+        items = []
+        for i in range(self.server.articles_per_query):
+            if rng.random() < self.server.wire_share:
+                story, outlet = rng.randrange(self.server.wire_pool), rng.randrange(len(self.WIRE_OUTLETS))
+                title = f"{self._wire_title(story, outlet)} - {self.WIRE_OUTLETS[outlet]}"
+                link  = f"{base}/article/wire/{story}/{outlet}?utm_source=gnews&amp;utm_term={slug}"
+                desc  = fixture_sentences(f"wire|{story}|desc", 1)[0]
+            else:
+                title, desc = fixture_sentences(f"{query}|{i}|title", 2)
+                title = f"{query}: {title}"
+                link  = f"{base}/article/{slug}/{i}"
+            items.append(f"<item><title>{escape(title)}</title>"
+                         f"<link>{link}</link>"
+                         f"<description>{escape(desc)}</description>"
+                         f"<pubDate>{(now - timedelta(hours=i + 1)).strftime('%a, %d %b %Y %H:%M:%S GMT')}</pubDate></item>")
+        return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{escape(query)}</title>'
+                f"{''.join(items)}</channel></rss>").encode('utf-8')
+
+    def _article(self, path):
+        parts = path.strip('/').split('/')
+        if len(parts) == 4 and parts[1] == 'wire':
+            story, outlet = int(parts[2]), int(parts[3])
+            seed, title   = f"wire|{story}", self._wire_title(story, outlet)
+            byline        = [f"Reporting by {self.WIRE_OUTLETS[outlet]} staff; editing by desk {outlet}."]
+        else:
+            seed, title, byline = path, fixture_sentences(path, 1)[0], []
+        paragraphs = [' '.join(fixture_sentences(f"{seed}|{i}", 5)) for i in range(self.server.paragraphs)] + byline
+        body       = ''.join(f"<p>{p}</p>" for p in paragraphs)
+        return (f"<html><head><title>{escape(title)}</title></head><body><nav>Home | Markets | Tech</nav>"
+                f"<article><h1>{escape(title)}</h1>{body}</article>"
+                f"<footer>© Stub News</footer></body></html>").encode('utf-8')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_news_stub(host='127.0.0.1', port=0, latency=0.0, articles_per_query=6, paragraphs=8, wire_share=0.4, wire_pool=40):
+    """
+    뉴스 대역 서버를 띄웁니다.
+
+    Args:
+        latency (float): 요청마다 추가할 지연(초)
+        articles_per_query (int): RSS 한 건에 들어갈 기사 수
+        paragraphs (int): 기사 본문 문단 수 (문단당 약 5문장)
+        wire_share (float): RSS 항목 중 공통 통신사 기사(재게재본)를 가리키는 비율 (0이면 모두 고유 기사)
+        wire_pool (int): 공통 통신사 기사 수
+
+    Returns:
+        tuple: (server, base_url) - GOOGLE_NEWS_RSS_URL에 {base_url}/rss/search를 넣어 사용
+               server.calls = {'rss': 요청 수, 'article': 요청 수}
+    """
+    server, url               = start_server(NewsStubHandler, host, port)
+    server.lock               = threading.Lock()
+    server.calls              = {}
+    server.latency            = latency
+    server.articles_per_query = articles_per_query
+    server.paragraphs         = paragraphs
+    server.wire_share         = wire_share
+    server.wire_pool          = wire_pool
+    return server, url
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# YouTube Data API 대역 서버 (v3 channels / playlistItems / search / videos)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# googleapiclient의 client_options={'api_endpoint': base_url}로 연결합니다.
+# 모든 영상은 1시간 전에 올라온 것으로 응답하며, 영상 ID는 stub_video_id()로 계산됩니다.
+# - uploads 재생목록 : stub_video_id(playlistId, 0..maxResults-1)
+# - 검색             : stub_video_id(q, 0..maxResults-1)
+# server.calls에 엔드포인트별 호출 수, server.quota에 사용한 할당량(공식 단가 기준)이 쌓입니다.
+#
+# [재개 가능 업로드] YOUTUBE_UPLOAD_ENDPOINT=base_url 로 youtube_manager.upload_short를 연결합니다.
+# - POST /upload/youtube/v3/videos?uploadType=resumable → Location: 세션 URI (upload_id)
+# - PUT 세션 URI (Content-Range: bytes a-b/전체) → 308 + Range: bytes=0-N, 마지막 청크는 200 + 영상 리소스
+# - PUT 세션 URI (Content-Range: bytes */전체)   → 받은 위치 조회
+# - 장애 흉내: upload_fail_rate 비율의 청크는 503, upload_drop_rate 비율의 청크는 앞 절반만 받고 응답 없이 연결 끊기
+# 받은 바이트는 저장하지 않고 크기와 sha256만 server.uploads[upload_id]에 기록합니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+YOUTUBE_QUOTA_COST = {'channels': 1, 'playlistItems': 1, 'videos': 1, 'search': 100, 'videos.insert': 1600}
+
+
+class YouTubeStubHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url      = urlsplit(self.path)
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+        params   = {k: v[0] for k, v in parse_qs(url.query).items()}
+        builder  = getattr(self, f"_{endpoint}", None)
+        if builder is None:
+            self.send_error(404)
+            return
+        _count_request(self.server, endpoint)
+        with self.server.lock:
+            self.server.quota += YOUTUBE_QUOTA_COST.get(endpoint, 1)
+        body = json.dumps({'kind': f"youtube#{endpoint}ListResponse", 'items': builder(params)}).encode('utf-8')
+        _send_body(self, 200, body, 'application/json; charset=utf-8')
+
+    @staticmethod
+    def _snippet(video_id, title, channel):
+        published = (datetime.utcnow() - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {'title': title, 'channelTitle': channel, 'publishedAt': published,
+                'description': ' '.join(fixture_sentences(video_id, 3)),
+                'resourceId': {'kind': 'youtube#video', 'videoId': video_id}}
+
+    def _channels(self, params):
+        return [{'id': cid, 'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + cid[2:]}},
+                 'snippet': {'title': f"Channel {cid[-4:]}"}}
+                for cid in params.get('id', '').split(',') if cid]
+
+    def _playlistItems(self, params):
+        playlist = params.get('playlistId', '')
+        count    = int(params.get('maxResults', 5))
+        return [{'snippet': self._snippet(stub_video_id(playlist, i), fixture_sentences(f"{playlist}|{i}", 1)[0], playlist)}
+                for i in range(count)]
+
+    def _search(self, params):
+        query = params.get('q', '')
+        count = int(params.get('maxResults', 5))
+        return [{'id': {'kind': 'youtube#video', 'videoId': stub_video_id(query, i)},
+                 'snippet': self._snippet(stub_video_id(query, i), f"{query} #{i}", f"Creator {i}")}
+                for i in range(count)]
+
+    def _videos(self, params):
+        return [{'id': vid, 'snippet': self._snippet(vid, fixture_sentences(vid, 1)[0], 'Stub')}
+                for vid in params.get('id', '').split(',') if vid]
+
+    # ---------------------------------------------------------------------------------------------------------------------#
+    # 재개 가능 업로드
+    # ---------------------------------------------------------------------------------------------------------------------#
+    def do_POST(self):
+        url    = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path != '/upload/youtube/v3/videos' or params.get('uploadType') != 'resumable':
+            self.send_error(404)
+            return
+        metadata = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        _count_request(self.server, 'videos.insert')
+        with self.server.lock:
+            self.server.quota += YOUTUBE_QUOTA_COST['videos.insert']
+            upload_id = f"u{len(self.server.uploads) + 1:04d}"
+            self.server.uploads[upload_id] = {
+                'total'   : int(self.headers.get('X-Upload-Content-Length', 0)),
+                'received': 0,
+                'sha256'  : hashlib.sha256(),
+                'metadata': metadata,
+                'video_id': None,
+            }
+        self.send_response(200)
+        self.send_header('Location', f"http://{self.headers['Host']}{url.path}?uploadType=resumable&upload_id={upload_id}")
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_PUT(self):
+        params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        data   = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            upload = self.server.uploads.get(params.get('upload_id', ''))
+        if upload is None:
+            self.send_error(404)   # 만료된 세션
+            return
+        _count_request(self.server, 'upload_chunk' if data else 'upload_status')
+
+        content_range = self.headers.get('Content-Range', '')    # 'bytes a-b/total' 또는 'bytes */total'
+        if data:
+            start = int(content_range.split()[1].split('-')[0])
+            fault = self.server.rng.random()
+            if fault < self.server.upload_fail_rate:
+                _send_body(self, 503, b'{"error": "backendError"}', 'application/json')
+                return
+            if start == upload['received']:
+                if fault < self.server.upload_fail_rate + self.server.upload_drop_rate:
+                    # 앞 절반만 도착한 채 연결이 끊긴 상황
+                    half = data[:len(data) // 2]
+                    upload['sha256'].update(half)
+                    upload['received'] += len(half)
+                    self.server.received_bytes += len(half)
+                    self.close_connection = True
+                    return
+                upload['sha256'].update(data)
+                upload['received'] += len(data)
+                self.server.received_bytes += len(data)
+
+        if upload['total'] and upload['received'] >= upload['total']:
+            if upload['video_id'] is None:
+                upload['video_id'] = stub_video_id('upload', upload['sha256'].hexdigest())
+            body = {'kind': 'youtube#video', 'id': upload['video_id'], **upload['metadata']}
+            _send_body(self, 200, json.dumps(body, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+            return
+
+        self.send_response(308)
+        if upload['received']:
+            self.send_header('Range', f"bytes=0-{upload['received'] - 1}")
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_youtube_stub(host='127.0.0.1', port=0, latency=0.0, upload_fail_rate=0.0, upload_drop_rate=0.0, seed='upload'):
+    """
+    YouTube Data API 대역 서버를 띄웁니다. (재개 가능 업로드 포함)
+
+    Args:
+        upload_fail_rate (float): 업로드 청크 중 503으로 응답할 비율
+        upload_drop_rate (float): 업로드 청크 중 절반만 받고 연결을 끊을 비율
+        seed (str): 장애 발생 순서를 정하는 seed (같은 seed면 같은 순서)
+
+    Returns:
+        tuple: (server, base_url) - YOUTUBE_API_ENDPOINT / YOUTUBE_UPLOAD_ENDPOINT에 base_url을 넣어 사용
+    """
+    server, url             = start_server(YouTubeStubHandler, host, port)
+    server.lock             = threading.Lock()
+    server.calls            = {}
+    server.quota            = 0
+    server.latency          = latency
+    server.uploads          = {}
+    server.received_bytes   = 0
+    server.upload_fail_rate = upload_fail_rate
+    server.upload_drop_rate = upload_drop_rate
+    server.rng              = _rng(seed)
+    return server, url
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'tts':
+        server, url = start_tts_stub(port=8002)
+        print(f"🔊 TTS 대역 서버 실행 중: {url}/generate - Ctrl+C로 종료")
+    elif len(sys.argv) > 1 and sys.argv[1] == 'news':
+        server, url = start_news_stub(port=8766)
+        print(f"📰 뉴스 대역 서버 실행 중: {url}/rss/search - Ctrl+C로 종료")
+    elif len(sys.argv) > 1 and sys.argv[1] == 'youtube':
+        server, url = start_youtube_stub(port=8767)
+        print(f"🎥 YouTube API 대역 서버 실행 중: {url} - Ctrl+C로 종료")
+    else:
+        directory   = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_DIR
+        server, url = serve_directory(directory, port=8765)
+        print(f"📂 픽스처 서버 실행 중: {url}/ ({directory}) - Ctrl+C로 종료")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,113 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# youtube_manager.ResumableUpload 테스트 (로컬 YouTube 대역 서버 사용, 네트워크/인증 불필요)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 실행: python -m pytest -q tests
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import sys
+import hashlib
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disk_cache import DiskCache
+from stub_servers import start_youtube_stub
+from youtube_manager import ResumableUpload, UploadError, CHUNK_UNIT
+
+
+BODY   = {'snippet': {'title': 'test', 'description': ''}, 'status': {'privacyStatus': 'private'}}
+CONFIG = {'chunk_mb': CHUNK_UNIT / (1024 * 1024), 'max_retries': 20, 'backoff_base': 0.0, 'timeout': 10}
+
+
+class _Interrupted(Exception):
+    """업로드 도중 프로세스가 죽은 상황 흉내"""
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(CHUNK_UNIT * 5 + 12345))   # 청크 6개 (마지막 청크는 256KiB보다 작음)
+    return str(path)
+
+
+@pytest.fixture
+def state(tmp_path):
+    return DiskCache(str(tmp_path / "upload_state"), max_bytes=1024 * 1024)
+
+
+def _stub(**faults):
+    server, url = start_youtube_stub(seed='test-upload', **faults)
+    return server, url
+
+
+def _sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def test_upload_survives_503_and_dropped_connections(video, state):
+    server, url = _stub(upload_fail_rate=0.2, upload_drop_rate=0.2)
+    try:
+        upload = ResumableUpload(requests.Session(), video, BODY, CONFIG, endpoint=url, state=state)
+        result = upload.run()
+        (stored,) = server.uploads.values()
+        assert result['id'] == stored['video_id']
+        assert stored['received'] == os.path.getsize(video)
+        assert stored['sha256'].hexdigest() == _sha256(video)
+        assert upload.bytes_sent > os.path.getsize(video)       # 장애 때문에 다시 보낸 바이트가 있어야 함
+        assert state.get_json(upload.state_key) is None         # 완료 후 세션 URI 삭제
+    finally:
+        server.shutdown()
+
+
+def test_upload_resumes_from_saved_session(video, state):
+    server, url = _stub()
+    try:
+        def crash_after_two_chunks(offset, total):
+            if offset >= 2 * CHUNK_UNIT:
+                raise _Interrupted()
+
+        first = ResumableUpload(requests.Session(), video, BODY, CONFIG, endpoint=url, state=state)
+        with pytest.raises(_Interrupted):
+            first.run(on_progress=crash_after_two_chunks)
+        assert state.get_json(first.state_key) is not None     # 세션 URI가 남아 있어야 이어받을 수 있음
+
+        second = ResumableUpload(requests.Session(), video, BODY, CONFIG, endpoint=url, state=state)
+        result = second.run()
+        (stored,) = server.uploads.values()                     # 새 세션을 만들지 않음
+        assert result['id'] == stored['video_id']
+        assert second.resumed_from == 2 * CHUNK_UNIT
+        assert second.bytes_sent == os.path.getsize(video) - 2 * CHUNK_UNIT
+        assert stored['sha256'].hexdigest() == _sha256(video)
+    finally:
+        server.shutdown()
+
+
+class _StalledSession:
+    """세션 생성은 되지만 모든 PUT에 Range 없는 308만 돌려주는 서버 흉내"""
+
+    class _Response:
+        def __init__(self, status_code, headers=None):
+            self.status_code = status_code
+            self.headers     = headers or {}
+            self.text        = ''
+
+    def __init__(self):
+        self.requests = 0
+
+    def request(self, method, url, **kwargs):
+        self.requests += 1
+        if method == 'POST':
+            return self._Response(200, {'Location': 'http://stub/session'})
+        return self._Response(308)
+
+
+def test_unacknowledged_chunks_count_as_failures(video, state):
+    session = _StalledSession()
+    upload  = ResumableUpload(session, video, BODY, {**CONFIG, 'max_retries': 3}, endpoint='http://stub', state=state)
+    with pytest.raises(UploadError):
+        upload.run()
+    assert session.requests < 20
@@ -0,0 +1,163 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Text Render (Pillow 기반 텍스트 래스터라이저)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# MoviePy TextClip은 글자 하나를 만들 때마다 ImageMagick(convert) 프로세스를 띄웁니다.
+# 자막 문장, 표 셀, 제목 띠까지 영상 하나에 수백 번 호출되므로, 같은 일을 PIL ImageFont/ImageDraw로
+# 프로세스 안에서 처리하고 ImageClip이 바로 받을 수 있는 RGBA 배열을 반환합니다. (임시 파일 없음)
+#
+# [TextClip 호환 인자]
+# - fontsize, color, font, method('label' | 'caption'), size=(너비, None), align('center' | 'West' | 'East'),
+#   stroke_color, stroke_width, bg_color, interline
+# - 'caption'은 지정된 너비에 맞춰 자동 줄바꿈하고, 'label'은 글자 크기에 딱 맞는 이미지를 만듭니다.
+#
+# [캐시]
+# 폰트 객체, 줄바꿈 결과(레이아웃), 완성된 RGBA 배열을 각각 LRU 캐시에 보관합니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import numpy as np
+
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont, ImageColor
+
+
+# 정렬 이름 (ImageMagick gravity 표기 포함)
+_ALIGN = {
+    'center': 'center', 'centre': 'center', 'center-center': 'center',
+    'west'  : 'left'  , 'left'  : 'left'  , 'northwest'    : 'left',  'southwest': 'left',
+    'east'  : 'right' , 'right' : 'right' , 'northeast'    : 'right', 'southeast': 'right',
+}
+
+
+@lru_cache(maxsize=64)
+def load_font(font, fontsize):
+    """
+    폰트 경로(또는 시스템 폰트 이름)와 크기로 FreeType 폰트를 불러옵니다.
+
+    Returns:
+        ImageFont.FreeTypeFont: 불러오기 실패 시 None
+    """
+    try:
+        return ImageFont.truetype(font, int(fontsize))
+    except (OSError, ValueError):
+        return None
+
+
+def _line_width(font, line):
+    return font.getlength(line) if line else 0.0
+
+
+def _wrap_paragraph(paragraph, font, max_width):
+    """단어 단위로 줄바꿈하되, 한 단어가 max_width보다 길면 글자 단위로 자릅니다."""
+    lines   = []
+    current = ""
+    for word in paragraph.split(' '):
+        candidate = f"{current} {word}" if current else word
+        if _line_width(font, candidate) <= max_width:
+            current = candidate
+            continue
+        if current:
+            lines.append(current)
+        # 단어 하나가 한 줄보다 긴 경우 (띄어쓰기 없는 긴 문장 등)
+        current = ""
+        for ch in word:
+            if current and _line_width(font, current + ch) > max_width:
+                lines.append(current)
+                current = ch
+            else:
+                current += ch
+    lines.append(current)
+    return lines
+
+
+@lru_cache(maxsize=1024)
+def layout_text(text, font, fontsize, max_width=None):
+    """
+    텍스트를 줄 단위로 나누고 각 줄의 너비를 측정합니다.
+
+    Returns:
+        tuple: (lines, widths, line_height) 또는 폰트를 못 불러오면 None
+    """
+    pil_font = load_font(font, fontsize)
+    if pil_font is None: return None
+
+    lines = []
+    for paragraph in text.split('\n'):
+        lines.extend(_wrap_paragraph(paragraph, pil_font, max_width) if max_width else [paragraph])
+
+    ascent, descent = pil_font.getmetrics()
+    widths          = tuple(_line_width(pil_font, line) for line in lines)
+    return tuple(lines), widths, ascent + descent
+
+
+def measure_text(text, font, fontsize, max_width=None):
+    """렌더링하지 않고 (너비, 높이)만 계산합니다."""
+    layout = layout_text(text, font, fontsize, max_width)
+    if layout is None: return None
+    lines, widths, line_height = layout
+    return int(np.ceil(max(widths) if widths else 0)), line_height * len(lines)
+
+
+def _to_rgba(color, default=(255, 255, 255, 255)):
+    if color is None: return default
+    if isinstance(color, str):
+        if color == 'transparent': return (0, 0, 0, 0)
+        rgb = ImageColor.getrgb(color)
+    else:
+        rgb = tuple(int(c) for c in color)
+    return rgb if len(rgb) == 4 else rgb + (255,)
+
+
+@lru_cache(maxsize=256)
+def _render_cached(text, font, fontsize, color, method, width, height, align, stroke_color, stroke_width, bg_color, interline):
+    max_width = width if method == 'caption' and width else None
+    layout    = layout_text(text, font, fontsize, max_width)
+    if layout is None: return None
+
+    lines, widths, line_height = layout
+    pil_font    = load_font(font, fontsize)
+    pad         = int(stroke_width)                     # 외곽선이 잘리지 않도록 여백 확보
+    step        = line_height + interline
+    text_w      = int(np.ceil(max(widths) if widths else 0)) + 2 * pad
+    text_h      = step * len(lines) - interline + 2 * pad
+    canvas_w    = int(width)  if width  else text_w
+    canvas_h    = int(height) if height else text_h
+
+    image = Image.new('RGBA', (max(canvas_w, 1), max(canvas_h, 1)), _to_rgba(bg_color, (0, 0, 0, 0)))
+    draw  = ImageDraw.Draw(image)
+    fill  = _to_rgba(color)
+    for i, (line, line_w) in enumerate(zip(lines, widths)):
+        if align == 'left'   : x = pad
+        elif align == 'right': x = canvas_w - pad - line_w
+        else                 : x = (canvas_w - line_w) / 2
+        draw.text((x, pad + i * step), line, font=pil_font, fill=fill,
+                  stroke_width=int(stroke_width), stroke_fill=_to_rgba(stroke_color) if stroke_color else None)
+
+    array = np.asarray(image)
+    array.setflags(write=False)  # 캐시된 배열이 다른 곳에서 수정되지 않도록 보호
+    return array
+
+
+def render_text(text, font, fontsize=24, color='white', method='label', size=None, align='center',
+                stroke_color=None, stroke_width=0, bg_color='transparent', interline=0, **_ignored):
+    """
+    텍스트를 RGBA numpy 배열(높이 x 너비 x 4, uint8)로 그립니다.
+
+    Args:
+        text (str): 그릴 텍스트 ('\\n'으로 강제 줄바꿈)
+        font (str): 폰트 파일 경로 또는 시스템 폰트 이름
+        fontsize (int): 글자 크기(px)
+        color (str|tuple): 글자 색 ('white', '#ffd700', (r,g,b) 등)
+        method (str): 'label' (텍스트 크기에 맞춤) 또는 'caption' (size 너비에 맞춰 자동 줄바꿈)
+        size (tuple): (너비, 높이) - None인 축은 텍스트에 맞춰 자동 계산
+        align (str): 'center', 'West'(왼쪽), 'East'(오른쪽)
+
+    Returns:
+        np.ndarray: RGBA 배열 (읽기 전용, 캐시됨). 폰트를 불러올 수 없으면 None
+    """
+    width, height = (size or (None, None))
+    return _render_cached(
+        str(text), font, int(fontsize),
+        color if not isinstance(color, list) else tuple(color),
+        method, width, height, _ALIGN.get(str(align).lower(), 'center'),
+        stroke_color, stroke_width, bg_color, int(interline or 0)
+    )
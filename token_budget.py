@@ -0,0 +1,140 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Token Budget (AI 프롬프트 크기 예산 배분)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# analyze_and_summarize의 raw_context는 종목별 기사 본문(최대 4000자 x 4건), 유튜브 자막(최대 40,000자 x 5건) 등을
+# 그대로 담으므로 관심 종목/채널이 늘어날수록 프롬프트(= 응답 시간과 비용)가 끝없이 커집니다.
+#
+# [방식]
+# 1. 섹션(stocks / news / youtube / economy)별 예상 토큰 수(수요)를 잰다.
+# 2. 전체 예산을 섹션 비율(shares)대로 나누되, 수요가 적은 섹션의 남는 몫은 모자란 섹션에 다시 나눈다. (water-filling)
+# 3. 섹션 안에서는 우선순위가 낮은 항목부터 버리고, 남은 항목의 본문(content)을 고르게 잘라 예산에 맞춘다.
+#
+# 토큰 수는 API 호출 없이 추정합니다. (ASCII 4자당 1토큰, 한글 등 비ASCII 1자당 1토큰 - 보수적으로 크게 잡음)
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import json
+import math
+
+
+DEFAULT_TOTAL_TOKENS = 60000
+DEFAULT_SHARES       = {'stocks': 0.35, 'news': 0.15, 'youtube': 0.40, 'economy': 0.10}
+
+
+def estimate_tokens(text):
+    """텍스트의 대략적인 토큰 수를 추정합니다."""
+    if not text: return 0
+    text      = str(text)
+    ascii_len = len(text.encode('ascii', 'ignore'))
+    return math.ceil(ascii_len / 4 + (len(text) - ascii_len))
+
+
+def json_tokens(obj):
+    """json.dumps(ensure_ascii=False) 결과 기준 토큰 수"""
+    return estimate_tokens(json.dumps(obj, ensure_ascii=False))
+
+
+def truncate_to_tokens(text, max_tokens, suffix="..."):
+    """text를 max_tokens 이하로 자릅니다. (잘렸으면 suffix를 붙임)"""
+    if estimate_tokens(text) <= max_tokens: return text
+    if max_tokens <= 0: return ""
+    # 글자/토큰 비율로 한 번에 자른 뒤, 넘치면 10%씩 줄여 맞춤
+    cut = int(len(text) * max_tokens / estimate_tokens(text))
+    while cut > 0 and estimate_tokens(text[:cut]) + estimate_tokens(suffix) > max_tokens:
+        cut = int(cut * 0.9)
+    return text[:cut] + suffix if cut > 0 else ""
+
+
+def allocate(demands, total, weights=None):
+    """
+    total을 weights 비율로 나누되, 각 몫은 demands를 넘지 않게 하고 남는 몫은 다른 항목에 재분배합니다.
+
+    Args:
+        demands (dict|list): 항목별 필요량
+        total (int): 나눌 전체 양
+        weights (dict|list): 항목별 비율 (생략 시 균등)
+
+    Returns:
+        dict|list: demands와 같은 형태의 항목별 배정량 (정수)
+    """
+    keys    = list(demands.keys()) if isinstance(demands, dict) else list(range(len(demands)))
+    need    = {k: max(0, demands[k]) for k in keys}
+    weight  = {k: (weights[k] if weights is not None else 1.0) for k in keys}
+    alloc   = {k: 0 for k in keys}
+    active  = [k for k in keys if need[k] > 0 and weight[k] > 0]
+    remain  = total
+
+    while active and remain > 0:
+        w_sum     = sum(weight[k] for k in active)
+        saturated = [k for k in active if need[k] <= remain * weight[k] / w_sum]
+        if not saturated:
+            for k in active:
+                alloc[k] = int(remain * weight[k] / w_sum)
+            break
+        for k in saturated:
+            alloc[k] = need[k]
+            remain  -= need[k]
+            active.remove(k)
+
+    return alloc if isinstance(demands, dict) else [alloc[k] for k in keys]
+
+
+def fit_items(items, budget, field='content', max_items=None, max_item_chars=None):
+    """
+    우선순위 순으로 정렬된 items를 budget 토큰 안에 맞춥니다.
+
+    - 본문(field)을 뺀 나머지(제목, URL 등)만으로도 넘치면 뒤(우선순위 낮은 항목)부터 버립니다.
+      (AI 응답이 입력 순서(인덱스)로 매핑되는 섹션이 있으므로 중간 항목은 버리지 않음)
+    - 남은 예산은 항목별 본문에 고르게 나눠 자릅니다.
+
+    Returns:
+        list: 잘라낸 항목 사본 리스트 (items의 앞부분과 같은 순서)
+    """
+    items = [dict(it) for it in items[:max_items]]
+    for it in items:
+        if max_item_chars and isinstance(it.get(field), str) and len(it[field]) > max_item_chars:
+            it[field] = it[field][:max_item_chars] + "..."
+
+    fixed = [json_tokens({**it, field: ""}) for it in items]
+    while items and sum(fixed) > budget:
+        items.pop()
+        fixed.pop()
+
+    texts  = [str(it.get(field) or "") for it in items]
+    shares = allocate([estimate_tokens(t) for t in texts], budget - sum(fixed))
+    for it, text, share in zip(items, texts, shares):
+        if field in it:
+            it[field] = truncate_to_tokens(text, share)
+    return items
+
+
+class ContextBudget:
+    """
+    섹션별 예산 배분기입니다.
+
+    Args:
+        total_tokens (int): 프롬프트 데이터 부분의 전체 토큰 예산
+        shares (dict): 섹션별 기본 비율 (합이 1일 필요는 없음)
+
+    [사용 예]
+        budget = ContextBudget(60000)
+        alloc  = budget.split({'stocks': 30000, 'news': 2000, 'youtube': 80000, 'economy': 1500})
+        ...
+        budget.report({'stocks': 28000, ...})
+    """
+
+    def __init__(self, total_tokens=DEFAULT_TOTAL_TOKENS, shares=None):
+        self.total_tokens = int(total_tokens)
+        self.shares       = {**DEFAULT_SHARES, **(shares or {})}
+        self.demands      = {}
+        self.allocation   = {}
+
+    def split(self, demands):
+        """섹션별 수요를 받아 배정량을 반환합니다. (수요가 예산보다 작은 섹션은 수요만큼만 배정)"""
+        self.demands    = dict(demands)
+        self.allocation = allocate(self.demands, self.total_tokens, {k: self.shares.get(k, 0.0) for k in demands})
+        return self.allocation
+
+    def report(self, used):
+        """섹션별 최종 토큰 수를 로그로 남깁니다."""
+        parts = [f"{k} {used.get(k, 0):,}/{self.demands.get(k, 0):,}" for k in self.demands]
+        print(f"🧮 프롬프트 예산 (사용/원본 토큰): {' | '.join(parts)} → 합계 {sum(used.values()):,}/{self.total_tokens:,}")
@@ -0,0 +1,245 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Tracing (파이프라인 구간 측정)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 수집기, 외부 호출(RSS/기사, Gemini, TTS, 브라우저, YouTube, SMTP), 씬 제작/인코딩 구간을 span으로 감싸
+# 구간별 실제 시간(wall), CPU 시간, 전송 바이트, 메모리(구간 시작/종료 시점 RSS와 증감)를 기록합니다.
+# (프로세스 전체 최대 메모리 ru_maxrss는 구간별 값이 아니므로 process_peak_rss_mb로 따로 남김)
+#
+# [결과물] (실행 종료 시 export())
+# - {TRACE_DIR}/trace-{시각}.json : Chrome/Perfetto 트레이스 (chrome://tracing 또는 ui.perfetto.dev에서 열기)
+# - 콘솔 요약표                   : 이름별 호출 수/누적 시간/CPU/바이트/최대 RSS/최대 RSS 증가 (누적 시간 내림차순)
+#
+# [사용 예]
+#   with span("gemini", model=name) as sp:
+#       res = model.generate_content(prompt)
+#       sp.add_bytes(len(res.text))
+#
+#   @traced("scene:news")
+#   def create_scene_news(...): ...
+#
+# [다중 프로세스]
+# 씬 병렬 렌더링 등 fork된 자식 프로세스의 span은 {TRACE_DIR}/run-{시각}/{pid}.jsonl에 기록되고
+# export() 시 부모 프로세스 span과 합쳐집니다.
+#
+# 환경변수 TRACE=0이면 모든 span이 아무 일도 하지 않습니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import json
+import time
+import glob
+import shutil
+import resource
+import threading
+import functools
+
+from datetime import datetime
+
+
+TRACE_ENABLED = os.getenv('TRACE', '1') != '0'
+TRACE_DIR     = os.getenv('TRACE_DIR', 'traces')
+
+_local    = threading.local()       # 스레드별 열린 span 스택
+_lock     = threading.Lock()
+_spans    = []                      # 이 프로세스에서 끝난 span (dict)
+_main_pid = os.getpid()
+_run_dir  = None                    # 자식 프로세스 span 기록 폴더 (start_run에서 설정, fork 시 상속)
+_run_name = None
+_PAGE_MB  = os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)   # /proc/self/statm 페이지 → MB
+
+
+def _process_peak_rss_mb():
+    # 프로세스 시작 이후 최대값 (Linux의 ru_maxrss 단위는 KB)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _current_rss_mb():
+    """현재 RSS (/proc/self/statm 2번째 값 = 상주 페이지 수, 없으면 프로세스 최대값으로 대체)"""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, IndexError, ValueError):
+        return _process_peak_rss_mb()
+
+
+class Span:
+    """측정 구간 하나입니다. with 블록 또는 @traced로 사용합니다."""
+
+    __slots__ = ('name', 'cat', 'args', 'bytes', 'start', 'cpu_start', 'wall', 'cpu', 'rss_start', 'rss_end')
+
+    def __init__(self, name, cat, args):
+        self.name  = name
+        self.cat   = cat
+        self.args  = args
+        self.bytes = 0
+
+    def add_bytes(self, n):
+        """이 구간에서 주고받은 바이트 수를 더합니다."""
+        self.bytes += int(n or 0)
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.rss_start = _current_rss_mb()
+        self.cpu_start = time.thread_time()
+        self.start     = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall    = time.perf_counter() - self.start
+        self.cpu     = time.thread_time() - self.cpu_start
+        self.rss_end = _current_rss_mb()
+        _local.stack.pop()
+        if exc_type is not None:
+            self.args = {**self.args, 'error': f"{exc_type.__name__}: {exc}"}
+        _record(self)
+        return False
+
+
+class _NullSpan:
+    """TRACE=0일 때 쓰이는 빈 span"""
+    def add_bytes(self, n): pass
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_SPAN = _NullSpan()
+
+
+def _record(sp):
+    event = {
+        'name': sp.name, 'cat': sp.cat, 'ph': 'X',
+        'ts'  : round(sp.start * 1e6), 'dur': round(sp.wall * 1e6),
+        'pid' : os.getpid(), 'tid': threading.get_ident(),
+        'args': {**sp.args, 'cpu_ms': round(sp.cpu * 1000, 1), 'bytes': sp.bytes,
+                 'rss_mb'             : round(max(sp.rss_start, sp.rss_end), 1),    # 구간 시작/종료 중 큰 값
+                 'rss_delta_mb'       : round(sp.rss_end - sp.rss_start, 1),        # 구간 동안 늘어난(줄어든) RSS
+                 'process_peak_rss_mb': round(_process_peak_rss_mb(), 1)},
+    }
+    if os.getpid() != _main_pid:
+        # fork된 자식 프로세스: 부모가 모을 수 있도록 파일에 바로 기록
+        # (fork 시점에 다른 스레드가 쥐고 있던 잠금을 물려받을 수 있으므로 _lock을 쓰지 않음 - 한 줄 append는 원자적)
+        if _run_dir:
+            with open(os.path.join(_run_dir, f"{os.getpid()}.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        return
+    with _lock:
+        _spans.append(event)
+
+
+def span(name, cat='pipeline', **args):
+    """
+    측정 구간을 엽니다. (with 문에서 사용)
+
+    Args:
+        name (str): 구간 이름 (요약표는 이 이름 기준으로 합산)
+        cat (str): 분류 (collect, http, llm, tts, browser, video, upload 등)
+        **args: 트레이스에 함께 남길 값 (URL, 모델명 등)
+    """
+    return Span(name, cat, args) if TRACE_ENABLED else _NULL_SPAN
+
+
+def traced(name=None, cat='pipeline'):
+    """함수 전체를 span으로 감싸는 데코레이터입니다. (name 생략 시 함수 이름)"""
+    def decorator(func):
+        span_name = name or func.__name__
+        @functools.wraps(func)
+        def wrapper(*a, **kw):
+            with span(span_name, cat):
+                return func(*a, **kw)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """현재 스레드에서 열려 있는 가장 안쪽 span (없으면 빈 span)"""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else _NULL_SPAN
+
+
+def add_bytes(n):
+    """현재 span에 전송 바이트를 더합니다."""
+    current_span().add_bytes(n)
+
+
+def instrument_session(session):
+    """requests.Session의 모든 응답 크기를 그 요청을 보낸 스레드의 현재 span에 더합니다."""
+    def _hook(response, *args, **kwargs):
+        add_bytes(len(response.content or b""))
+        return response
+    session.hooks.setdefault('response', []).append(_hook)
+    return session
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 실행 단위 관리 / 내보내기
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+def start_run():
+    """새 실행을 시작합니다. (이전 span 초기화, 자식 프로세스 기록 폴더 준비)"""
+    global _run_dir, _run_name
+    if not TRACE_ENABLED: return
+    with _lock:
+        _spans.clear()
+    _run_name = datetime.now().strftime("%Y%m%d-%H%M%S")
+    _run_dir  = os.path.join(TRACE_DIR, f"run-{_run_name}")
+    os.makedirs(_run_dir, exist_ok=True)
+
+
+def collect_spans():
+    """부모 프로세스 span과 자식 프로세스가 파일로 남긴 span을 모두 모아 반환합니다."""
+    with _lock:
+        events = list(_spans)
+    if _run_dir and os.path.isdir(_run_dir):
+        for path in glob.glob(os.path.join(_run_dir, "*.jsonl")):
+            with open(path, encoding='utf-8') as f:
+                events.extend(json.loads(line) for line in f if line.strip())
+    return events
+
+
+def summarize(events):
+    """이름별 합산: [(name, count, wall_s, cpu_s, bytes, max_rss_mb, max_rss_delta_mb)] (누적 시간 내림차순)"""
+    table = {}
+    for e in events:
+        row = table.setdefault(e['name'], [0, 0.0, 0.0, 0, 0.0, 0.0])
+        row[0] += 1
+        row[1] += e['dur'] / 1e6
+        row[2] += e['args'].get('cpu_ms', 0) / 1000
+        row[3] += e['args'].get('bytes', 0)
+        row[4]  = max(row[4], e['args'].get('rss_mb', 0))
+        row[5]  = max(row[5], e['args'].get('rss_delta_mb', 0))
+    return sorted(((name, *row) for name, row in table.items()), key=lambda r: -r[2])
+
+
+def print_summary(events, limit=40):
+    rows = summarize(events)
+    print("📊 구간별 측정 요약 (누적 시간순):")
+    print(f"   {'name':<28} {'count':>5} {'wall(s)':>9} {'cpu(s)':>8} {'bytes':>12} {'RSS(MB)':>9} {'+RSS(MB)':>9}")
+    for name, count, wall, cpu, nbytes, rss, delta in rows[:limit]:
+        print(f"   {name[:28]:<28} {count:>5} {wall:>9.2f} {cpu:>8.2f} {nbytes:>12,} {rss:>9.1f} {delta:>9.1f}")
+
+
+def export(path=None):
+    """
+    Chrome 트레이스 JSON을 쓰고 요약표를 출력합니다.
+
+    Returns:
+        str: 트레이스 파일 경로 (TRACE=0이거나 span이 없으면 None)
+    """
+    if not TRACE_ENABLED: return None
+    events = collect_spans()
+    if not events: return None
+
+    path = path or os.path.join(TRACE_DIR, f"trace-{_run_name or datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    meta = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'main' if pid == _main_pid else f'worker-{pid}'}}
+            for pid in sorted({e['pid'] for e in events})]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': meta + events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+    print_summary(events)
+    print(f"🧵 트레이스 저장: {path} (chrome://tracing 또는 ui.perfetto.dev)")
+    if _run_dir:
+        shutil.rmtree(_run_dir, ignore_errors=True)
+    return path
@@ -0,0 +1,232 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# TTS Engine (Qwen3-TTS 병렬 호출 + 디스크 캐시)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 씬 대본의 문장들을 TTS 서버(tts_config.server_url)에 동시에 요청하고, 결과를 문장 순서대로 돌려줍니다.
+#
+# [캐시]
+# 합성 결과는 (정규화된 문장, voice_name, 참조 음성 파일 해시) 기준으로 디스크에 저장됩니다.
+# 클로징 멘트처럼 매일 반복되는 문장은 한 번만 합성되고 이후에는 서버를 호출하지 않습니다.
+#
+# [미리 합성]
+# prefetch()는 대본이 확정되는 즉시(스트리밍 분석 중) 백그라운드 합성을 시작하고,
+# 이후 같은 문장을 synthesize()로 요청하면 진행 중인 결과를 기다려 재사용합니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import re
+import time
+import hashlib
+import threading
+
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from disk_cache import DiskCache, CACHE_DIR
+from tracing import span, instrument_session
+
+
+DEFAULT_SERVER_URL   = "http://localhost:8002"
+DEFAULT_MAX_PARALLEL = 4                    # TTS 서버 GPU가 감당할 수 있는 동시 요청 수
+TTS_CACHE_TTL        = 30 * 24 * 3600       # 같은 목소리/문장이면 결과가 같으므로 길게 유지
+
+
+def strip_markdown_for_tts(text):
+    """
+    TTS용 텍스트에서 마크다운 기호를 제거합니다.
+    예: "**테슬라**가 급등" → "테슬라가 급등"
+    """
+    if not text:
+        return text
+    # 볼드/이탤릭 (**text**, *text*, __text__, _text_)
+    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)  # **bold**
+    text = re.sub(r'\*([^*]+)\*', r'\1', text)      # *italic*
+    text = re.sub(r'__([^_]+)__', r'\1', text)      # __bold__
+    text = re.sub(r'_([^_]+)_', r'\1', text)        # _italic_
+    # 취소선 (~~text~~)
+    text = re.sub(r'~~([^~]+)~~', r'\1', text)
+    # 헤더 (# ## ###)
+    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
+    # 링크 [text](url) -> text
+    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
+    # 코드 블록 (`code`)
+    text = re.sub(r'`([^`]+)`', r'\1', text)
+    return text.strip()
+
+
+def normalize_tts_text(text):
+    """캐시 키용 정규화: 마크다운 제거 + 연속 공백을 하나로."""
+    return re.sub(r'\s+', ' ', strip_markdown_for_tts(text) or '').strip()
+
+
+class TTSEngine:
+    """
+    Qwen3-TTS 서버 클라이언트입니다.
+
+    Args:
+        tts_config (dict): TTS 설정 (server_url, voice_name, ref_audio_path, ref_text, max_parallel)
+        cache (DiskCache): 합성 결과 캐시 (생략 시 {CACHE_DIR}/tts, None을 주려면 use_cache=False)
+        use_cache (bool): 캐시 사용 여부 (기본값: True)
+    """
+
+    def __init__(self, tts_config=None, cache=None, use_cache=True):
+        tts_config          = tts_config or {}
+        self.server_url     = tts_config.get("server_url", DEFAULT_SERVER_URL)
+        self.voice_name     = tts_config.get("voice_name")
+        self.ref_audio_path = tts_config.get("ref_audio_path")
+        self.ref_text       = tts_config.get("ref_text")
+        self.max_parallel   = max(1, int(tts_config.get("max_parallel", DEFAULT_MAX_PARALLEL)))
+        self.cache          = (cache or DiskCache(os.path.join(CACHE_DIR, 'tts'), max_bytes=512 * 1024 * 1024)) if use_cache else None
+
+        # 동시 요청 수만큼 커넥션을 유지하는 세션
+        self.session = requests.Session()
+        adapter      = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_parallel)
+        self.session.mount('http://' , adapter)
+        self.session.mount('https://', adapter)
+        instrument_session(self.session)
+
+        self._ref_audio_hash = None
+        self._lock           = threading.Lock()
+        # 서버 동시 요청 수 제한 (미리 합성(prefetch)과 본 합성이 겹쳐도 max_parallel을 넘지 않도록)
+        self._slots          = threading.BoundedSemaphore(self.max_parallel)
+        self._prefetch_pool  = None
+        self._inflight       = {}   # {캐시 키: Future} - prefetch로 이미 요청한 문장
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 캐시 키
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def _voice_identity(self):
+        """요청에 실제로 쓰이는 목소리 식별자 (등록 음성 이름 또는 참조 음성 파일 해시)."""
+        if self.voice_name:
+            return f"voice:{self.voice_name}"
+        if self.ref_audio_path and os.path.exists(self.ref_audio_path):
+            with self._lock:
+                if self._ref_audio_hash is None:
+                    with open(self.ref_audio_path, 'rb') as f:
+                        self._ref_audio_hash = hashlib.sha256(f.read()).hexdigest()
+            return f"ref:{self._ref_audio_hash}:{self.ref_text or ''}"
+        return "default"
+
+    def cache_key(self, text):
+        return f"{self._voice_identity()}|{normalize_tts_text(text)}"
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 합성
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def _request(self, clean_text, max_retries=3):
+        """TTS 서버에 한 문장을 요청합니다. (실패 시 2초 간격으로 재시도)"""
+        last_error = None
+
+        for attempt in range(1, max_retries + 1):
+            # API 요청 데이터 구성 (매 시도마다 새로 구성)
+            data  = {"text": clean_text}
+            files = {}
+
+            try:
+                if self.voice_name:
+                    # 등록된 음성 사용
+                    data["voice_name"] = self.voice_name
+                elif self.ref_audio_path and os.path.exists(self.ref_audio_path):
+                    # 즉시 Clone 모드
+                    files["ref_audio"] = open(self.ref_audio_path, "rb")
+                    if self.ref_text:
+                        data["ref_text"] = self.ref_text
+
+                with self._slots, span("tts:request", "tts", chars=len(clean_text)):
+                    response = self.session.post(
+                        f"{self.server_url}/generate",
+                        data    = data,
+                        files   = files if files else None,
+                        timeout = 60
+                    )
+                response.raise_for_status()
+                return response.content
+
+            except requests.exceptions.RequestException as e:
+                last_error = e
+                print(f"⚠️ TTS API 호출 실패 (시도 {attempt}/{max_retries}): {e}")
+
+                if attempt < max_retries:
+                    print(f"   ⏳ 2초 후 재시도...")
+                    time.sleep(2)
+            finally:
+                # 파일 핸들 정리
+                for f in files.values():
+                    if hasattr(f, 'close'):
+                        f.close()
+
+        # 모든 재시도 실패 시 예외 발생
+        raise Exception(f"TTS API 호출이 {max_retries}회 모두 실패했습니다: {last_error}")
+
+    def _synthesize_fresh(self, key, text, max_retries=3):
+        """서버에 요청하고 결과를 캐시에 저장합니다."""
+        audio = self._request(strip_markdown_for_tts(text), max_retries)
+        if self.cache:
+            self.cache.set(key, audio, ttl=TTS_CACHE_TTL)
+        return audio
+
+    def synthesize(self, text, max_retries=3):
+        """
+        한 문장을 음성으로 변환합니다. (캐시에 있으면 서버를 호출하지 않음)
+
+        Returns:
+            bytes: 서버가 반환한 오디오 파일 내용
+        """
+        key = self.cache_key(text)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        # prefetch로 이미 요청 중이거나 끝난 문장이면 그 결과를 기다림 (실패했으면 직접 재시도)
+        with self._lock:
+            future = self._inflight.get(key)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception:
+                pass
+
+        return self._synthesize_fresh(key, text, max_retries)
+
+    def prefetch(self, texts):
+        """
+        texts를 백그라운드에서 미리 합성하기 시작하고 바로 반환합니다.
+        (AI 대본이 스트리밍으로 도착하는 동안 씬별 음성을 먼저 만들어 두는 용도)
+        나중에 같은 문장을 synthesize/synthesize_many로 요청하면 이 결과를 재사용합니다.
+        """
+        keyed = [(self.cache_key(t), t) for t in texts if t and t.strip()]
+        with self._lock:
+            if self._prefetch_pool is None:
+                self._prefetch_pool = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix='tts-prefetch')
+            for key, text in keyed:
+                if key in self._inflight: continue
+                if self.cache and self.cache.get(key) is not None: continue
+                self._inflight[key] = self._prefetch_pool.submit(self._synthesize_fresh, key, text)
+
+    def drain(self):
+        """진행 중인 prefetch가 모두 끝날 때까지 기다립니다. (실패한 문장은 본 합성에서 재시도)"""
+        with self._lock:
+            futures = list(self._inflight.values())
+        for f in futures:
+            try: f.result()
+            except Exception: pass
+
+    def synthesize_many(self, texts):
+        """
+        여러 문장을 최대 max_parallel개씩 동시에 변환합니다.
+
+        Returns:
+            list: 입력과 같은 순서의 결과 리스트. 각 항목은 오디오 bytes 또는 실패 시 Exception 객체
+                  (한 문장이 실패해도 나머지 문장은 그대로 반환)
+        """
+        def _safe(text):
+            try:
+                return self.synthesize(text)
+            except Exception as e:
+                return e
+
+        if len(texts) <= 1:
+            return [_safe(t) for t in texts]
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(texts)), thread_name_prefix='tts') as pool:
+            return list(pool.map(_safe, texts))
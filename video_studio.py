@@ -2,20 +2,22 @@ import os
 import sys
 import time
 import re
+import json
+import hashlib
+import subprocess
 import numpy as np
 from datetime import datetime
-import requests
+from concurrent.futures import ProcessPoolExecutor
 from moviepy.editor import *
-from moviepy.config import change_settings
+from moviepy.config import change_settings, get_setting
 from PIL import Image, ImageDraw, ImageFont
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service as ChromeService
+from browser_pool import get_browser_pool, all_of, document_ready, element_present
+from tts_engine import TTSEngine
+from text_render import render_text
+from tracing import span, traced
 import yfinance as yf
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import chart_engine
+import audio_engine
 
 # [LOGGING FIX]
 sys.stdout.reconfigure(line_buffering=True)
@@ -38,15 +40,27 @@ def get_safe_font():
 
 SAFE_FONT = get_safe_font()
 
+# 텍스트 래스터라이저: 'pillow'(프로세스 내 렌더링, 기본값) 또는 'imagemagick'(기존 TextClip)
+TEXT_RENDERER = os.getenv('TEXT_RENDERER', 'pillow')
+
 def sanitize_text(text):
     if not text: return " "
     return str(text).strip()
 
+@traced("text_render", "video")
 def create_safe_text_clip(text, **kwargs):
     try:
         safe_text = sanitize_text(text)
         if 'font' not in kwargs:
             kwargs['font'] = SAFE_FONT
+        if TEXT_RENDERER == 'pillow':
+            # 지정 폰트를 못 찾으면 ImageMagick처럼 기본(SAFE_FONT)으로 대체, 그래도 없으면 TextClip으로 폴백
+            rgba = render_text(safe_text, **kwargs)
+            if rgba is None and kwargs['font'] != SAFE_FONT:
+                rgba = render_text(safe_text, **{**kwargs, 'font': SAFE_FONT})
+            if rgba is not None:
+                clip = ImageClip(rgba, transparent=True)
+                return clip.set_duration(kwargs['duration']) if 'duration' in kwargs else clip
         return TextClip(safe_text, **kwargs)
     except Exception as e:
         print(f"⚠️ 텍스트 생성 실패: {e}", flush=True)
@@ -56,157 +70,82 @@ def create_safe_text_clip(text, **kwargs):
 # [NEW] Dynamic Audio & Subtitle Generator
 # -----------------------------------------------------------------------------------------------------------------------------#
 
-def strip_markdown_for_tts(text):
-    """
-    TTS용 텍스트에서 마크다운 기호를 제거합니다.
-    예: "**테슬라**가 급등" → "테슬라가 급등"
-    """
-    if not text:
-        return text
-    # 볼드/이탤릭 (**text**, *text*, __text__, _text_)
-    text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)  # **bold**
-    text = re.sub(r'\*([^*]+)\*', r'\1', text)      # *italic*
-    text = re.sub(r'__([^_]+)__', r'\1', text)      # __bold__
-    text = re.sub(r'_([^_]+)_', r'\1', text)        # _italic_
-    # 취소선 (~~text~~)
-    text = re.sub(r'~~([^~]+)~~', r'\1', text)
-    # 헤더 (# ## ###)
-    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
-    # 링크 [text](url) -> text
-    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
-    # 코드 블록 (`code`)
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    return text.strip()
-
-def _gen_voice_file(text, filename, tts_config=None, max_retries=3):
-    """
-    Qwen3-TTS API를 호출하여 음성 파일을 생성합니다.
-    
-    Args:
-        text: 음성으로 변환할 텍스트
-        filename: 저장할 파일 경로 (mp3 또는 wav)
-        tts_config: TTS 설정 딕셔너리 (server_url, voice_name, ref_audio_path, ref_text)
-        max_retries: 최대 재시도 횟수 (기본값: 3)
-    """
-    clean_text = strip_markdown_for_tts(text)
-    
-    # 기본 설정
-    server_url = "http://localhost:8002"
-    voice_name = None
-    ref_audio_path = None
-    ref_text = None
-    
-    if tts_config:
-        server_url = tts_config.get("server_url", server_url)
-        voice_name = tts_config.get("voice_name")
-        ref_audio_path = tts_config.get("ref_audio_path")
-        ref_text = tts_config.get("ref_text")
-    
-    last_error = None
-    
-    for attempt in range(1, max_retries + 1):
-        # API 요청 데이터 구성 (매 시도마다 새로 구성)
-        data = {"text": clean_text}
-        files = {}
-        
-        try:
-            if voice_name:
-                # 등록된 음성 사용
-                data["voice_name"] = voice_name
-            elif ref_audio_path and os.path.exists(ref_audio_path):
-                # 즉시 Clone 모드
-                files["ref_audio"] = open(ref_audio_path, "rb")
-                if ref_text:
-                    data["ref_text"] = ref_text
-            
-            # API 호출
-            response = requests.post(
-                f"{server_url}/generate",
-                data=data,
-                files=files if files else None,
-                timeout=60
-            )
-            response.raise_for_status()
-            
-            with open(filename, "wb") as f:
-                f.write(response.content)
-            
-            # 성공 시 함수 종료
-            return
-            
-        except requests.exceptions.RequestException as e:
-            last_error = e
-            print(f"⚠️ TTS API 호출 실패 (시도 {attempt}/{max_retries}): {e}")
-            
-            if attempt < max_retries:
-                print(f"   ⏳ 2초 후 재시도...")
-                time.sleep(2)
-        finally:
-            # 파일 핸들 정리
-            for f in files.values():
-                if hasattr(f, 'close'):
-                    f.close()
-    
-    # 모든 재시도 실패 시 예외 발생
-    raise Exception(f"TTS API 호출이 {max_retries}회 모두 실패했습니다: {last_error}")
-
 # TTS 설정을 전역으로 관리 (load_tts_config로 설정)
 _tts_config = None
+_tts_engine = None
 
 def set_tts_config(config):
     """TTS 설정을 전역으로 설정합니다."""
-    global _tts_config
+    global _tts_config, _tts_engine
     _tts_config = config
+    _tts_engine = TTSEngine(config)
+
+def get_tts_engine():
+    """현재 TTS 설정으로 만든 공유 TTSEngine을 반환합니다. (설정 전이면 기본 설정으로 생성)"""
+    global _tts_engine
+    if _tts_engine is None:
+        _tts_engine = TTSEngine(_tts_config)
+    return _tts_engine
+
+def split_script_sentences(script_text):
+    """씬 대본을 자막/TTS 단위 문장으로 나눕니다. (마침표/물음표/느낌표 기준)"""
+    sentences = re.split(r'(?<=[.?!])\s+', (script_text or "").strip())
+    return [s for s in sentences if s.strip()]
+
+def prefetch_scene_audio(script_text):
+    """
+    씬 대본의 문장들을 백그라운드에서 미리 합성하기 시작합니다. (바로 반환)
+    AI 대본이 스트리밍으로 도착하는 동안 호출하면, 씬 제작 시점에는 음성이 이미 준비되어 있습니다.
+    """
+    get_tts_engine().prefetch(split_script_sentences(script_text))
 
+@traced("scene_audio_subs", "tts")
 def generate_dynamic_audio_and_subs(script_text, scene_name):
-    sentences = re.split(r'(?<=[.?!])\s+', script_text.strip())
-    sentences = [s for s in sentences if s.strip()]
+    """
+    씬 대본을 문장별로 합성해 씬 오디오 1개(AudioArrayClip)와 문장별 자막 클립을 만듭니다.
+    문장 음성은 메모리에서 PCM으로 디코딩해 버퍼 하나에 이어 붙이고 (임시 파일/ffmpeg 리더 없음),
+    자막 시작/길이는 버퍼의 샘플 오프셋에서 계산합니다.
+    """
+    sentences = split_script_sentences(script_text)
     
-    audio_clips = []
-    text_clips = []
-    current_time = 0.0
+    print(f"   🎙️ 오디오/자막 생성 중 ({len(sentences)} 문장)...")
     
-    temp_dir = "temp_audio"
-    if not os.path.exists(temp_dir): os.makedirs(temp_dir)
+    # Qwen3-TTS API 병렬 호출 (캐시된 문장은 서버 호출 생략, 결과는 문장 순서대로)
+    voices = get_tts_engine().synthesize_many(sentences)
+    for sent, voice in zip(sentences, voices):
+        if isinstance(voice, Exception):
+            print(f"⚠️ 문장 처리 실패: {sent} / {voice}")
     
-    print(f"   🎙️ 오디오/자막 생성 중 ({len(sentences)} 문장)...")
+    scene_audio = audio_engine.build_scene_audio(voices, _tts_config)
+    if scene_audio is None or len(scene_audio.indices) < len(sentences):
+        incomplete_audio_scenes.append(scene_name)   # 음성이 빠진 문장이 있는 씬 (세그먼트/체크포인트로 남기지 않음)
+    if scene_audio is None: return None, []
     
-    for i, sent in enumerate(sentences):
-        fname = os.path.join(temp_dir, f"{scene_name}_{i}.mp3")
+    text_clips = []
+    bar_h = 100
+    bar_y = 720 - bar_h
+    for i, start, dur in zip(scene_audio.indices, scene_audio.starts, scene_audio.durations):
         try:
-            # Qwen3-TTS API 호출 (동기)
-            _gen_voice_file(sent, fname, _tts_config)
-            
-            aclip = AudioFileClip(fname)
-            dur = aclip.duration
-            
-            bar_h = 100
-            bar_y = 720 - bar_h
             bg_bar = ColorClip(size=(1280, bar_h), color=(0,0,0))\
                      .set_opacity(0.85)\
                      .set_position((0, bar_y))\
-                     .set_start(current_time)\
+                     .set_start(start)\
                      .set_duration(dur)
             
             # 자막 위치 상향 조정 (bar_y + 10)
-            txt_clip = create_safe_text_clip(sent, fontsize=28, color='white', method='caption', size=(1200, None))\
+            txt_clip = create_safe_text_clip(sentences[i], fontsize=28, color='white', method='caption', size=(1200, None))\
                        .set_position(('center', bar_y + 10))\
-                       .set_start(current_time)\
+                       .set_start(start)\
                        .set_duration(dur)
             
-            audio_clips.append(aclip)
             text_clips.append(bg_bar)
             text_clips.append(txt_clip)
             
-            current_time += dur
-            
         except Exception as e:
-            print(f"⚠️ 문장 처리 실패: {sent} / {e}")
+            print(f"⚠️ 문장 처리 실패: {sentences[i]} / {e}")
             continue
 
-    if not audio_clips: return None, []
-    final_audio = concatenate_audioclips(audio_clips)
-    return final_audio, text_clips
+    return scene_audio.clip(), text_clips
 
 # -----------------------------------------------------------------------------------------------------------------------------#
 # Helper Functions (FIXED)
@@ -243,46 +182,165 @@ def build_scene_base(duration, title_text, date_str=None, bg_color=(0,0,0)):
         clips.append(create_date_stamp(date_str, duration))
     return clips
 
+# 씬 레이아웃 기준 해상도 (모든 좌표/글자 크기는 이 크기 기준, 다른 출력 해상도는 compose_scene에서 축소)
+VIDEO_SIZE = (1280, 720)
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Encoder Profiles
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 인코딩 품질/속도 프리셋입니다. render_config.encoder_profile (또는 agent.py --profile)로 선택합니다.
+# - production : 업로드용 (x264 medium, CRF 23, 24fps, 1280x720)
+# - fast       : 확인용 (veryfast, 같은 해상도/fps)
+# - draft      : 미리보기 (ultrafast, 12fps, 640x360) - 씬 레이아웃은 1280x720 기준 그대로 만들고 compose_scene에서 일괄 축소
+# 모든 프로필이 tune=stillimage (대부분 정지 화면 + 자막인 영상이라 같은 비트레이트에서 화질 유리)
+# threads는 순차 렌더링(한 번에 인코딩)에서 쓰고, 씬 병렬 렌더링에서는 세그먼트당 segment_threads를 씁니다.
+# -----------------------------------------------------------------------------------------------------------------------------#
+ENCODER_PROFILES = {
+    'production': {'preset': 'medium'   , 'crf': 23, 'tune': 'stillimage', 'threads': 4, 'segment_threads': 1, 'fps': 24, 'scale': 1.0},
+    'fast'      : {'preset': 'veryfast' , 'crf': 23, 'tune': 'stillimage', 'threads': 4, 'segment_threads': 1, 'fps': 24, 'scale': 1.0},
+    'draft'     : {'preset': 'ultrafast', 'crf': 30, 'tune': 'stillimage', 'threads': 4, 'segment_threads': 1, 'fps': 12, 'scale': 0.5},
+}
+DEFAULT_ENCODER_PROFILE = 'production'
+
+# 현재 프로필 (set_encoder_profile로 설정, 씬 병렬 렌더링 자식 프로세스에도 전달)
+_encoder_profile = dict(ENCODER_PROFILES[DEFAULT_ENCODER_PROFILE], name=DEFAULT_ENCODER_PROFILE)
+
+def set_encoder_profile(name=None, overrides=None):
+    """
+    인코더 프로필을 설정합니다.
+
+    Args:
+        name (str): 프로필 이름 (production / fast / draft, None이면 production)
+        overrides (dict): 프로필별 값 덮어쓰기 {이름: {키: 값}} (render_config.encoder_profiles)
+
+    Returns:
+        dict: 적용된 프로필 (name 포함)
+    """
+    global _encoder_profile
+    name = name or DEFAULT_ENCODER_PROFILE
+    if name not in ENCODER_PROFILES and name not in (overrides or {}):
+        print(f"⚠️ 알 수 없는 인코더 프로필 '{name}' → {DEFAULT_ENCODER_PROFILE} 사용", flush=True)
+        name = DEFAULT_ENCODER_PROFILE
+    profile = dict(ENCODER_PROFILES.get(name, ENCODER_PROFILES[DEFAULT_ENCODER_PROFILE]))
+    profile.update((overrides or {}).get(name, {}))
+    _encoder_profile = dict(profile, name=name)
+    return _encoder_profile
+
+def get_encoder_profile():
+    return _encoder_profile
+
+def output_size(profile=None):
+    """프로필 해상도 (x264 yuv420p 요구대로 짝수로 맞춤)"""
+    scale = (profile or _encoder_profile)['scale']
+    return tuple(max(2, int(round(v * scale / 2)) * 2) for v in VIDEO_SIZE)
+
+def write_video(clip, path, segment=False):
+    """
+    현재 프로필로 클립을 인코딩하고 소요 시간을 로그에 남깁니다.
+
+    Args:
+        segment (bool): True면 씬 병렬 렌더링의 세그먼트 (스레드 수 segment_threads)
+
+    Returns:
+        float: 인코딩 소요 시간 (초)
+    """
+    profile = _encoder_profile
+    params  = ['-crf', str(profile['crf'])] + (['-tune', profile['tune']] if profile.get('tune') else [])
+    threads = profile['segment_threads'] if segment else profile['threads']
+    started = time.perf_counter()
+    clip.write_videofile(path, fps=profile['fps'], codec='libx264', audio_codec='aac', preset=profile['preset'],
+                         ffmpeg_params=params, threads=threads, logger=None)
+    elapsed = time.perf_counter() - started
+    print(f"   ⏱️ 인코딩 [{profile['name']}] {os.path.basename(path).replace('.part', '')}: {elapsed:.1f}초 "
+          f"({clip.w}x{clip.h} {profile['fps']}fps, {profile['preset']}/crf {profile['crf']}, {clip.duration:.1f}초 분량)", flush=True)
+    return elapsed
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Static Layer Precomposition
+# -----------------------------------------------------------------------------------------------------------------------------#
+# MoviePy의 CompositeVideoClip은 매 프레임(24fps)마다 모든 레이어를 다시 blit하며, blit 한 번마다 전체 프레임을 복사합니다.
+# 씬의 배경/제목/표/뉴스/로고/이미지는 씬 내내 변하지 않으므로, 아래쪽부터 이어지는 정적 레이어들을
+# 한 번만 합성해 RGB 프레임 1장으로 만들고 매 프레임에는 그 위의 변하는 레이어(자막 바/자막, 차트 애니메이션)만 합성합니다.
+# (레이어 순서를 지키기 위해 처음 나오는 동적 레이어부터 위쪽은 모두 프레임마다 합성)
+#
+# [정적 레이어 조건] ImageClip 계열(ImageClip/ColorClip/TextClip, resize·set_opacity 포함)이면서
+# 씬 시작부터 끝까지 표시되고 위치가 바뀌지 않는 클립
+#
+# [축소 출력] 인코더 프로필의 scale이 1이 아니면 정적 배경은 기준 해상도로 합성한 뒤 1번 축소하고,
+# 동적 레이어는 크기와 위치를 같은 비율로 줄여서 합성합니다. (씬 코드는 항상 1280x720 좌표 사용)
+# -----------------------------------------------------------------------------------------------------------------------------#
+def _is_static_layer(clip, duration):
+    if not isinstance(clip, ImageClip): return False
+    if (clip.start or 0) > 0 or (clip.end is not None and clip.end < duration): return False
+    if clip.mask is not None and not isinstance(clip.mask, ImageClip): return False
+    return clip.pos(0) == clip.pos(duration)
+
+def _scale_layer(clip, scale):
+    """동적 레이어를 scale 비율로 축소합니다. (ImageClip은 1번만, 그 외는 프레임마다 축소 / 'center' 같은 위치는 그대로)"""
+    orig_pos = clip.pos
+    size     = (max(1, int(round(clip.w * scale))), max(1, int(round(clip.h * scale))))
+    scaled   = clip.resize(newsize=size)
+    if getattr(clip, 'relative', False):
+        return scaled
+    return scaled.set_position(lambda t: tuple(v * scale if isinstance(v, (int, float)) else v for v in orig_pos(t)))
+
+def compose_scene(layers, duration, size=VIDEO_SIZE):
+    """
+    씬 레이어를 합성합니다. 아래쪽 정적 레이어는 미리 1장으로 합치고 나머지만 프레임마다 합성합니다.
+
+    Args:
+        layers (list): 아래→위 순서의 클립 리스트 (보통 clips + subtitle_clips, 좌표는 size 기준)
+        duration (float): 씬 길이 (초)
+
+    Returns:
+        VideoClip: CompositeVideoClip([precomposed 배경] + 동적 레이어) (동적 레이어가 없으면 배경 ImageClip)
+                   크기는 현재 인코더 프로필의 출력 해상도
+    """
+    scale    = _encoder_profile['scale']
+    out_size = output_size() if size == VIDEO_SIZE else tuple(int(round(v * scale)) for v in size)
+    count    = 0
+    while count < len(layers) and _is_static_layer(layers[count], duration):
+        count += 1
+    static, dynamic = layers[:count], layers[count:]
+    if scale != 1.0:
+        dynamic = [_scale_layer(clip, scale) for clip in dynamic]
+    if not static:
+        return CompositeVideoClip(dynamic, size=out_size).set_duration(duration)
+
+    with span("precompose", "video", static=len(static), dynamic=len(dynamic)):
+        frame = CompositeVideoClip(static, size=size, bg_color=(0, 0, 0)).get_frame(0)
+        if out_size != tuple(size):
+            frame = np.asarray(Image.fromarray(frame).resize(out_size, Image.LANCZOS))
+    background = ImageClip(frame).set_duration(duration)
+    if not dynamic:
+        return background
+    # 배경에 마스크가 없으므로 합성 클립도 마스크 없이 만들어짐 (씬 이어 붙이기에서 마스크 합성 생략)
+    return CompositeVideoClip([background] + dynamic, size=out_size, use_bgclip=True).set_duration(duration)
+
 # -----------------------------------------------------------------------------------------------------------------------------#
 # External Data Capture
 # -----------------------------------------------------------------------------------------------------------------------------#
+# 맵 페이지 주소와 준비 조건 (로컬 픽스처 서버로 바꿔서 오프라인 확인 가능)
+TRADINGVIEW_MAP_URL = os.getenv('TRADINGVIEW_MAP_URL', "https://www.tradingview.com/heatmap/stock/?color=change&dataset=SPX500&group=sector&size=market_cap_basic")
+MAP_READY_SELECTOR  = "canvas"   # 히트맵이 그려지는 요소
+MAP_SETTLE_SECONDS  = 2.0        # 캔버스 등장 후 타일 그리기가 끝나기를 기다리는 시간
+
 def capture_tradingview_map(output_file="tradingview_map.png"):
     print("📸 TradingView 맵 캡처 시도...", flush=True)
-    driver = None
     try:
-        chrome_options = Options()
-        chrome_options.binary_location = "/usr/bin/chromium"
-        chrome_options.add_argument('--headless=new') 
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--remote-debugging-port=9222')
-        chrome_options.add_argument('--window-size=1920,1200')
-        
-        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        chrome_options.add_argument(f'user-agent={user_agent}')
-
-        if os.path.exists("/usr/bin/chromedriver"):
-            service = ChromeService(executable_path="/usr/bin/chromedriver")
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-        else:
-            driver = webdriver.Chrome(options=chrome_options)
-
-        driver.set_page_load_timeout(40)
-        url = "https://www.tradingview.com/heatmap/stock/?color=change&dataset=SPX500&group=sector&size=market_cap_basic"
-        
-        driver.get(url)
-        time.sleep(15)
+        ready = all_of(document_ready, element_present(MAP_READY_SELECTOR))
+        with get_browser_pool().tab(TRADINGVIEW_MAP_URL, ready=ready, timeout=40, settle=MAP_SETTLE_SECONDS) as tab:
+            if not tab.ready:
+                print("   ⚠️ 맵 로딩 대기 시간 초과 - 현재 화면으로 캡처", flush=True)
+            try:
+                tab.run(lambda driver: driver.execute_script("""
+                    var header = document.querySelector('.tv-header'); if(header) header.style.display = 'none';
+                    var cookies = document.querySelectorAll('[class*="cookie"]'); cookies.forEach(el => el.remove());
+                    var toolbar = document.querySelector('.tv-side-toolbar'); if(toolbar) toolbar.style.display = 'none';
+                """))
+            except: pass
+            tab.run(lambda driver: driver.save_screenshot(output_file))
 
-        try:
-            driver.execute_script("""
-                var header = document.querySelector('.tv-header'); if(header) header.style.display = 'none';
-                var cookies = document.querySelectorAll('[class*="cookie"]'); cookies.forEach(el => el.remove());
-                var toolbar = document.querySelector('.tv-side-toolbar'); if(toolbar) toolbar.style.display = 'none';
-            """)
-        except: pass
-        
-        driver.save_screenshot(output_file)
         if os.path.exists(output_file):
             img = Image.open(output_file)
             width, height = img.size
@@ -294,45 +352,30 @@ def capture_tradingview_map(output_file="tradingview_map.png"):
     except Exception as e:
         print(f"⚠️ 캡처 실패: {e}", flush=True)
         return None
-    finally:
-        if driver: 
-            try: driver.quit()
-            except: pass
 
-def create_chart_image(symbol):
+@traced("chart_clip", "video")
+def create_chart_clip(symbol, duration, intraday=None):
+    """
+    종목 분봉 차트가 왼쪽부터 그려지는 클립을 만듭니다. (chart_engine.ChartReveal, 프레임마다 matplotlib 호출 없음)
+    intraday가 없으면 (수집 단계에서 빠진 종목) yfinance로 직접 조회합니다.
+
+    Returns:
+        tuple: (VideoClip, info{'symbol', 'price', 'color'}) - 실패 시 (None, None)
+    """
     print(f"📊 차트 생성 시도: {symbol}", flush=True)
     try:
-        ticker = yf.Ticker(symbol)
-        hist   = ticker.history(period="1d", interval="5m")
-        if hist.empty: return None, None
-
-        last_price      = hist['Close'].iloc[-1]
-        real_prev_close = ticker.fast_info.previous_close if hasattr(ticker.fast_info, 'previous_close') else hist['Close'].iloc[0]
-        
-        diff        = last_price - real_prev_close
-        pct         = (diff / real_prev_close) * 100
-        color_trend = '#ff3333' if diff > 0 else '#3366ff'
-
-        plt.style.use('dark_background')
-        fig, ax = plt.subplots(figsize=(12, 8)) # 차트 폭 확대 유지
-        
-        ax.set_facecolor('#121212')
-        fig.patch.set_facecolor('#000000')
-        ax.plot(hist.index, hist['Close'], color=color_trend, linewidth=2.5)
-        ax.fill_between(hist.index, hist['Close'], hist['Close'].min(), color=color_trend, alpha=0.15)
-        ax.axhline(y=real_prev_close, color='white', linestyle='--', linewidth=1, alpha=0.6)
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-        ax.grid(True, linestyle=':', alpha=0.2)
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_visible(False)
-        
-        output_file = f"{symbol}_chart.png"
-        plt.savefig(output_file, bbox_inches='tight', facecolor='black')
-        plt.close()
-        
-        info = {'symbol': symbol, 'price': f"${last_price:.2f}", 'color': color_trend}
-        return output_file, info
+        if not intraday:
+            ticker = yf.Ticker(symbol)
+            hist   = ticker.history(period="1d", interval="5m")
+            if hist.empty: return None, None
+            prev_close = ticker.fast_info.previous_close if hasattr(ticker.fast_info, 'previous_close') else hist['Close'].iloc[0]
+            intraday   = {'t': [int(ts.timestamp()) for ts in hist.index], 'close': hist['Close'].tolist(),
+                          'prev_close': prev_close}
+
+        anim = chart_engine.ChartReveal(intraday, chart_engine.VIDEO_CHART_SIZE,
+                                        reveal=min(chart_engine.REVEAL_SECONDS, duration * 0.5))
+        clip = VideoClip(anim.make_frame, duration=duration)
+        return clip, {'symbol': symbol, 'price': anim.info['price'], 'color': anim.info['color']}
     except Exception as e:
         print(f"   ⚠️ 차트 에러: {e}", flush=True)
         return None, None
@@ -343,7 +386,8 @@ def create_chart_image(symbol):
 # -----------------------------------------------------------------------------------------------------------------------------#
 
 # [SCENE 1] Market Map
-def create_scene_market(script_text, date_str, is_market_closed, economy_data=None):
+@traced("scene:market", "scene")
+def create_scene_market(script_text, date_str, is_market_closed, economy_data=None, map_img=None):
     print(f"🎬 Scene 1: Market Overview", flush=True)
     audio, subtitle_clips = generate_dynamic_audio_and_subs(script_text, "scene1")
     if not audio: return None
@@ -359,17 +403,20 @@ def create_scene_market(script_text, date_str, is_market_closed, economy_data=No
         clips.append(create_safe_text_clip(f"Condition: {sector_txt}", fontsize=26, color='#ffdd55')
                      .set_position(('center', 110)).set_duration(duration))
 
-        map_img = capture_tradingview_map()
+        # 수집 단계에서 미리 캡처해 둔 이미지가 있으면 재사용
+        if not map_img or not os.path.exists(map_img):
+            map_img = capture_tradingview_map()
         if map_img and os.path.exists(map_img):
             img_clip = ImageClip(map_img).resize(height=380).set_position(('center', 160)).set_duration(duration)
             clips.append(img_clip)
         else:
             clips.append(create_safe_text_clip("Map Unavailable", fontsize=60, color='gray').set_position('center').set_duration(duration))
 
-    return CompositeVideoClip(clips + subtitle_clips).set_audio(audio)
+    return compose_scene(clips + subtitle_clips, duration).set_audio(audio)
 
 
 # [SCENE 2] News
+@traced("scene:news", "scene")
 def create_scene_news(script_text, news_list, date_str):
     print("🎬 Scene 2: News", flush=True)
     audio, subtitle_clips = generate_dynamic_audio_and_subs(script_text, "scene2")
@@ -392,9 +439,10 @@ def create_scene_news(script_text, news_list, date_str):
         s_clip = create_safe_text_clip(f"   [{source}]", fontsize=16, color='#aaaaaa', align='West').set_position((100, start_y + current_h + 3)).set_duration(duration)
         clips.append(s_clip)
         start_y += (current_h + s_clip.h + 25)
-    return CompositeVideoClip(clips + subtitle_clips).set_audio(audio)
+    return compose_scene(clips + subtitle_clips, duration).set_audio(audio)
 
 # [SCENE 2.5] Economy
+@traced("scene:economy", "scene")
 def create_scene_economy(script_text, economy_data):
     print("🎬 Scene 2.5: Economy", flush=True)
     audio, subtitle_clips = generate_dynamic_audio_and_subs(script_text, "scene2_5")
@@ -424,9 +472,10 @@ def create_scene_economy(script_text, economy_data):
     clips.append(create_safe_text_clip(f"{fg_val}", fontsize=100, color=color, font="Impact").set_position((820, 220)).set_duration(duration))
     if fg_state:
         clips.append(create_safe_text_clip(f"({fg_state})", fontsize=35, color='#cccccc').set_position((820, 350)).set_duration(duration))
-    return CompositeVideoClip(clips + subtitle_clips).set_audio(audio)
+    return compose_scene(clips + subtitle_clips, duration).set_audio(audio)
 
 # [SCENE 3] Stock List
+@traced("scene:stock_list", "scene")
 def create_scene_stock_list(script_text, all_stocks, date_str, is_market_closed):
     print(f"🎬 Scene 3: Stock List", flush=True)
     audio, subtitle_clips = generate_dynamic_audio_and_subs(script_text, "scene3")
@@ -451,11 +500,12 @@ def create_scene_stock_list(script_text, all_stocks, date_str, is_market_closed)
         clips.append(create_safe_text_clip(summary, fontsize=18, color='#cccccc', method='caption', size=(530, None), align='West').set_position((700, start_y)).set_duration(duration))
         clips.append(ColorClip(size=(1150, 1), color=(50,50,50)).set_position(('center', start_y + row_height - 10)).set_duration(duration))
         start_y += row_height
-    return CompositeVideoClip(clips + subtitle_clips).set_audio(audio)
+    return compose_scene(clips + subtitle_clips, duration).set_audio(audio)
 
 
 # [SCENE 4] Chart
-def create_scene_stock_chart(script_text, stock_data, date_str, is_market_closed):
+@traced("scene:stock_chart", "scene")
+def create_scene_stock_chart(script_text, stock_data, date_str, is_market_closed, intraday=None):
     symbol = stock_data.get('symbol', 'INDEX')
     print(f"🎬 Scene 4: Analysis ({symbol})", flush=True)
     audio, subtitle_clips = generate_dynamic_audio_and_subs(script_text, "scene4")
@@ -463,8 +513,8 @@ def create_scene_stock_chart(script_text, stock_data, date_str, is_market_closed
     duration = audio.duration + 1.0
     clips = build_scene_base(duration, f"{symbol} Analysis", date_str, bg_color=(0, 0, 0))
     if not is_market_closed:
-        chart_img, info = create_chart_image(symbol)
-        if chart_img and os.path.exists(chart_img):
+        chart_clip, info = create_chart_clip(symbol, duration, intraday)
+        if chart_clip is not None:
             price = info['price']
             change_str = stock_data.get('change_str', '')
             color = info['color']
@@ -472,13 +522,13 @@ def create_scene_stock_chart(script_text, stock_data, date_str, is_market_closed
             clips.append(create_safe_text_clip(f"{symbol} / USD", fontsize=25, color='#888888').set_position((left_x, base_y)).set_duration(duration))
             clips.append(create_safe_text_clip(price, fontsize=80, color='white').set_position((left_x, base_y + 40)).set_duration(duration))
             clips.append(create_safe_text_clip(change_str, fontsize=40, color=color).set_position((left_x, base_y + 140)).set_duration(duration))
-            # 차트 높이 450 유지, 폭은 이미지 비율에 따라 자동 조절됨 (생성 시 12:8 비율)
-            chart_clip = ImageClip(chart_img).resize(height=450).set_position((520, 160)).set_duration(duration)
-            clips.append(chart_clip)
-    return CompositeVideoClip(clips + subtitle_clips).set_audio(audio)
+            # 차트는 12:8 비율, 높이 450으로 바로 렌더링됨 (불투명 배경이라 마스크 없음)
+            clips.append(chart_clip.set_position((520, 160)))
+    return compose_scene(clips + subtitle_clips, duration).set_audio(audio)
 
 
 # [SCENE 5] YouTube
+@traced("scene:youtube", "scene")
 def create_scene_youtube(script_text, youtube_list, date_str):
     print("🎬 Scene 5: YouTube", flush=True)
     audio, subtitle_clips = generate_dynamic_audio_and_subs(script_text, "scene5")
@@ -497,9 +547,10 @@ def create_scene_youtube(script_text, youtube_list, date_str):
         txt_clip = create_safe_text_clip(summary, fontsize=26, color='white', method='caption', size=(1000, None), align='West').set_position((80 + ch_clip.w + 15, start_y)).set_duration(duration)
         clips.append(txt_clip)
         start_y += max(ch_clip.h, txt_clip.h) + 35
-    return CompositeVideoClip(clips + subtitle_clips).set_audio(audio)
+    return compose_scene(clips + subtitle_clips, duration).set_audio(audio)
 
 # [SCENE 6] Outro
+@traced("scene:outro", "scene")
 def create_scene_outro(script_text, stocks, news_list, youtube, date_str):
     print("🎬 Scene 6: Outro", flush=True)
     audio, subtitle_clips = generate_dynamic_audio_and_subs(script_text, "scene6")
@@ -532,47 +583,182 @@ def create_scene_outro(script_text, stocks, news_list, youtube, date_str):
     disclaimer = """⚠️ 알림 (Disclaimer)\n이 영상은 AI를 통해 자동 생성되었습니다. 투자의 책임은 본인에게 있습니다.\n(Data: Yahoo Finance / Analysis: Gemini / Voice: Edge-TTS)"""
     clips.append(create_safe_text_clip(disclaimer, fontsize=20, color='#555555', align='center').set_position(('center', 480)).set_duration(duration))
 
-    return CompositeVideoClip(clips + subtitle_clips).set_audio(audio)
+    return compose_scene(clips + subtitle_clips, duration).set_audio(audio)
+
+
+# -----------------------------------------------------------------------------------------------------------------------------#
+# Scene-Parallel Rendering
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 씬마다 (TTS → 클립 구성 → 인코딩)을 별도 프로세스에서 수행해 세그먼트 mp4로 저장한 뒤,
+# ffmpeg concat demuxer로 재인코딩 없이(-c copy) 이어 붙입니다.
+# 모든 세그먼트가 같은 인코더 프로필(해상도/fps/코덱 libx264 + aac)로 인코딩되므로 스트림 복사가 가능합니다.
+#
+# segment_dir를 지정하면(체크포인트) 세그먼트 파일 이름에 씬 입력 해시를 붙여 남겨 두고,
+# reuse_segments(--resume)일 때만 같은 입력의 씬을 다시 만들지 않습니다. (예: 씬 5의 TTS 오류 후 재개 시 씬 5만 렌더링)
+# 해시에는 코드가 포함되지 않으므로, 일반 재실행은 항상 새로 렌더링합니다. (저장은 항상, 재사용은 재개일 때만)
+# -----------------------------------------------------------------------------------------------------------------------------#
+SEGMENT_DIR = "temp_segments"
+
+# 마지막 make_video_module 호출에서 실패한 씬 이름 (비어 있지 않으면 일부 씬이 빠졌거나 내레이션이 빠진 영상)
+last_failed_scenes = []
+
+# 현재 프로세스에서 만든 씬 중 TTS가 실패한 문장이 있는 씬 이름 (generate_dynamic_audio_and_subs가 기록)
+incomplete_audio_scenes = []
+
+def _scene_key(name, builder, args):
+    """씬 입력(대본/데이터/TTS 설정/인코더 프로필 + 참조하는 이미지 파일의 크기/수정 시각) 해시"""
+    files = [[a, os.path.getsize(a), os.path.getmtime(a)] for a in args if isinstance(a, str) and os.path.isfile(a)]
+    raw   = json.dumps([name, builder.__name__, args, files, _tts_config, _encoder_profile],
+                       ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+def _render_scene_segment(builder, args, segment_path, tts_config, encoder_profile=None):
+    """
+    [프로세스 풀 작업] 씬 하나를 만들어 segment_path로 인코딩합니다.
+
+    Returns:
+        tuple: (세그먼트 경로, 완전한 씬 여부) - 씬이 비면 None
+               TTS가 실패한 문장이 있으면 입력 해시 이름 대신 .incomplete.mp4로 인코딩 (다음 실행에서 재사용되지 않도록)
+    """
+    global _encoder_profile
+    if tts_config is not None:
+        set_tts_config(tts_config)
+    if encoder_profile is not None:
+        _encoder_profile = encoder_profile
+    del incomplete_audio_scenes[:]
+    clip = builder(*args)
+    if clip is None: return None
+    complete = not incomplete_audio_scenes
+    if not complete:
+        segment_path = segment_path[:-len('.mp4')] + '.incomplete.mp4'
+    # 씬끼리 병렬로 돌기 때문에 씬 하나당 인코딩 스레드는 segment_threads(기본 1)로 제한
+    # 중간에 죽어도 깨진 세그먼트가 재사용되지 않도록 임시 이름으로 인코딩 후 교체
+    partial = segment_path[:-len('.mp4')] + '.part.mp4'
+    with span("encode:segment", "video", path=segment_path, profile=_encoder_profile['name']) as sp:
+        write_video(clip, partial, segment=True)
+        os.replace(partial, segment_path)
+        sp.add_bytes(os.path.getsize(segment_path))
+    clip.close()
+    return segment_path, complete
+
+def concat_segments(segment_paths, output_filename, list_dir=SEGMENT_DIR):
+    """ffmpeg concat demuxer로 세그먼트들을 스트림 복사하여 하나의 mp4로 합칩니다."""
+    list_path = os.path.join(list_dir, "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+    cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+           "-f", "concat", "-safe", "0", "-i", list_path,
+           "-c", "copy", "-movflags", "+faststart", output_filename]
+    with span("ffmpeg:concat", "video", segments=len(segment_paths)) as sp:
+        subprocess.run(cmd, check=True)
+        sp.add_bytes(os.path.getsize(output_filename))
+    return output_filename
+
+def _render_scenes_parallel(scene_specs, output_filename, workers, segment_dir=None, reuse_segments=False):
+    keep = segment_dir is not None
+    segment_dir = segment_dir or SEGMENT_DIR
+    os.makedirs(segment_dir, exist_ok=True)
+    paths = {name: os.path.join(segment_dir, f"{name}-{_scene_key(name, builder, args)}.mp4" if keep else f"{name}.mp4")
+             for name, builder, args in scene_specs}
+    todo  = [spec for spec in scene_specs if not (keep and reuse_segments and os.path.exists(paths[spec[0]]))]
+    if len(todo) < len(scene_specs):
+        print(f"   ⏩ 저장된 씬 세그먼트 재사용: {len(scene_specs) - len(todo)}개", flush=True)
+
+    if todo:
+        # 미리 합성 중인 음성이 디스크 캐시에 저장된 뒤에 프로세스를 띄워야 자식 프로세스가 같은 문장을 다시 요청하지 않음
+        get_tts_engine().drain()
+        print(f"   ⚙️ 씬 병렬 렌더링 ({len(todo)}개 씬 / 프로세스 {workers}개)", flush=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: pool.submit(_render_scene_segment, builder, args, paths[name], _tts_config, _encoder_profile)
+                       for name, builder, args in todo}
+            for name, fut in futures.items():
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    print(f"⚠️ {name} 렌더링 실패: {e}", flush=True)
+                    result = None
+                if result is None:
+                    paths[name] = None
+                    last_failed_scenes.append(name)
+                    continue
+                paths[name], complete = result
+                if not complete:
+                    print(f"⚠️ {name}: 음성이 빠진 문장이 있어 세그먼트를 저장하지 않음", flush=True)
+                    last_failed_scenes.append(name)
+
+    segments = [paths[name] for name, _, _ in scene_specs if paths[name]]
+    if not segments:
+        return None
+    concat_segments(segments, output_filename, segment_dir)
+    # 입력 해시 이름의 완전한 세그먼트만 남김 (내레이션이 빠진 세그먼트는 항상 삭제)
+    for path in segments:
+        if keep and not path.endswith('.incomplete.mp4'): continue
+        try: os.remove(path)
+        except OSError: pass
+    return output_filename
 
 
 # [MAIN] Module
-def make_video_module(scene_scripts, structured_data, date_str):
-    print("\n🚀 [Video Studio] 영상 제작 시작...", flush=True)
+def make_video_module(scene_scripts, structured_data, date_str, scene_workers=1, segment_dir=None,
+                      encoder_profile=None, profile_overrides=None, reuse_segments=False):
+    """
+    scene_workers > 1이면 씬들을 프로세스 풀에서 병렬로 렌더링한 뒤 스트림 복사로 합칩니다.
+    (1이면 기존처럼 모든 씬을 하나의 타임라인으로 이어 붙여 한 번에 인코딩)
+    segment_dir를 지정하면 병렬 렌더링의 씬 세그먼트를 그 폴더에 남겨 두고, reuse_segments(--resume)일 때만 같은 입력이면 재사용합니다.
+    encoder_profile은 ENCODER_PROFILES 이름 (production / fast / draft), profile_overrides는 프로필별 덮어쓰기 값입니다.
+    """
+    profile = set_encoder_profile(encoder_profile, profile_overrides)
+    print(f"\n🚀 [Video Studio] 영상 제작 시작... (인코더 프로필: {profile['name']}, "
+          f"{'x'.join(map(str, output_size()))} {profile['fps']}fps)", flush=True)
+    del last_failed_scenes[:]
     stocks  = structured_data.get('stocks', [])
     news    = structured_data.get('news', [])
     youtube = structured_data.get('youtube', [])
     economy = structured_data.get('economy', {})
     
-    final_clips = []
-    
-    s1 = create_scene_market(scene_scripts.get('scene1', '시장 동향입니다.'), date_str, False, economy)
-    if s1: final_clips.append(s1)
-
-    s2 = create_scene_news(scene_scripts.get('scene2', '뉴스'), news, date_str)
-    if s2: final_clips.append(s2)
-    
-    s2_5 = create_scene_economy(scene_scripts.get('scene2_5', '경제'), economy)
-    if s2_5: final_clips.append(s2_5)
-    
-    s3 = create_scene_stock_list(scene_scripts.get('scene3', '주식'), stocks, date_str, False)
-    if s3: final_clips.append(s3)
-
     target_stock = stocks[0] if stocks else {'symbol': 'INDEX', 'price':'0', 'change_str':'0%'}
-    s4 = create_scene_stock_chart(scene_scripts.get('scene4', '차트'), target_stock, date_str, False)
-    if s4: final_clips.append(s4)
-
-    s5 = create_scene_youtube(scene_scripts.get('scene5', '유튜브'), youtube, date_str)
-    if s5: final_clips.append(s5)
+    intraday     = (structured_data.get('intraday') or {}).get(target_stock['symbol'])   # 수집 단계 분봉 (없으면 직접 조회)
+    scene_specs  = [
+        ('scene1'  , create_scene_market     , (scene_scripts.get('scene1', '시장 동향입니다.'), date_str, False, economy, structured_data.get('map_image'))),
+        ('scene2'  , create_scene_news       , (scene_scripts.get('scene2', '뉴스'), news, date_str)),
+        ('scene2_5', create_scene_economy    , (scene_scripts.get('scene2_5', '경제'), economy)),
+        ('scene3'  , create_scene_stock_list , (scene_scripts.get('scene3', '주식'), stocks, date_str, False)),
+        ('scene4'  , create_scene_stock_chart, (scene_scripts.get('scene4', '차트'), target_stock, date_str, False, intraday)),
+        ('scene5'  , create_scene_youtube    , (scene_scripts.get('scene5', '유튜브'), youtube, date_str)),
+        ('scene6'  , create_scene_outro      , (scene_scripts.get('scene6', '감사합니다.'), stocks, news, youtube, date_str)),
+    ]
+    suffix          = "" if profile['name'] == DEFAULT_ENCODER_PROFILE else f"_{profile['name']}"
+    output_filename = f"daily_brief_{date_str}{suffix}.mp4"
+
+    if scene_workers and scene_workers > 1:
+        started = time.perf_counter()
+        if not _render_scenes_parallel(scene_specs, output_filename, scene_workers, segment_dir, reuse_segments):
+            print("❌ 생성된 클립 없음.", flush=True)
+            return None
+        print(f"✅ 영상 제작 완료: {output_filename} "
+              f"(프로필 {profile['name']}, 씬 렌더링+인코딩 {time.perf_counter() - started:.1f}초)", flush=True)
+        return output_filename
 
-    s6 = create_scene_outro(scene_scripts.get('scene6', '감사합니다.'), stocks, news, youtube, date_str)
-    if s6: final_clips.append(s6)
+    final_clips = []
+    for name, builder, args in scene_specs:
+        del incomplete_audio_scenes[:]
+        try:
+            clip = builder(*args)
+        except Exception as e:
+            print(f"⚠️ {name} 렌더링 실패: {e}", flush=True)
+            clip = None
+        if clip is None or incomplete_audio_scenes:
+            last_failed_scenes.append(name)
+        if clip: final_clips.append(clip)
 
     if not final_clips: 
         print("❌ 생성된 클립 없음.", flush=True)
         return None
 
     final_video = concatenate_videoclips(final_clips, method="compose")
-    output_filename = f"daily_brief_{date_str}.mp4"
-    final_video.write_videofile(output_filename, fps=24, codec='libx264', audio_codec='aac', threads=4, logger=None)
+    with span("encode:final", "video", path=output_filename, profile=profile['name']) as sp:
+        write_video(final_video, output_filename)
+        sp.add_bytes(os.path.getsize(output_filename))
     print(f"✅ 영상 제작 완료: {output_filename}", flush=True)
-    return output_filename
\ No newline at end of file
+    return output_filename
@@ -0,0 +1,173 @@
+# -----------------------------------------------------------------------------------------------------------------------------#
+# YouTube Client (할당량 관리 + 일괄 조회 YouTube Data API 클라이언트)
+# -----------------------------------------------------------------------------------------------------------------------------#
+# 채널/트렌드 수집기가 함께 쓰는 YouTube Data API v3 클라이언트입니다. (실행당 1개)
+#
+# [호출 절약]
+# - 채널 → 업로드 재생목록 ID는 바뀌지 않으므로 디스크에 저장(기본 30일)하고, 없는 채널만
+#   channels().list를 최대 50개 ID씩 묶어서 조회합니다. (채널 수와 무관하게 대부분의 실행에서 0회)
+# - googleapiclient 서비스 객체(build)는 스레드마다 한 번만 만듭니다. (httplib2 연결은 스레드 간 공유 불가)
+#
+# [할당량]
+# YouTube Data API는 프로젝트당 하루 10,000 unit (태평양 시간 자정 초기화)이며 search().list는 호출당 100 unit입니다.
+# - 호출 종류별 사용량을 날짜(태평양 시간)별 장부에 기록하여 여러 번 실행해도 하루 누적으로 계산
+# - 호출 전에 (오늘 누적 + 이번 호출 비용)이 (daily_quota - upload_reserve)를 넘으면 QuotaExceeded 발생
+#   → 수집기는 남은 키워드/채널을 건너뛰고 이미 모은 결과로 진행 (업로드용 1,600 unit은 남겨 둠)
+#
+# [설정] config.json의 youtube_config
+#   {"daily_quota": 10000, "upload_reserve": 1600, "uploads_cache_days": 30}
+# -----------------------------------------------------------------------------------------------------------------------------#
+
+import os
+import threading
+
+from datetime import datetime
+
+import pytz
+
+from googleapiclient.discovery import build
+from disk_cache import DiskCache, CACHE_DIR
+from tracing import span
+
+
+# 호출 종류별 할당량 비용 (공식 문서 기준, 목록 조회는 결과 수와 무관하게 1)
+QUOTA_COST = {
+    'channels'     : 1,
+    'playlistItems': 1,
+    'videos'       : 1,
+    'search'       : 100,
+    'videos.insert': 1600,
+}
+
+DEFAULT_DAILY_QUOTA    = 10000
+DEFAULT_UPLOAD_RESERVE = QUOTA_COST['videos.insert']
+CHANNELS_PER_REQUEST   = 50     # channels().list의 id 파라미터 최대 개수
+QUOTA_TZ               = pytz.timezone('America/Los_Angeles')
+
+
+class QuotaExceeded(Exception):
+    """이번 호출로 하루 할당량 예산을 넘게 될 때 발생합니다. (호출은 보내지 않음)"""
+
+
+class YouTubeClient:
+    """
+    YouTube Data API v3 클라이언트입니다.
+
+    Args:
+        api_key (str): YouTube Data API 키
+        endpoint (str): API 주소 (로컬 대역 서버 등, None이면 googleapis.com)
+        config (dict): youtube_config (daily_quota, upload_reserve, uploads_cache_days)
+        cache (DiskCache): 재생목록 ID/할당량 장부 저장소 (생략 시 {CACHE_DIR}/youtube)
+
+    [사용 예]
+        client    = YouTubeClient(YOUTUBE_API_KEY, config=config.get('youtube_config'))
+        playlists = client.uploads_playlists(["UCxxx", "UCyyy"])      # {채널ID: 재생목록ID}
+        items     = client.playlist_items(playlists["UCxxx"], max_results=5)
+        print(client.quota_summary())
+    """
+
+    def __init__(self, api_key, endpoint=None, config=None, cache=None):
+        config              = config or {}
+        self.api_key        = api_key
+        self.endpoint       = endpoint
+        self.daily_quota    = int(config.get('daily_quota', DEFAULT_DAILY_QUOTA))
+        self.upload_reserve = int(config.get('upload_reserve', DEFAULT_UPLOAD_RESERVE))
+        self.uploads_ttl    = float(config.get('uploads_cache_days', 30)) * 24 * 3600
+        self.cache          = cache or DiskCache(os.path.join(CACHE_DIR, 'youtube'), max_bytes=16 * 1024 * 1024)
+        self.spent          = {}     # 이번 실행에서 호출 종류별로 쓴 unit
+        self._local         = threading.local()
+        self._lock          = threading.Lock()
+
+    @property
+    def service(self):
+        """현재 스레드의 googleapiclient 서비스 객체 (채널/트렌드 수집기가 동시에 호출하므로 스레드별로 생성)"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            options             = {'api_endpoint': self.endpoint} if self.endpoint else None
+            service             = build('youtube', 'v3', developerKey=self.api_key, client_options=options)
+            self._local.service = service
+        return service
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # 할당량 장부
+    # -------------------------------------------------------------------------------------------------------------------------#
+    @staticmethod
+    def _ledger_key():
+        return f"quota:{datetime.now(QUOTA_TZ).strftime('%Y-%m-%d')}"
+
+    def used_today(self):
+        """오늘(태평양 시간) 누적 사용량 {호출 종류: unit}"""
+        return self.cache.get_json(self._ledger_key()) or {}
+
+    def remaining(self):
+        """수집에 쓸 수 있는 남은 unit (업로드 예약분 제외)"""
+        return self.daily_quota - self.upload_reserve - sum(self.used_today().values())
+
+    def _charge(self, kind, units, enforce=True):
+        with self._lock:
+            key    = self._ledger_key()
+            ledger = self.cache.get_json(key) or {}
+            total  = sum(ledger.values())
+            limit  = self.daily_quota - (self.upload_reserve if enforce else 0)
+            if enforce and total + units > limit:
+                raise QuotaExceeded(f"{kind} {units} unit 필요 / 오늘 {total:,} 사용, 수집 예산 {limit:,}")
+            ledger[kind]     = ledger.get(kind, 0) + units
+            self.spent[kind] = self.spent.get(kind, 0) + units
+            self.cache.set_json(key, ledger, ttl=2 * 24 * 3600)
+
+    def record(self, kind, units=None):
+        """예산 검사 없이 사용량만 기록합니다. (업로드처럼 다른 클라이언트로 보낸 호출)"""
+        self._charge(kind, QUOTA_COST.get(kind, 1) if units is None else units, enforce=False)
+
+    def _execute(self, kind, request):
+        """할당량을 먼저 차감한 뒤 요청을 보냅니다. (예산 초과 시 QuotaExceeded, 요청은 보내지 않음)"""
+        self._charge(kind, QUOTA_COST.get(kind, 1))
+        with span(f"youtube:{kind}", "http"):
+            return request.execute()
+
+    def quota_summary(self):
+        run   = ' / '.join(f"{kind} {units:,}" for kind, units in self.spent.items()) or "호출 없음"
+        today = sum(self.used_today().values())
+        return f"이번 실행 {run} | 오늘 누적 {today:,}/{self.daily_quota:,} unit"
+
+    # -------------------------------------------------------------------------------------------------------------------------#
+    # API
+    # -------------------------------------------------------------------------------------------------------------------------#
+    def uploads_playlists(self, channel_ids):
+        """
+        채널별 업로드 재생목록 ID를 반환합니다.
+
+        디스크에 저장된 채널은 API를 호출하지 않고, 나머지는 50개씩 묶어 channels().list로 조회합니다.
+
+        Returns:
+            dict: {채널ID: 업로드 재생목록ID} (조회 실패/존재하지 않는 채널은 빠짐)
+        """
+        result  = {}
+        missing = []
+        for cid in dict.fromkeys(channel_ids):
+            cached = self.cache.get_json(f"uploads:{cid}")
+            if cached: result[cid] = cached['playlist_id']
+            else     : missing.append(cid)
+
+        for i in range(0, len(missing), CHANNELS_PER_REQUEST):
+            chunk = missing[i:i + CHANNELS_PER_REQUEST]
+            res   = self._execute('channels', self.service.channels().list(
+                id=','.join(chunk), part='contentDetails', maxResults=CHANNELS_PER_REQUEST))
+            for item in res.get('items', []):
+                playlist_id = item['contentDetails']['relatedPlaylists']['uploads']
+                result[item['id']] = playlist_id
+                self.cache.set_json(f"uploads:{item['id']}", {'playlist_id': playlist_id}, ttl=self.uploads_ttl)
+        return result
+
+    def playlist_items(self, playlist_id, max_results=5):
+        """재생목록의 최신 항목 (snippet 포함)"""
+        res = self._execute('playlistItems', self.service.playlistItems().list(
+            playlistId=playlist_id, part='snippet', maxResults=max_results))
+        return res.get('items', [])
+
+    def search_videos(self, query, published_after=None, max_results=1, order='relevance'):
+        """키워드로 영상을 검색합니다. (호출당 100 unit)"""
+        params = dict(part='snippet', q=query, order=order, type='video', maxResults=max_results)
+        if published_after: params['publishedAfter'] = published_after
+        res = self._execute('search', self.service.search().list(**params))
+        return res.get('items', [])
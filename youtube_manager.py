@@ -1,13 +1,18 @@
 # ===================================================================================================================
-# Import 
+# Import
 # ===================================================================================================================
 
 import os
-import googleapiclient.discovery
-import googleapiclient.errors
+import json
+import time
+import random
+import hashlib
+import requests
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.http import MediaFileUpload
+from google.auth.transport.requests import AuthorizedSession
+from disk_cache import DiskCache, CACHE_DIR
+from tracing import span
 
 
 # ===================================================================================================================
@@ -17,26 +22,220 @@ from googleapiclient.http import MediaFileUpload
 # 인증 범위 (업로드 권한)
 SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
 
+# 업로드 주소 (로컬 대역 서버로 바꿀 때 YOUTUBE_UPLOAD_ENDPOINT 지정)
+YOUTUBE_UPLOAD_ENDPOINT = os.getenv('YOUTUBE_UPLOAD_ENDPOINT', 'https://www.googleapis.com').rstrip('/')
+
+# 재개 가능(resumable) 업로드 설정 - config.json의 upload_config로 덮어쓸 수 있음
+# - chunk_mb     : 요청 1회에 보낼 크기 (256KiB 배수로 맞춤). 연결이 끊기면 마지막 청크만 다시 보냄
+# - max_retries  : 진행 없이 연속으로 실패할 수 있는 횟수 (바이트가 확인되면 다시 0부터)
+# - backoff_base / backoff_max : 재시도 대기 시간 base * 2^n (최대 backoff_max초, 0.5~1배 무작위)
+DEFAULT_UPLOAD_CONFIG = {'chunk_mb': 8, 'max_retries': 8, 'backoff_base': 1.0, 'backoff_max': 64.0, 'timeout': 120}
+CHUNK_UNIT            = 256 * 1024                   # 재개 가능 업로드 청크는 256KiB의 배수여야 함 (마지막 청크 제외)
+RETRYABLE_STATUS      = {429, 500, 502, 503, 504}
+SESSION_TTL           = 6 * 24 * 3600                # 업로드 세션 URI는 약 1주일 유효
+
+# 업로드 세션 저장소: 프로세스가 재시작되어도 같은 파일/메타데이터면 마지막으로 확인된 바이트부터 이어서 보냄
+UPLOAD_STATE = DiskCache(os.path.join(CACHE_DIR, 'upload'), max_bytes=1024 * 1024)
+
+
+class UploadError(Exception):
+    """재시도할 수 없는 응답을 받았거나 재시도 횟수를 모두 쓴 경우 발생합니다."""
+
+
+class _SessionExpired(Exception):
+    """세션 URI가 만료/폐기됨 (404/410) - 새 세션으로 처음부터 다시 보냄"""
+
+
+class _Retryable(Exception):
+    """일시적 오류 (5xx/429 또는 연결 끊김)"""
+
+
+
+# ===================================================================================================================
+# resumable upload
+# ===================================================================================================================
+
+class ResumableUpload:
+    """
+    YouTube 재개 가능 업로드 프로토콜로 파일을 청크 단위로 보냅니다.
+
+    [프로토콜]
+    1. POST {endpoint}/upload/youtube/v3/videos?uploadType=resumable  (메타데이터 JSON) → Location: 세션 URI
+    2. PUT 세션 URI, Content-Range: bytes {시작}-{끝}/{전체}  → 308 + Range: bytes=0-{확인된 마지막 바이트}
+       마지막 청크는 200/201 + 영상 리소스
+    3. 오류/재시작 후에는 PUT 세션 URI, Content-Range: bytes */{전체} 로 서버가 받은 위치를 물어보고 그 뒤부터 전송
+
+    Args:
+        session (requests.Session): 인증 헤더를 붙이는 세션 (AuthorizedSession)
+        file_path (str): 업로드할 파일
+        body (dict): videos.insert 메타데이터 (snippet/status)
+        upload_config (dict): DEFAULT_UPLOAD_CONFIG 키 일부를 덮어쓸 값
+        endpoint (str): 업로드 주소 (기본값: YOUTUBE_UPLOAD_ENDPOINT)
+        state (DiskCache): 세션 URI 저장소 (기본값: UPLOAD_STATE)
+    """
+
+    def __init__(self, session, file_path, body, upload_config=None, endpoint=None, state=None):
+        config            = {**DEFAULT_UPLOAD_CONFIG, **(upload_config or {})}
+        self.session      = session
+        self.file_path    = file_path
+        self.body         = body
+        self.total        = os.path.getsize(file_path)
+        self.chunk_size   = max(1, int(float(config['chunk_mb']) * 1024 * 1024) // CHUNK_UNIT) * CHUNK_UNIT
+        self.max_retries  = int(config['max_retries'])
+        self.backoff_base = float(config['backoff_base'])
+        self.backoff_max  = float(config['backoff_max'])
+        self.timeout      = float(config['timeout'])
+        self.endpoint     = (endpoint or YOUTUBE_UPLOAD_ENDPOINT).rstrip('/')
+        self.state        = state or UPLOAD_STATE
+        self.state_key    = self._fingerprint()
+        self.bytes_sent   = 0      # 재전송 포함 실제로 보낸 바이트
+        self.resumed_from = 0      # 저장된 세션으로 이어받은 경우 시작 위치
+
+    def _fingerprint(self):
+        """파일(경로/크기/수정 시각) + 메타데이터가 같을 때만 저장된 세션을 이어 씀"""
+        st  = os.stat(self.file_path)
+        raw = json.dumps([os.path.abspath(self.file_path), st.st_size, st.st_mtime_ns, self.body], sort_keys=True, ensure_ascii=False)
+        return "session:" + hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    # -------------------------------------------------------------------------------------------------------------#
+    # HTTP
+    # -------------------------------------------------------------------------------------------------------------#
+    def _request(self, method, url, **kwargs):
+        try:
+            res = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise _Retryable(f"연결 오류: {e}") from e
+        if res.status_code in RETRYABLE_STATUS:
+            raise _Retryable(f"HTTP {res.status_code}")
+        return res
+
+    @staticmethod
+    def _acknowledged(res):
+        """308 응답의 Range 헤더(bytes=0-N)에서 다음에 보낼 위치(N+1)를 꺼냄 (헤더가 없으면 0)"""
+        header = res.headers.get('Range', '')
+        return int(header.rsplit('-', 1)[-1]) + 1 if '-' in header else 0
+
+    def _finished(self, res):
+        """200/201이면 영상 리소스(dict), 308이면 None. 그 외는 오류"""
+        if res.status_code in (200, 201):
+            return res.json()
+        if res.status_code in (404, 410):
+            raise _SessionExpired(f"HTTP {res.status_code}")
+        if res.status_code != 308:
+            raise UploadError(f"HTTP {res.status_code}: {res.text[:300]}")
+        return None
+
+    def _start_session(self):
+        res = self._request(
+            'POST', f"{self.endpoint}/upload/youtube/v3/videos",
+            params  = {'uploadType': 'resumable', 'part': ','.join(self.body)},
+            headers = {'X-Upload-Content-Length': str(self.total), 'X-Upload-Content-Type': 'video/mp4',
+                       'Content-Type': 'application/json; charset=UTF-8'},
+            data    = json.dumps(self.body, ensure_ascii=False).encode('utf-8'))
+        if res.status_code != 200 or not res.headers.get('Location'):
+            raise UploadError(f"세션 생성 실패 HTTP {res.status_code}: {res.text[:300]}")
+        uri = res.headers['Location']
+        self.state.set_json(self.state_key, {'uri': uri, 'created': time.time()}, ttl=SESSION_TTL)
+        return uri
+
+    def _query_offset(self, uri):
+        """서버가 받은 위치 조회 → (다음 위치, 완료 시 영상 리소스)"""
+        res = self._request('PUT', uri, headers={'Content-Range': f"bytes */{self.total}", 'Content-Length': '0'})
+        done = self._finished(res)
+        return (self.total, done) if done else (self._acknowledged(res), None)
+
+    def _send_chunk(self, uri, f, offset):
+        f.seek(offset)
+        data = f.read(self.chunk_size)
+        end  = offset + len(data) - 1
+        self.bytes_sent += len(data)
+        res  = self._request('PUT', uri, data=data,
+                             headers={'Content-Range': f"bytes {offset}-{end}/{self.total}", 'Content-Type': 'video/mp4'})
+        done = self._finished(res)
+        return (self.total, done) if done else (self._acknowledged(res), None)
+
+    # -------------------------------------------------------------------------------------------------------------#
+    # 실행
+    # -------------------------------------------------------------------------------------------------------------#
+    def _backoff(self, failures, error):
+        if failures > self.max_retries:
+            raise UploadError(f"재시도 {self.max_retries}회 초과: {error}")
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (failures - 1)) * random.uniform(0.5, 1.0)
+        print(f"   - 업로드 재시도 {failures}/{self.max_retries} ({delay:.1f}초 후): {error}")
+        time.sleep(delay)
+
+    def run(self, on_progress=None):
+        """
+        업로드를 끝까지 진행하고 영상 리소스(dict)를 반환합니다.
+
+        실패해도 세션 URI는 남겨 두므로, 같은 파일로 다시 호출하면(프로세스 재시작 포함) 이어서 보냅니다.
+
+        Raises:
+            UploadError: 재시도할 수 없는 오류 또는 재시도 횟수 초과
+        """
+        saved    = self.state.get_json(self.state_key)
+        uri      = saved['uri'] if saved else None
+        offset   = None             # None = 서버에 위치를 물어봐야 함
+        failures = 0
+        restarts = 0
+
+        with open(self.file_path, 'rb') as f:
+            while True:
+                try:
+                    if uri is None:
+                        uri, offset = self._start_session(), 0
+                    elif offset is None:
+                        offset, done = self._query_offset(uri)
+                        if saved and not self.resumed_from and offset:
+                            self.resumed_from = offset
+                            print(f"   - 저장된 업로드 세션에서 이어받기: {offset:,}/{self.total:,} bytes")
+                        if done is not None:
+                            break
+                    previous     = offset
+                    offset, done = self._send_chunk(uri, f, offset)
+                    if done is not None:
+                        break
+                    if offset <= previous:
+                        # 308인데 확인 위치가 그대로(또는 뒤로) → 같은 청크를 끝없이 보내지 않도록 재시도 횟수에 포함
+                        raise _Retryable(f"청크 미확인 (보낸 위치 {previous:,}, 서버 확인 위치 {offset:,})")
+                    failures = 0
+                    if on_progress:
+                        on_progress(offset, self.total)
+                except _SessionExpired as e:
+                    restarts += 1
+                    if restarts > 1:
+                        raise UploadError(f"업로드 세션을 다시 만들 수 없습니다: {e}")
+                    print(f"   - 업로드 세션 만료 ({e}), 처음부터 다시 보냅니다.")
+                    self.state.delete(self.state_key)
+                    uri, offset, saved = None, None, None
+                except _Retryable as e:
+                    failures += 1
+                    self._backoff(failures, e)
+                    offset = None   # 서버가 실제로 받은 위치부터 다시
+
+        self.state.delete(self.state_key)
+        return done
+
 
 
 # ===================================================================================================================
 # upload shorts
 # ===================================================================================================================
 
-def upload_short(file_path, title, description):
+def upload_short(file_path, title, description, upload_config=None):
     print(f"🚀 유튜브 업로드 시작: {title}")
-    
+
     if not os.path.exists('token.json'):
         print("❌ 인증 토큰(token.json)이 없습니다.")
         return None
-        
+
     creds   = Credentials.from_authorized_user_file('token.json', SCOPES)
-    youtube = googleapiclient.discovery.build("youtube", "v3", credentials=creds)
-    
+    session = AuthorizedSession(creds)   # 만료된 토큰은 요청 전에 자동 갱신
+
     # [Fix] 설명(Description) 안전장치 추가
     # 1. 꺾쇠 괄호 치환 (API 에러 방지)
     safe_description = description.replace("<", "[").replace(">", "]")
-    
+
     # 2. 길이 제한 (유튜브 한도 5000자 -> 안전하게 4500자로 컷)
     if len(safe_description) > 4500:
         print(f"⚠️ 설명 내용이 너무 길어 일부 생략합니다. ({len(safe_description)}자 -> 4500자)")
@@ -54,30 +253,25 @@ def upload_short(file_path, title, description):
             'selfDeclaredMadeForKids' : False
         }
     }
-    
-    media = MediaFileUpload(file_path, chunksize=-1, resumable=True)
-    
+
+    def _progress(sent, total):
+        print(f"   - 업로드 진행률: {int(sent / total * 100)}%")
+
     try:
-        request = youtube.videos().insert(
-            part       = "snippet,status", 
-            body       = body, 
-            media_body = media
-            )
-        response = None
-        while response is None:
-            status, response = request.next_chunk()
-            if status:
-                print(f"   - 업로드 진행률: {int(status.progress() * 100)}%")
-        
+        upload = ResumableUpload(session, file_path, body, upload_config)
+        with span("youtube:upload", "upload", file=file_path, chunk=upload.chunk_size) as sp:
+            response = upload.run(on_progress=_progress)
+            sp.add_bytes(upload.bytes_sent)
+
         video_id = response['id']
         video_url = f"https://www.youtube.com/watch?v={video_id}"
 
         print(f"✅ 업로드 완료! URL: {video_url}")
         return video_url
-        
+
     except Exception as e:
         print(f"❌ 업로드 실패: {e}")
-        # 에러가 나도 프로그램이 죽지 않도록 None 반환
+        # 에러가 나도 프로그램이 죽지 않도록 None 반환 (세션 URI는 남아 있어 다음 실행에서 이어서 업로드)
         return None
 
 